@@ -0,0 +1,115 @@
+"""
+Сравнение загрузки каталога: books.json целиком (json.load), потоковая
+загрузка JSON и двоичный снимок (BinaryStorageService)
+
+Каждый режим запускается в отдельном процессе, чтобы пиковый RSS
+не зависел от предыдущих замеров. С --parse-only замеряется только
+разбор файла в словари, без создания объектов Book.
+
+Запуск:
+    python benchmarks/bench_load.py --size 1000000
+    python benchmarks/bench_load.py --size 1000000 --parse-only
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from catalogue import write_catalogue
+
+from models import Book
+from services import BinaryStorageService, StorageService
+from services.binary_storage_service import json_to_binary
+
+MODES = ("json_load", "stream", "binary")
+
+
+def load(mode: str, path: Path, parse_only: bool = False) -> int:
+    """Загружает каталог выбранным способом, возвращает количество книг"""
+    if mode == "json_load":
+        with open(path, "r", encoding="utf-8") as file:
+            books_data = json.load(file)["books"]
+    elif mode == "stream":
+        books_data, _ = StorageService(path).load_data()
+    else:
+        books_data, _ = BinaryStorageService(path.with_suffix(".bin")).load_data()
+
+    if parse_only:
+        return len(list(books_data))
+    books = [Book.from_dict(book_data) for book_data in books_data]
+    return len(books)
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса в мегабайтах"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss в килобайтах на Linux и в байтах на macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def run_child(mode: str, path: Path, parse_only: bool) -> None:
+    """Замер в дочернем процессе, результат печатается в stdout в JSON"""
+    baseline = peak_rss_mb()
+    started = time.perf_counter()
+    count = load(mode, path, parse_only)
+    elapsed = time.perf_counter() - started
+    print(
+        json.dumps(
+            {
+                "mode": mode,
+                "books": count,
+                "seconds": round(elapsed, 3),
+                "peak_rss_mb": round(peak_rss_mb(), 1),
+                "baseline_rss_mb": round(baseline, 1),
+            }
+        )
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument(
+        "--parse-only", action="store_true", help="не создавать объекты Book"
+    )
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--path", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(args.child, args.path, args.parse_only)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        path = write_catalogue(Path(temp_dir) / "books.json", args.size)
+        json_to_binary(path, path.with_suffix(".bin"))
+        size_mb = path.stat().st_size / (1024 * 1024)
+        binary_mb = path.with_suffix(".bin").stat().st_size / (1024 * 1024)
+        print(
+            f"Каталог: {args.size} книг, JSON {size_mb:.1f} МБ, "
+            f"двоичный снимок {binary_mb:.1f} МБ"
+        )
+        for mode in MODES:
+            command = [sys.executable, __file__, "--child", mode, "--path", str(path)]
+            if args.parse_only:
+                command.append("--parse-only")
+            output = subprocess.run(
+                command,
+                check=True,
+                capture_output=True,
+                text=True,
+            ).stdout
+            result = json.loads(output)
+            print(
+                f"{mode:>10}: {result['seconds']:.2f} с, "
+                f"пиковый RSS {result['peak_rss_mb']:.1f} МБ"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,82 @@
+"""
+Ускорение загрузки и поиска по сегментам в пуле процессов в зависимости
+от числа процессов (services.parallel_segments)
+
+Для каждого числа процессов замеряются загрузка LibraryService из
+сегментированного хранилища и поиск search_segments по файлам сегментов;
+ускорение считается относительно последовательного выполнения (1 процесс).
+
+Запуск:
+    python benchmarks/bench_parallel.py --size 1000000 --workers 1 2 4 8 16
+"""
+
+import argparse
+import os
+import tempfile
+import time
+from pathlib import Path
+
+from catalogue import generate_books
+
+from services import LibraryService, SegmentedStorageService
+from services.parallel_segments import search_segments
+
+SEARCH_QUERIES = ("толстой", "мир", "ги", "нет такой")
+
+
+def default_workers() -> list[int]:
+    """Степени двойки до числа ядер и само число ядер"""
+    cores = os.cpu_count() or 1
+    workers = [1]
+    while workers[-1] * 2 <= cores:
+        workers.append(workers[-1] * 2)
+    if workers[-1] != cores:
+        workers.append(cores)
+    return workers
+
+
+def measure_load(storage: SegmentedStorageService, workers: int) -> float:
+    """Время загрузки библиотеки в секундах"""
+    started = time.perf_counter()
+    LibraryService(storage, parallel_workers=workers, parallel_min_books=0)
+    return time.perf_counter() - started
+
+
+def measure_search(storage: SegmentedStorageService, workers: int) -> float:
+    """Время поиска всех запросов SEARCH_QUERIES в секундах"""
+    started = time.perf_counter()
+    for query in SEARCH_QUERIES:
+        search_segments(storage, query, workers=workers, min_books=0)
+    return time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=200_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=default_workers())
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        storage = SegmentedStorageService(Path(temp_dir) / "segments")
+        storage.save_data(generate_books(args.size), args.size)
+        print(
+            f"Каталог {args.size} книг, {len(storage.segments())} сегментов, "
+            f"ядер {os.cpu_count()}"
+        )
+        print(
+            f"{'процессов':>10} {'загрузка, с':>12} {'x':>6} {'поиск, с':>10} {'x':>6}"
+        )
+        baseline = None
+        for workers in args.workers:
+            load = measure_load(storage, workers)
+            search = measure_search(storage, workers)
+            if baseline is None:
+                baseline = load, search
+            print(
+                f"{workers:>10} {load:>12.2f} {baseline[0] / load:>6.2f} "
+                f"{search:>10.2f} {baseline[1] / search:>6.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
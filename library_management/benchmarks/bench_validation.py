@@ -0,0 +1,76 @@
+"""
+Сравнение пакетной проверки книг (BookValidator.validate_many) с проверкой
+по одной книге (validate_book_data в цикле)
+
+Пакет составляется из новых книг синтетического каталога с небольшой долей
+некорректных строк, повторов внутри пакета и дубликатов книг библиотеки.
+
+Запуск:
+    python benchmarks/bench_validation.py --size 200000
+"""
+
+import argparse
+import time
+
+from catalogue import generate_books
+
+from utils import BookValidator
+
+
+def make_batch(size: int) -> tuple[list[tuple[str, str, int]], set]:
+    """Возвращает пакет строк и индекс ключей книг библиотеки"""
+    library = list(generate_books(size))
+    existing_keys = {
+        BookValidator.make_duplicate_key(book["title"], book["author"], book["year"])
+        for book in library[::10]
+    }
+    rows = []
+    for i, book in enumerate(library):
+        if i % 50 == 0:
+            rows.append(("", book["author"], 3000))
+        elif i % 50 == 49:
+            rows.append(rows[-1])
+        else:
+            rows.append((book["title"], book["author"], book["year"]))
+    return rows, existing_keys
+
+
+def per_row(rows: list[tuple[str, str, int]], existing_keys: set) -> int:
+    """Проверка по одной книге, как в прежнем add_books; возвращает число ошибок"""
+    keys = set(existing_keys)
+    errors = 0
+    for title, author, year in rows:
+        is_valid, _ = BookValidator.validate_book_data(
+            title, author, year, existing_keys=keys
+        )
+        if is_valid:
+            keys.add(BookValidator.make_duplicate_key(title, author, year))
+        else:
+            errors += 1
+    return errors
+
+
+def batched(rows: list[tuple[str, str, int]], existing_keys: set) -> int:
+    """Пакетная проверка; возвращает число строк с ошибками"""
+    return len(BookValidator.validate_many(rows, existing_keys))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=200_000)
+    args = parser.parse_args()
+
+    rows, existing_keys = make_batch(args.size)
+    print(f"Пакет: {len(rows)} строк, в библиотеке {len(existing_keys)} книг")
+    for name, check in (("validate_book_data", per_row), ("validate_many", batched)):
+        started = time.perf_counter()
+        errors = check(rows, existing_keys)
+        elapsed = time.perf_counter() - started
+        print(
+            f"{name:>18}: {elapsed:.2f} с, {len(rows) / elapsed:,.0f} строк/с, "
+            f"строк с ошибками {errors}"
+        )
+
+
+if __name__ == "__main__":
+    main()
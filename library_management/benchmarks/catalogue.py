@@ -0,0 +1,82 @@
+import random
+import sys
+from collections.abc import Iterator
+from pathlib import Path
+
+SRC_DIR = Path(__file__).parent.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from models import BookStatus  # noqa: E402
+from services.json_stream import write_books  # noqa: E402
+
+_TITLE_WORDS = [
+    "война",
+    "мир",
+    "преступление",
+    "наказание",
+    "мастер",
+    "маргарита",
+    "идиот",
+    "братья",
+    "отцы",
+    "дети",
+    "тихий",
+    "дон",
+    "белая",
+    "гвардия",
+    "мертвые",
+    "души",
+    "герой",
+    "нашего",
+    "времени",
+    "горе",
+    "от",
+    "ума",
+]
+_AUTHORS = [
+    "Лев Толстой",
+    "Фёдор Достоевский",
+    "Михаил Булгаков",
+    "Иван Тургенев",
+    "Николай Гоголь",
+    "Михаил Лермонтов",
+    "Александр Грибоедов",
+    "Антон Чехов",
+    "Александр Пушкин",
+    "Иван Бунин",
+    "Михаил Шолохов",
+    "Борис Пастернак",
+]
+
+
+def generate_books(count: int, seed: int = 42) -> Iterator[dict]:
+    """
+    Генерирует детерминированный синтетический каталог
+
+    Args:
+        count: Количество книг
+        seed: Начальное значение генератора случайных чисел
+
+    Returns:
+        Iterator[dict]: книги в формате Book.to_dict с ID от 1 до count
+    """
+    rng = random.Random(seed)
+    statuses = BookStatus.get_valid_statuses()
+    for book_id in range(1, count + 1):
+        words = rng.sample(_TITLE_WORDS, rng.randint(1, 4))
+        yield {
+            "id": book_id,
+            "title": " ".join(words).capitalize() + f" {book_id}",
+            "author": rng.choice(_AUTHORS),
+            "year": rng.randint(1800, 2020),
+            "status": rng.choice(statuses),
+        }
+
+
+def write_catalogue(path: Path, count: int, seed: int = 42) -> Path:
+    """Записывает синтетический каталог в файл формата books.json"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        write_books(file, generate_books(count, seed), count)
+    return path
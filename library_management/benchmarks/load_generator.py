@@ -0,0 +1,240 @@
+"""
+Нагрузочный тест HTTP API библиотеки (api_server.py)
+
+По умолчанию сервер запускается в отдельном процессе на синтетическом
+каталоге во временной директории; с --host/--port нагрузка подается на
+уже запущенный сервер. Клиенты держат keep-alive соединения и выполняют
+смесь запросов: получение по ID, поиск, страницы списка, добавление и
+изменение статуса. Печатаются запросы в секунду и перцентили задержки
+для каждого типа запроса.
+
+Запуск:
+    python benchmarks/load_generator.py --size 100000 --clients 32 --duration 10
+    python benchmarks/load_generator.py --host 127.0.0.1 --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from urllib.parse import quote
+
+from catalogue import write_catalogue
+from run_benchmarks import SEARCH_QUERIES, percentile
+
+from models import BookStatus
+
+# Доли запросов каждого типа в смеси нагрузки
+DEFAULT_MIX = {
+    "get_book": 0.5,
+    "search": 0.2,
+    "list_page": 0.2,
+    "add_book": 0.05,
+    "change_status": 0.05,
+}
+
+
+def make_request(kind: str, rng: random.Random, size: int, number: int):
+    """Возвращает (метод, путь, тело) запроса заданного типа"""
+    if kind == "get_book":
+        return "GET", f"/books/{rng.randint(1, size)}", None
+    if kind == "search":
+        return "GET", "/search?q=" + quote(rng.choice(SEARCH_QUERIES)), None
+    if kind == "list_page":
+        return "GET", f"/books?after_id={rng.randint(0, size)}&limit=20", None
+    if kind == "add_book":
+        body = {"title": f"Нагрузка {number}", "author": "Генератор", "year": 2000}
+        return "POST", "/books", body
+    statuses = BookStatus.get_valid_statuses()
+    body = {"status": rng.choice(statuses)}
+    return "PUT", f"/books/{rng.randint(1, size)}/status", body
+
+
+async def send(reader, writer, method: str, path: str, body) -> int:
+    """Отправляет запрос по открытому соединению и возвращает статус ответа"""
+    payload = b"" if body is None else json.dumps(body).encode("utf-8")
+    writer.write(
+        f"{method} {path} HTTP/1.1\r\nHost: bench\r\n"
+        f"Content-Length: {len(payload)}\r\n\r\n".encode("latin-1") + payload
+    )
+    head = await reader.readuntil(b"\r\n\r\n")
+    length = 0
+    for line in head.decode("latin-1").split("\r\n")[1:]:
+        if line.lower().startswith("content-length:"):
+            length = int(line.split(":", 1)[1])
+    await reader.readexactly(length)
+    return int(head.split(b" ", 2)[1])
+
+
+async def client(
+    host: str,
+    port: int,
+    deadline: float,
+    size: int,
+    seed: int,
+    latencies: dict[str, list[float]],
+    errors: dict[str, int],
+) -> None:
+    """Клиент, выполняющий запросы до наступления deadline"""
+    rng = random.Random(seed)
+    kinds = list(DEFAULT_MIX)
+    weights = list(DEFAULT_MIX.values())
+    reader, writer = await asyncio.open_connection(host, port, limit=16 * 1024 * 1024)
+    number = 0
+    try:
+        while time.perf_counter() < deadline:
+            kind = rng.choices(kinds, weights)[0]
+            method, path, body = make_request(
+                kind, rng, size, seed * 1_000_000 + number
+            )
+            number += 1
+            started = time.perf_counter()
+            status = await send(reader, writer, method, path, body)
+            latencies[kind].append(time.perf_counter() - started)
+            if status >= 500:
+                errors[kind] += 1
+    finally:
+        writer.close()
+
+
+async def run_load(
+    host: str, port: int, size: int, clients: int, duration: float, seed: int
+) -> dict:
+    """Подает нагрузку и возвращает статистику по типам запросов"""
+    latencies = {kind: [] for kind in DEFAULT_MIX}
+    errors = {kind: 0 for kind in DEFAULT_MIX}
+    started = time.perf_counter()
+    deadline = started + duration
+    await asyncio.gather(
+        *(
+            client(host, port, deadline, size, seed + i, latencies, errors)
+            for i in range(clients)
+        )
+    )
+    elapsed = time.perf_counter() - started
+
+    results = {}
+    for kind, values in latencies.items():
+        if not values:
+            continue
+        values.sort()
+        results[kind] = {
+            "requests": len(values),
+            "errors": errors[kind],
+            "p50_ms": round(percentile(values, 0.50) * 1000, 3),
+            "p95_ms": round(percentile(values, 0.95) * 1000, 3),
+            "p99_ms": round(percentile(values, 0.99) * 1000, 3),
+            "max_ms": round(values[-1] * 1000, 3),
+        }
+    total = sum(len(values) for values in latencies.values())
+    everything = sorted(value for values in latencies.values() for value in values)
+    return {
+        "requests": total,
+        "requests_per_sec": round(total / elapsed, 1),
+        "p50_ms": round(percentile(everything, 0.50) * 1000, 3),
+        "p95_ms": round(percentile(everything, 0.95) * 1000, 3),
+        "p99_ms": round(percentile(everything, 0.99) * 1000, 3),
+        "by_request": results,
+    }
+
+
+def serve(catalogue: Path) -> None:
+    """Запускает сервер на каталоге и печатает выбранный порт"""
+    from api_server import LibraryAPIServer
+    from services import LibraryService, StorageService
+
+    async def run():
+        library = LibraryService(
+            StorageService(catalogue, journal=True), thread_safe=True
+        )
+        server = LibraryAPIServer(library)
+        await server.start("127.0.0.1", 0)
+        print(server.port, flush=True)
+        await server.serve_forever()
+
+    asyncio.run(run())
+
+
+def print_report(report: dict) -> None:
+    print(
+        f"\nВсего {report['requests']} запросов, "
+        f"{report['requests_per_sec']:.1f} запр/с, "
+        f"p50 {report['p50_ms']} мс, p95 {report['p95_ms']} мс, "
+        f"p99 {report['p99_ms']} мс"
+    )
+    print(
+        f"{'запрос':<15}{'кол-во':>10}{'ошибки':>8}"
+        f"{'p50 мс':>10}{'p95 мс':>10}{'p99 мс':>10}{'max мс':>10}"
+    )
+    for kind, stats in report["by_request"].items():
+        print(
+            f"{kind:<15}{stats['requests']:>10}{stats['errors']:>8}"
+            f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}"
+            f"{stats['p99_ms']:>10}{stats['max_ms']:>10}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--host", help="адрес запущенного сервера")
+    parser.add_argument("--port", type=int, help="порт запущенного сервера")
+    parser.add_argument("--size", type=int, default=100_000, help="размер каталога")
+    parser.add_argument("--clients", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0, help="секунд")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--serve", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.serve is not None:
+        serve(args.serve)
+        return
+
+    if args.host is not None or args.port is not None:
+        report = asyncio.run(
+            run_load(
+                args.host or "127.0.0.1",
+                args.port or 8080,
+                args.size,
+                args.clients,
+                args.duration,
+                args.seed,
+            )
+        )
+        print_report(report)
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        catalogue = write_catalogue(Path(temp_dir) / "books.json", args.size)
+        # Сервер в отдельном процессе, чтобы клиенты не делили с ним GIL
+        server = subprocess.Popen(
+            [sys.executable, __file__, "--serve", str(catalogue)],
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        try:
+            port = int(server.stdout.readline())
+            report = asyncio.run(
+                run_load(
+                    "127.0.0.1",
+                    port,
+                    args.size,
+                    args.clients,
+                    args.duration,
+                    args.seed,
+                )
+            )
+        finally:
+            server.terminate()
+            server.wait()
+    print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,275 @@
+"""
+Бенчмарки LibraryService и StorageService на синтетических каталогах
+
+Для каждого размера каталога запускается отдельный процесс: каталог
+генерируется во временной директории, затем выполняются сценарии
+загрузки, добавления, поиска, изменения, удаления и сохранения.
+Результаты (операций в секунду, перцентили задержки, пиковый RSS)
+печатаются и записываются в JSON.
+
+Запуск:
+    python benchmarks/run_benchmarks.py --sizes 1000 100000 1000000
+    python benchmarks/run_benchmarks.py --compare benchmarks/results/old.json
+"""
+
+import argparse
+import json
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable
+from datetime import datetime
+from pathlib import Path
+
+from catalogue import generate_books, write_catalogue
+
+from models import BookStatus
+from services import (
+    LibraryService,
+    SegmentedStorageService,
+    SQLiteStorageService,
+    StorageService,
+)
+
+RESULTS_DIR = Path(__file__).parent / "results"
+DEFAULT_SIZES = (1_000, 100_000, 1_000_000)
+STORAGES = ("journal", "json", "sqlite", "segmented")
+SEARCH_QUERIES = ("толстой", "мир", "1869", "братья карамазовы", "ги", "нет такой")
+FUZZY_QUERIES = ("Достоевкий", "лев толстй", "братя карамазовы", "мастр маргарита")
+AUTOCOMPLETE_QUERIES = ("до", "лев т", "м", "преступ")
+
+
+def peak_rss_mb() -> float:
+    """Пиковый RSS текущего процесса в мегабайтах"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss в килобайтах на Linux и в байтах на macOS
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+def percentile(sorted_values: list[float], fraction: float) -> float:
+    """Перцентиль отсортированного списка (ближайший ранг)"""
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def measure(operation: Callable[[int], object], count: int, ops_per_call: int = 1):
+    """
+    Выполняет операцию count раз и собирает статистику
+
+    Args:
+        operation: Операция, принимающая номер вызова
+        count: Количество вызовов
+        ops_per_call: Количество логических операций в одном вызове
+
+    Returns:
+        dict: ops/sec, перцентили задержки вызова в миллисекундах, пиковый RSS
+    """
+    latencies = []
+    started = time.perf_counter()
+    for i in range(count):
+        call_started = time.perf_counter()
+        operation(i)
+        latencies.append(time.perf_counter() - call_started)
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "calls": count,
+        "ops_per_sec": round(count * ops_per_call / elapsed, 1) if elapsed else None,
+        "total_s": round(elapsed, 4),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 4),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 4),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 4),
+        "max_ms": round(latencies[-1] * 1000, 4),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def make_storage(kind: str, directory: Path, size: int):
+    """Создает хранилище с синтетическим каталогом"""
+    if kind == "sqlite":
+        storage = SQLiteStorageService(directory / "books.db")
+        storage.save_data(generate_books(size), size)
+        return storage
+    if kind == "segmented":
+        storage = SegmentedStorageService(directory / "segments")
+        storage.save_data(generate_books(size), size)
+        return storage
+    path = write_catalogue(directory / "books.json", size)
+    return StorageService(path, journal=kind == "journal")
+
+
+def run_size(size: int, ops: int, storage_kind: str, seed: int) -> dict:
+    """Выполняет все сценарии для каталога заданного размера"""
+    rng = random.Random(seed)
+    results = {}
+    with tempfile.TemporaryDirectory() as temp_dir:
+        storage = make_storage(storage_kind, Path(temp_dir), size)
+
+        holder = {}
+
+        def load(_):
+            holder["library"] = LibraryService(storage)
+
+        results["load"] = measure(load, 1)
+        library = holder["library"]
+        ops = min(ops, size)
+
+        results["get_book_by_id"] = measure(
+            lambda _: library.get_book_by_id(rng.randint(1, size)), ops
+        )
+        results["search_books"] = measure(
+            lambda i: library.search_books(SEARCH_QUERIES[i % len(SEARCH_QUERIES)]),
+            ops,
+        )
+        results["fuzzy_index_build"] = measure(
+            lambda _: library.fuzzy_search(FUZZY_QUERIES[0]), 1
+        )
+        results["fuzzy_search"] = measure(
+            lambda i: library.fuzzy_search(FUZZY_QUERIES[i % len(FUZZY_QUERIES)]),
+            ops,
+        )
+        results["autocomplete"] = measure(
+            lambda i: library.autocomplete(
+                AUTOCOMPLETE_QUERIES[i % len(AUTOCOMPLETE_QUERIES)]
+            ),
+            ops,
+        )
+        results["add_book"] = measure(
+            lambda i: library.add_book(f"Новая книга {i}", "Бенчмарк", 2000), ops
+        )
+        bulk = [(f"Пакетная книга {i}", "Бенчмарк", 2001) for i in range(ops)]
+        results["add_books"] = measure(
+            lambda _: library.add_books(bulk), 1, ops_per_call=ops
+        )
+
+        statuses = BookStatus.get_valid_statuses()
+        results["change_status"] = measure(
+            lambda i: library.change_status(
+                rng.randint(1, size), statuses[i % len(statuses)]
+            ),
+            ops,
+        )
+        to_delete = rng.sample(range(1, size + 1), ops)
+        results["delete_book"] = measure(
+            lambda i: library.delete_book(to_delete[i]), ops
+        )
+        results["save"] = measure(lambda _: library._save_books(), 3)
+        storage.close()
+
+    return {"size": size, "storage": storage_kind, "scenarios": results}
+
+
+def compare(current: list[dict], baseline_path: Path, threshold: float) -> int:
+    """
+    Сравнивает результаты с сохраненными и печатает регрессии
+
+    Returns:
+        int: количество сценариев, ставших медленнее порога
+    """
+    with open(baseline_path, encoding="utf-8") as file:
+        baseline = json.load(file)
+    baseline_runs = {(run["size"], run["storage"]): run for run in baseline["runs"]}
+
+    regressions = 0
+    for run in current:
+        old_run = baseline_runs.get((run["size"], run["storage"]))
+        if old_run is None:
+            continue
+        for name, result in run["scenarios"].items():
+            old = old_run["scenarios"].get(name)
+            if not old or not old["ops_per_sec"] or not result["ops_per_sec"]:
+                continue
+            ratio = result["ops_per_sec"] / old["ops_per_sec"]
+            if ratio < 1 - threshold:
+                regressions += 1
+                print(
+                    f"РЕГРЕССИЯ {run['size']:>9} {name:<16} "
+                    f"{old['ops_per_sec']:>12} -> {result['ops_per_sec']:>12} ops/s"
+                )
+    return regressions
+
+
+def print_run(run: dict) -> None:
+    """Печатает результаты одного размера каталога"""
+    print(f"\nКаталог {run['size']} книг, хранилище {run['storage']}")
+    print(
+        f"{'сценарий':<16} {'ops/s':>12} {'p50 мс':>10} {'p95 мс':>10} "
+        f"{'p99 мс':>10} {'RSS МБ':>8}"
+    )
+    for name, result in run["scenarios"].items():
+        print(
+            f"{name:<16} {result['ops_per_sec']:>12} {result['p50_ms']:>10} "
+            f"{result['p95_ms']:>10} {result['p99_ms']:>10} {result['peak_rss_mb']:>8}"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--ops", type=int, default=200, help="операций на сценарий")
+    parser.add_argument("--storage", choices=STORAGES, default="journal")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=Path, help="файл результатов JSON")
+    parser.add_argument("--compare", type=Path, help="результаты для сравнения")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="допустимое замедление (доля)"
+    )
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child is not None:
+        print(json.dumps(run_size(args.child, args.ops, args.storage, args.seed)))
+        return
+
+    runs = []
+    for size in args.sizes:
+        # Каждый размер в отдельном процессе, чтобы пиковый RSS не накапливался
+        output = subprocess.run(
+            [
+                sys.executable,
+                __file__,
+                "--child",
+                str(size),
+                "--ops",
+                str(args.ops),
+                "--storage",
+                args.storage,
+                "--seed",
+                str(args.seed),
+            ],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        run = json.loads(output)
+        print_run(run)
+        runs.append(run)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "ops": args.ops,
+        "runs": runs,
+    }
+    output_path = args.output or RESULTS_DIR / (
+        datetime.now().strftime("%Y%m%d-%H%M%S") + ".json"
+    )
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, "w", encoding="utf-8") as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print(f"\nРезультаты записаны в {output_path}")
+
+    if args.compare and compare(runs, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
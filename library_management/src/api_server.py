@@ -0,0 +1,312 @@
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from http import HTTPStatus
+from urllib.parse import parse_qs, urlsplit
+
+from config import API_HOST, API_PORT, API_READ_WORKERS, DISPLAY_SETTINGS
+from services import LibraryService
+
+MAX_HEADER_SIZE = 64 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+
+
+class HTTPError(Exception):
+    """Ошибка обработки запроса с HTTP-статусом"""
+
+    def __init__(self, status: HTTPStatus, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+class LibraryAPIServer:
+    """
+    HTTP/JSON API библиотеки на asyncio без внешних зависимостей
+
+    Обращения к LibraryService выполняются вне цикла событий: чтения —
+    в пуле потоков, изменения — в отдельном однопоточном исполнителе,
+    поэтому запись в хранилище не блокирует обработку других запросов.
+
+    Маршруты:
+        GET    /books?after_id=&limit=   страница книг по возрастанию ID
+        GET    /books/{id}               книга по ID
+        POST   /books                    добавить книгу {title, author, year}
+        DELETE /books/{id}               удалить книгу
+        PUT    /books/{id}/status        изменить статус {status}
+        GET    /search?q=&limit=         поиск книг (первые limit результатов)
+        GET    /search/fuzzy?q=&limit=   поиск с учетом опечаток
+        GET    /autocomplete?q=&limit=   варианты дополнения запроса
+    """
+
+    _BOOK_PATH = re.compile(r"^/books/(\d+)$")
+    _STATUS_PATH = re.compile(r"^/books/(\d+)/status$")
+
+    def __init__(self, library: LibraryService | None = None):
+        self.library = (
+            library if library is not None else LibraryService(thread_safe=True)
+        )
+        self._read_executor = ThreadPoolExecutor(
+            API_READ_WORKERS, thread_name_prefix="library-read"
+        )
+        self._write_executor = ThreadPoolExecutor(1, thread_name_prefix="library-write")
+        self._server: asyncio.AbstractServer | None = None
+        # Открытые соединения и обрабатывающие их задачи
+        self._connections: dict[asyncio.Task, asyncio.StreamWriter] = {}
+
+    async def _read(self, func, *args):
+        """Выполняет чтение в пуле потоков"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._read_executor, partial(func, *args))
+
+    async def _write(self, func, *args):
+        """Выполняет изменение в потоке записи"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._write_executor, partial(func, *args))
+
+    async def start(self, host: str = API_HOST, port: int = API_PORT) -> None:
+        """Запускает сервер"""
+        self._server = await asyncio.start_server(
+            self._handle_connection, host, port, limit=MAX_HEADER_SIZE
+        )
+
+    @property
+    def port(self) -> int:
+        """Порт, на котором слушает сервер"""
+        return self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self) -> None:
+        """Обрабатывает запросы до остановки"""
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        """Останавливает сервер и исполнители, записывает отложенные изменения"""
+        if self._server is not None:
+            self._server.close()
+            # Закрытие соединений завершает ожидающие запроса обработчики
+            for writer in self._connections.values():
+                writer.close()
+            await asyncio.gather(*self._connections, return_exceptions=True)
+            await self._server.wait_closed()
+        self._read_executor.shutdown(wait=True)
+        self._write_executor.shutdown(wait=True)
+        self.library.close()
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """Обрабатывает запросы одного соединения (с поддержкой keep-alive)"""
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except asyncio.IncompleteReadError:
+                    return
+                except asyncio.LimitOverrunError:
+                    await self._send(
+                        writer, HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE, {}, False
+                    )
+                    return
+
+                headers = {}
+                # Пока тело не прочитано, его байты нельзя отличить от
+                # следующего запроса, поэтому после ошибки соединение закрывается
+                body = None
+                try:
+                    method, target, headers = self._parse_head(head)
+                    length = int(headers.get("content-length", 0))
+                    if length < 0:
+                        raise HTTPError(
+                            HTTPStatus.BAD_REQUEST, "Некорректная длина тела"
+                        )
+                    if length > MAX_BODY_SIZE:
+                        raise HTTPError(
+                            HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "Слишком большое тело"
+                        )
+                    body = await reader.readexactly(length) if length else b""
+                    status, payload = await self._dispatch(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                except ValueError as e:
+                    status, payload = HTTPStatus.BAD_REQUEST, {"error": str(e)}
+                except Exception as e:
+                    status, payload = HTTPStatus.INTERNAL_SERVER_ERROR, {
+                        "error": str(e)
+                    }
+
+                keep_alive = (
+                    body is not None
+                    and headers.get("connection", "").lower() != "close"
+                )
+                await self._send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (ConnectionError, asyncio.IncompleteReadError):
+            return
+        finally:
+            del self._connections[task]
+            writer.close()
+
+    @staticmethod
+    def _parse_head(head: bytes) -> tuple[str, str, dict[str, str]]:
+        """Разбирает строку запроса и заголовки"""
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, _ = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Некорректная строка запроса")
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, headers
+
+    @staticmethod
+    async def _send(
+        writer: asyncio.StreamWriter, status: HTTPStatus, payload, keep_alive: bool
+    ) -> None:
+        """Отправляет JSON-ответ"""
+        body = (
+            b""
+            if payload is None
+            else json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        )
+        head = (
+            f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+            "Content-Type: application/json; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+    @staticmethod
+    def _parse_json(body: bytes) -> dict:
+        try:
+            data = json.loads(body or b"{}")
+        except json.JSONDecodeError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Тело запроса должно быть JSON")
+        if not isinstance(data, dict):
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Тело запроса должно быть объектом")
+        return data
+
+    @staticmethod
+    def _int_param(query: dict[str, list[str]], name: str, default: int | None):
+        values = query.get(name)
+        if not values:
+            return default
+        try:
+            return int(values[0])
+        except ValueError:
+            raise HTTPError(
+                HTTPStatus.BAD_REQUEST, f"Параметр {name} должен быть целым числом"
+            )
+
+    async def _dispatch(self, method: str, target: str, body: bytes):
+        """Выполняет запрос и возвращает (статус, данные ответа)"""
+        url = urlsplit(target)
+        path = url.path.rstrip("/") or "/"
+        query = parse_qs(url.query)
+
+        if path == "/books":
+            if method == "GET":
+                limit = self._int_param(query, "limit", DISPLAY_SETTINGS["page_size"])
+                if limit < 1:
+                    raise HTTPError(
+                        HTTPStatus.BAD_REQUEST,
+                        "Размер страницы должен быть положительным",
+                    )
+                after_id = self._int_param(query, "after_id", None)
+                books = await self._read(self.library.get_books_after, after_id, limit)
+                return HTTPStatus.OK, {
+                    "books": [book.to_dict() for book in books],
+                    "next_after_id": books[-1].id if len(books) == limit else None,
+                }
+            if method == "POST":
+                data = self._parse_json(body)
+                title, author = data.get("title", ""), data.get("author", "")
+                if not isinstance(title, str) or not isinstance(author, str):
+                    raise HTTPError(
+                        HTTPStatus.BAD_REQUEST, "Название и автор должны быть строками"
+                    )
+                book = await self._write(
+                    self.library.add_book, title, author, data.get("year")
+                )
+                return HTTPStatus.CREATED, book.to_dict()
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Метод не поддерживается")
+
+        if path == "/search" and method == "GET":
+            limit = self._int_param(query, "limit", DISPLAY_SETTINGS["page_size"])
+            if limit < 0:
+                raise HTTPError(
+                    HTTPStatus.BAD_REQUEST,
+                    "Размер страницы не может быть отрицательным",
+                )
+            books = await self._read(self.library.search_books, query.get("q", [""])[0])
+            return HTTPStatus.OK, {
+                "books": [book.to_dict() for book in books[:limit]],
+                "total": len(books),
+            }
+
+        if path == "/search/fuzzy" and method == "GET":
+            limit = self._int_param(query, "limit", DISPLAY_SETTINGS["page_size"])
+            books = await self._read(
+                self.library.fuzzy_search, query.get("q", [""])[0], None, limit
+            )
+            return HTTPStatus.OK, {"books": [book.to_dict() for book in books]}
+
+        if path == "/autocomplete" and method == "GET":
+            limit = self._int_param(query, "limit", 10)
+            suggestions = await self._read(
+                self.library.autocomplete, query.get("q", [""])[0], limit
+            )
+            return HTTPStatus.OK, {"suggestions": suggestions}
+
+        match = self._BOOK_PATH.match(path)
+        if match:
+            book_id = int(match.group(1))
+            if method == "GET":
+                book = await self._read(self.library.get_book_by_id, book_id)
+                if book is None:
+                    raise HTTPError(HTTPStatus.NOT_FOUND, "Книга не найдена")
+                return HTTPStatus.OK, book.to_dict()
+            if method == "DELETE":
+                if not await self._write(self.library.delete_book, book_id):
+                    raise HTTPError(HTTPStatus.NOT_FOUND, "Книга не найдена")
+                return HTTPStatus.NO_CONTENT, None
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED, "Метод не поддерживается")
+
+        match = self._STATUS_PATH.match(path)
+        if match and method == "PUT":
+            data = self._parse_json(body)
+            book = await self._write(
+                self.library.change_status, int(match.group(1)), data.get("status")
+            )
+            if book is None:
+                raise HTTPError(HTTPStatus.NOT_FOUND, "Книга не найдена")
+            return HTTPStatus.OK, book.to_dict()
+
+        raise HTTPError(HTTPStatus.NOT_FOUND, "Маршрут не найден")
+
+
+async def main(host: str = API_HOST, port: int = API_PORT) -> None:
+    server = LibraryAPIServer()
+    await server.start(host, port)
+    print(f"API библиотеки: http://{host}:{server.port}")
+    try:
+        await server.serve_forever()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
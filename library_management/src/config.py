@@ -5,6 +5,9 @@ SRC_DIR = PROJECT_ROOT / "src"
 DATA_DIR = PROJECT_ROOT / "data"
 
 BOOKS_FILE = DATA_DIR / "books.json"
+SQLITE_FILE = DATA_DIR / "books.db"
+BINARY_FILE = DATA_DIR / "books.bin"
+SEGMENTS_DIR = DATA_DIR / "segments"
 
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 
@@ -14,4 +17,64 @@ DISPLAY_SETTINGS = {
     "author_width": 30,
     "year_width": 6,
     "status_width": 15,
+    "page_size": 20,
 }
+
+# Журнальный режим хранилища: изменения дописываются в журнал,
+# который сворачивается в снимок books.json после JOURNAL_COMPACT_THRESHOLD записей,
+# если размер журнала достиг JOURNAL_COMPACT_RATIO от размера снимка
+STORAGE_JOURNAL = False
+JOURNAL_COMPACT_THRESHOLD = 1000
+JOURNAL_COMPACT_RATIO = 0.5
+
+# Хранилище книг: "json" (StorageService), "binary" (BinaryStorageService),
+# "sqlite" (SQLiteStorageService) или "segmented" (SegmentedStorageService)
+STORAGE_BACKEND = "json"
+
+# Число ID в одном файле сегмента SegmentedStorageService: точечная запись
+# переписывает только сегменты с измененными книгами
+SEGMENT_SIZE = 2_000
+
+# Параллельная загрузка и поиск по сегментам (services.parallel_segments):
+# число процессов (1 — без пула процессов) и размер каталога, начиная с которого
+# пул запускается; для меньших каталогов запуск процессов дороже выигрыша
+PARALLEL_WORKERS = 1
+PARALLEL_MIN_BOOKS = 100_000
+
+# Хранить книги в памяти по колонкам (ColumnarBookStore) вместо словаря объектов Book
+COLUMNAR_STORE = False
+
+# Загружать из хранилищ, быстро читающих книги по ID (SQLite), только ID и ключи
+# книг (LazyBookStore): книги читаются при обращении, индексы — при первом запросе
+LAZY_LOAD = True
+
+# Сбор метрик длительности операций (utils.metrics); можно включить во время работы
+METRICS_ENABLED = False
+
+# Потокобезопасный режим LibraryService (блокировка читателей/писателей)
+THREAD_SAFE = False
+
+# Межпроцессная блокировка файлов хранилища и проверка изменений другими процессами.
+# Перед чтением изменения проверяются не чаще раза в RELOAD_CHECK_INTERVAL секунд
+# (0 — перед каждым чтением, None — только перед изменениями)
+FILE_LOCKING = True
+RELOAD_CHECK_INTERVAL = 1.0
+
+# Отложенная запись: изменения сохраняет фоновый поток, объединяя все изменения
+# за WRITE_BEHIND_MAX_STALENESS секунд в одну запись; требует FILE_LOCKING = False
+WRITE_BEHIND = False
+WRITE_BEHIND_MAX_STALENESS = 1.0
+
+# Кэш результатов поиска: число запросов (0 — выключен) и суммарное число ID в результатах
+SEARCH_CACHE_SIZE = 256
+SEARCH_CACHE_MAX_IDS = 1_000_000
+
+# Импорт и экспорт CSV/NDJSON (services.bulk_io): строк в части (одно сохранение
+# на часть) и число ошибок, сохраняемых в итогах
+TRANSFER_CHUNK_SIZE = 10_000
+TRANSFER_MAX_REPORTED_ERRORS = 100
+
+# HTTP API (api_server.py): адрес, порт и число потоков для операций чтения
+API_HOST = "127.0.0.1"
+API_PORT = 8080
+API_READ_WORKERS = 4
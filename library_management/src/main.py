@@ -1,5 +1,8 @@
+import sys
+from collections.abc import Callable
 from functools import wraps
 from services import LibraryService
+from services.bulk_io import TransferStats, export_books, import_books
 from models import BookStatus, Book
 from config import DISPLAY_SETTINGS
 
@@ -20,7 +23,7 @@ def check_library_not_empty(func):
 
     @wraps(func)
     def wrapper(self, *args, **kwargs):
-        if not self.library.get_all_books():
+        if not self.library.count_books():
             print(
                 f"\n{Colors.YELLOW}Библиотека пуста. Сначала добавьте книги.{Colors.END}"
             )
@@ -40,6 +43,8 @@ class LibraryConsoleApp:
             "4": ("Показать все книги", self.show_all_books),
             "5": ("Изменить статус книги", self.change_book_status),
             "6": ("Добавить тестовые (моковые) данные", self.add_sample_data),
+            "7": ("Импорт книг из CSV/NDJSON", self.import_books),
+            "8": ("Экспорт книг в CSV/NDJSON", self.export_books),
             "0": ("Выход", exit),
         }
 
@@ -90,20 +95,60 @@ class LibraryConsoleApp:
         books = self.library.search_books(query)
 
         if not books:
-            print(f"\n{Colors.YELLOW}Книги не найдены{Colors.END}")
-            return
+            books = self.library.fuzzy_search(query)
+            if not books:
+                print(f"\n{Colors.YELLOW}Книги не найдены{Colors.END}")
+                return
+            print(
+                f"\n{Colors.YELLOW}Точных совпадений нет, "
+                f"похожие книги:{Colors.END}"
+            )
 
-        self._display_books(books)
+        page_size = DISPLAY_SETTINGS["page_size"]
+        self._page_books(
+            lambda page: books[page * page_size : (page + 1) * page_size], len(books)
+        )
 
     def show_all_books(self):
         """Отображение всех книг"""
-        books = self.library.get_all_books()
+        # Страницы берутся из одного снимка, поэтому не сдвигаются,
+        # если библиотеку изменят во время просмотра
+        snapshot = self.library.snapshot()
 
-        if not books:
+        if not snapshot:
             print(f"\n{Colors.YELLOW}Библиотека пуста{Colors.END}")
             return
 
-        self._display_books(books)
+        page_size = DISPLAY_SETTINGS["page_size"]
+        self._page_books(
+            lambda page: snapshot.page(page * page_size, page_size), len(snapshot)
+        )
+
+    def _page_books(self, fetch_page: Callable[[int], list[Book]], total: int):
+        """
+        Постраничный вывод книг
+
+        Args:
+            fetch_page: Функция, возвращающая книги страницы по ее номеру
+            total: Общее количество книг
+        """
+        page_size = DISPLAY_SETTINGS["page_size"]
+        pages = (total + page_size - 1) // page_size
+        page = 0
+        while True:
+            books = fetch_page(page)
+            if not books:
+                return
+            self._display_books(books, f"Список книг (стр. {page + 1} из {pages})")
+            if page + 1 >= pages:
+                return
+
+            answer = self.get_input(
+                "Enter - следующая страница, q - вернуться в меню"
+            ).lower()
+            if answer in ("q", "й"):
+                return
+            page += 1
 
     @check_library_not_empty
     def change_book_status(self):
@@ -159,8 +204,8 @@ class LibraryConsoleApp:
             return text
         return text[: max_length - 3] + "..."
 
-    def _display_books(self, books: list["Book"]):
-        """Отображение списка книг"""
+    def _display_books(self, books: list["Book"], title: str = "Список книг"):
+        """Отображение списка книг одной записью в stdout"""
         # Используем настройки из конфига для определения ширины колонок
         id_width = DISPLAY_SETTINGS["id_width"]
         title_width = DISPLAY_SETTINGS["title_width"]
@@ -168,7 +213,6 @@ class LibraryConsoleApp:
         year_width = DISPLAY_SETTINGS["year_width"]
         status_width = DISPLAY_SETTINGS["status_width"]
 
-        print(f"\n{Colors.BOLD}Список книг:{Colors.END}")
         header = (
             f"{'ID':^{id_width}} | "
             f"{'Название':^{title_width}} | "
@@ -176,25 +220,28 @@ class LibraryConsoleApp:
             f"{'Год':^{year_width}} | "
             f"{'Статус':^{status_width}}"
         )
-        separator = "-" * len(header)
-
-        print(Colors.BLUE + separator + Colors.END)
-        print(Colors.BOLD + header + Colors.END)
-        print(Colors.BLUE + separator + Colors.END)
+        separator = Colors.BLUE + "-" * len(header) + Colors.END
 
+        lines = [
+            f"\n{Colors.BOLD}{title}:{Colors.END}",
+            separator,
+            Colors.BOLD + header + Colors.END,
+            separator,
+        ]
         for book in books:
             # Форматируем каждое поле с учетом максимальной длины
-            title = self._truncate_text(book.title, title_width)
+            book_title = self._truncate_text(book.title, title_width)
             author = self._truncate_text(book.author, author_width)
 
-            print(
+            lines.append(
                 f"{book.id:^{id_width}} | "
-                f"{title:^{title_width}} | "
+                f"{book_title:^{title_width}} | "
                 f"{author:^{author_width}} | "
                 f"{book.year:^{year_width}} | "
                 f"{book.status.value:^{status_width}}"
             )
-        print(Colors.BLUE + separator + Colors.END)
+        lines.append(separator)
+        sys.stdout.write("\n".join(lines) + "\n")
 
     def add_sample_data(self):
         """Добавление тестовых данных в библиотеку"""
@@ -215,16 +262,15 @@ class LibraryConsoleApp:
             added_count = 0
             print(f"\n{Colors.BLUE}Добавление тестовых данных...{Colors.END}")
 
-            for title, author, year in sample_books:
-                try:
-                    self.library.add_book(title, author, year)
-                    added_count += 1
-                    print(f"{Colors.GREEN}Добавлена книга '{title}'{Colors.END}")
-                except ValueError as e:
+            results = self.library.add_books(sample_books)
+            for (title, _, _), (book, error) in zip(sample_books, results):
+                if book is None:
                     print(
-                        f"{Colors.YELLOW}Пропущена книга '{title}': {str(e)}{Colors.END}"
+                        f"{Colors.YELLOW}Пропущена книга '{title}': {error}{Colors.END}"
                     )
                     continue
+                added_count += 1
+                print(f"{Colors.GREEN}Добавлена книга '{title}'{Colors.END}")
 
             if added_count > 0:
                 print(
@@ -240,6 +286,53 @@ class LibraryConsoleApp:
                 f"\n{Colors.RED}Ошибка при добавлении тестовых данных: {str(e)}{Colors.END}"
             )
 
+    @staticmethod
+    def _print_progress(stats: TransferStats):
+        """Печатает ход импорта или экспорта в одной строке"""
+        sys.stdout.write(
+            f"\r{Colors.BLUE}Обработано строк: {stats.rows} "
+            f"({stats.rows_per_second:,.0f} строк/с){Colors.END}"
+        )
+        sys.stdout.flush()
+
+    def import_books(self):
+        """Импорт книг из файла CSV или NDJSON"""
+        path = self.get_input("Введите путь к файлу (.csv, .ndjson)")
+        try:
+            stats = import_books(self.library, path, progress=self._print_progress)
+        except (OSError, ValueError) as e:
+            print(f"\n{Colors.RED}Ошибка импорта: {str(e)}{Colors.END}")
+            return
+
+        print(
+            f"\n{Colors.GREEN}Импортировано книг: {stats.succeeded} из {stats.rows} "
+            f"за {stats.seconds:.1f} с ({stats.rows_per_second:,.0f} строк/с){Colors.END}"
+        )
+        if stats.failed:
+            print(f"{Colors.YELLOW}Строк с ошибками: {stats.failed}{Colors.END}")
+            for line, error in stats.errors:
+                print(f"{Colors.YELLOW}  строка {line}: {error}{Colors.END}")
+            if stats.failed > len(stats.errors):
+                print(
+                    f"{Colors.YELLOW}  ... и еще "
+                    f"{stats.failed - len(stats.errors)}{Colors.END}"
+                )
+
+    @check_library_not_empty
+    def export_books(self):
+        """Экспорт книг в файл CSV или NDJSON"""
+        path = self.get_input("Введите путь к файлу (.csv, .ndjson)")
+        try:
+            stats = export_books(self.library, path, progress=self._print_progress)
+        except (OSError, ValueError) as e:
+            print(f"\n{Colors.RED}Ошибка экспорта: {str(e)}{Colors.END}")
+            return
+
+        print(
+            f"\n{Colors.GREEN}Выгружено книг: {stats.succeeded} "
+            f"за {stats.seconds:.1f} с ({stats.rows_per_second:,.0f} строк/с){Colors.END}"
+        )
+
     def run(self):
         """Запуск приложения"""
         while True:
@@ -1,4 +1,4 @@
-from .book import Book
+from .book import Book, normalize_author, normalize_text
 from .book_status import BookStatus
 
-__all__ = ["Book", "BookStatus"]
+__all__ = ["Book", "BookStatus", "normalize_author", "normalize_text"]
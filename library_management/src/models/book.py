@@ -1,18 +1,50 @@
-from dataclasses import dataclass
+import sys
+from dataclasses import dataclass, field
+from functools import lru_cache
 from .book_status import BookStatus
 
 
-@dataclass
+def normalize_text(text: str) -> str:
+    """
+    Нормализует строку для поиска и сравнения
+
+    Приводит к нижнему регистру (casefold), заменяет «ё» на «е» и
+    схлопывает пробельные символы в один пробел без пробелов по краям.
+    """
+    return " ".join(text.casefold().replace("ё", "е").split())
+
+
+@lru_cache(maxsize=65536)
+def normalize_author(author: str) -> str:
+    """
+    normalize_text для имен авторов с кэшем
+
+    Авторы повторяются, поэтому их ключи вычисляются один раз и
+    разделяются книгами.
+    """
+    return normalize_text(author)
+
+
+@dataclass(slots=True)
 class Book:
     """
     Модель книги в библиотеке
 
+    Экземпляры не имеют __dict__, а строки авторов интернируются,
+    поэтому книги одного автора ссылаются на одну строку.
+
+    Нормализованные ключи названия и автора (см. normalize_text)
+    вычисляются один раз при создании книги и используются поиском и
+    проверкой дубликатов; в словарь (to_dict) они не попадают.
+
     Attributes:
         id (int): Уникальный идентификатор книги
         title (str): Название книги
         author (str): Автор книги
         year (int): Год издания
         status (BookStatus): Статус книги
+        title_key (str): Нормализованное название
+        author_key (str): Нормализованный автор
     """
 
     id: int | None = None
@@ -20,6 +52,16 @@ class Book:
     author: str = ""
     year: int = 0
     status: BookStatus = BookStatus.AVAILABLE
+    title_key: str = field(init=False, repr=False, compare=False)
+    author_key: str = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        if type(self.author) is str:
+            self.author = sys.intern(self.author)
+        self.author_key = normalize_author(self.author)
+        title_key = normalize_text(self.title)
+        # Уже нормализованное название не хранится второй раз
+        self.title_key = self.title if title_key == self.title else title_key
 
     def to_dict(self) -> dict:
         """Преобразует объект книги в словарь"""
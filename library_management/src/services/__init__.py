@@ -1,4 +1,16 @@
 from .library_service import LibraryService
-from .storage_service import StorageService
+from .storage_service import BaseStorageService, StorageService
+from .sqlite_storage_service import SQLiteStorageService
+from .binary_storage_service import BinaryStorageService
+from .segmented_storage_service import SegmentedStorageService
+from .storage_factory import create_storage
 
-__all__ = ["LibraryService", "StorageService"]
+__all__ = [
+    "LibraryService",
+    "BaseStorageService",
+    "StorageService",
+    "SQLiteStorageService",
+    "BinaryStorageService",
+    "SegmentedStorageService",
+    "create_storage",
+]
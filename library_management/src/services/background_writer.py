@@ -0,0 +1,78 @@
+import atexit
+import threading
+from collections.abc import Callable
+from time import monotonic
+
+
+class BackgroundWriter:
+    """
+    Фоновый поток отложенной записи
+
+    mark_dirty() отмечает несохраненные изменения. Не позднее чем через
+    max_staleness секунд после первого из них поток один раз вызывает
+    write_func, которая записывает все накопленные к этому моменту
+    изменения. Если запись завершилась ошибкой, она повторяется через
+    следующий интервал. При завершении интерпретатора вызывается close(),
+    записывающий остаток.
+    """
+
+    def __init__(
+        self,
+        write_func: Callable[[], None],
+        max_staleness: float,
+        name: str = "library-writer",
+    ):
+        self._write_func = write_func
+        self.max_staleness = max_staleness
+        self._condition = threading.Condition()
+        self._dirty_since: float | None = None
+        self._closed = False
+        # Количество фоновых записей и последняя ошибка фоновой записи
+        self.writes = 0
+        self.last_error: Exception | None = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def mark_dirty(self) -> None:
+        """Отмечает изменения, которые нужно записать"""
+        with self._condition:
+            if self._dirty_since is None:
+                self._dirty_since = monotonic()
+                self._condition.notify()
+
+    def _wait_until_due(self) -> bool:
+        """Ждет, пока изменения устареют; False — поток остановлен"""
+        with self._condition:
+            while not self._closed:
+                if self._dirty_since is None:
+                    self._condition.wait()
+                    continue
+                remaining = self._dirty_since + self.max_staleness - monotonic()
+                if remaining <= 0:
+                    self._dirty_since = None
+                    return True
+                self._condition.wait(remaining)
+            return False
+
+    def _run(self) -> None:
+        while self._wait_until_due():
+            try:
+                self._write_func()
+            except Exception as e:
+                self.last_error = e
+                self.mark_dirty()
+            else:
+                self.writes += 1
+
+    def close(self) -> None:
+        """Останавливает поток и записывает оставшиеся изменения"""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+        atexit.unregister(self.close)
+        self._dirty_since = None
+        self._write_func()
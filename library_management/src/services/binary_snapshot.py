@@ -0,0 +1,188 @@
+import struct
+import sys
+from array import array
+from collections.abc import Iterable, Iterator
+from itertools import accumulate
+from typing import BinaryIO
+
+from services.storage_service import StorageCorruptedError
+
+MAGIC = b"LIBB"
+VERSION = 1
+
+# Заголовок: сигнатура, версия, флаги (зарезервированы), последний ID, число книг
+_HEADER = struct.Struct("<4sHHqI")
+# Заголовок таблицы строк: число строк, флаги, длина UTF-8 данных в байтах
+_STRINGS_HEADER = struct.Struct("<IBQ")
+# Строки разделены символом NUL; иначе перед данными идут длины строк в символах
+_STRINGS_SEPARATED = 1
+_SEPARATOR = "\x00"
+
+_SWAP_BYTES = sys.byteorder == "big"
+
+
+def _column_bytes(column: array) -> bytes:
+    """Байты колонки в порядке little-endian"""
+    if _SWAP_BYTES:
+        column = array(column.typecode, column)
+        column.byteswap()
+    return column.tobytes()
+
+
+def _write_strings(file: BinaryIO, strings: list[str]) -> None:
+    """
+    Записывает таблицу строк
+
+    Строки записываются одним блоком UTF-8 через разделитель NUL, который
+    читается одним вызовом split. Если разделитель встречается в строках,
+    перед блоком без разделителей записываются длины строк.
+    """
+    text = _SEPARATOR.join(strings)
+    if text.count(_SEPARATOR) == max(len(strings) - 1, 0):
+        data = text.encode("utf-8")
+        file.write(_STRINGS_HEADER.pack(len(strings), _STRINGS_SEPARATED, len(data)))
+    else:
+        data = "".join(strings).encode("utf-8")
+        file.write(_STRINGS_HEADER.pack(len(strings), 0, len(data)))
+        file.write(_column_bytes(array("I", map(len, strings))))
+    file.write(data)
+
+
+def write_snapshot(file: BinaryIO, books: Iterable[dict], last_id: int) -> None:
+    """
+    Записывает книги в двоичный снимок
+
+    Книги хранятся по колонкам: ID, годы, номера статусов (байт) и
+    номера авторов в таблицах строк, названия — отдельной таблицей
+    строк. Все числа записываются в порядке little-endian.
+
+    Args:
+        file: Файл, открытый на запись в двоичном режиме
+        books: Книги
+        last_id: Последний использованный ID
+    """
+    ids = array("q")
+    years = array("i")
+    status_refs = array("B")
+    author_refs = array("I")
+    titles = []
+    authors: dict[str, int] = {}
+    statuses: dict[str, int] = {}
+
+    for book in books:
+        ids.append(book["id"])
+        years.append(book["year"])
+        titles.append(book["title"])
+        author_refs.append(authors.setdefault(book["author"], len(authors)))
+        status_refs.append(statuses.setdefault(book["status"], len(statuses)))
+
+    file.write(_HEADER.pack(MAGIC, VERSION, 0, last_id, len(ids)))
+    _write_strings(file, list(authors))
+    _write_strings(file, list(statuses))
+    for column in (ids, years, status_refs, author_refs):
+        file.write(_column_bytes(column))
+    _write_strings(file, titles)
+
+
+class _Reader:
+    """Последовательное чтение колонок и таблиц строк из буфера снимка"""
+
+    def __init__(self, data: bytes):
+        self._view = memoryview(data)
+        self._offset = 0
+
+    def unpack(self, layout: struct.Struct) -> tuple:
+        end = self._offset + layout.size
+        if end > len(self._view):
+            raise StorageCorruptedError("Двоичный снимок обрезан")
+        values = layout.unpack(self._view[self._offset : end])
+        self._offset = end
+        return values
+
+    def column(self, typecode: str, count: int) -> array:
+        column = array(typecode)
+        end = self._offset + column.itemsize * count
+        if end > len(self._view):
+            raise StorageCorruptedError("Двоичный снимок обрезан")
+        column.frombytes(self._view[self._offset : end])
+        if _SWAP_BYTES:
+            column.byteswap()
+        self._offset = end
+        return column
+
+    def strings(self) -> list[str]:
+        count, flags, size = self.unpack(_STRINGS_HEADER)
+        lengths = None if flags & _STRINGS_SEPARATED else self.column("I", count)
+        end = self._offset + size
+        if end > len(self._view):
+            raise StorageCorruptedError("Двоичный снимок обрезан")
+        try:
+            text = str(self._view[self._offset : end], "utf-8")
+        except UnicodeDecodeError as e:
+            raise StorageCorruptedError(f"Двоичный снимок поврежден: {e}") from e
+        self._offset = end
+
+        if lengths is None:
+            strings = text.split(_SEPARATOR) if count else []
+            if len(strings) != count:
+                raise StorageCorruptedError(
+                    "Двоичный снимок поврежден: неверное число строк"
+                )
+            return strings
+
+        offsets = list(accumulate(lengths, initial=0))
+        if offsets[-1] != len(text):
+            raise StorageCorruptedError("Двоичный снимок поврежден: неверные длины")
+        return [text[start:stop] for start, stop in zip(offsets, offsets[1:])]
+
+
+def read_snapshot(data: bytes) -> tuple[Iterator[dict], int]:
+    """
+    Разбирает двоичный снимок
+
+    Колонки разбираются сразу, словари книг создаются по мере итерации.
+
+    Args:
+        data: Содержимое файла снимка
+
+    Returns:
+        tuple[Iterator[dict], int]: (книги в порядке записи, последний ID)
+
+    Raises:
+        StorageCorruptedError: если данные не являются снимком поддерживаемой
+            версии или повреждены
+    """
+    reader = _Reader(data)
+    magic, version, _, last_id, count = reader.unpack(_HEADER)
+    if magic != MAGIC:
+        raise StorageCorruptedError("Файл не является двоичным снимком библиотеки")
+    if version > VERSION:
+        raise StorageCorruptedError(f"Неподдерживаемая версия снимка: {version}")
+
+    authors = reader.strings()
+    statuses = reader.strings()
+    ids = reader.column("q", count)
+    years = reader.column("i", count)
+    status_refs = reader.column("B", count)
+    author_refs = reader.column("I", count)
+    titles = reader.strings()
+    if len(titles) != count:
+        raise StorageCorruptedError("Двоичный снимок поврежден: неверное число книг")
+    if max(author_refs, default=-1) >= len(authors) or max(
+        status_refs, default=-1
+    ) >= len(statuses):
+        raise StorageCorruptedError("Двоичный снимок поврежден: неверные ссылки")
+
+    books = (
+        {
+            "id": book_id,
+            "title": title,
+            "author": authors[author_ref],
+            "year": year,
+            "status": statuses[status_ref],
+        }
+        for book_id, title, author_ref, year, status_ref in zip(
+            ids, titles, author_refs, years, status_refs
+        )
+    )
+    return books, last_id
@@ -0,0 +1,212 @@
+from bisect import bisect_left, bisect_right, insort
+from collections.abc import Callable, Iterable, Iterator, Mapping
+
+from models import Book, BookStatus, normalize_text
+
+
+class BookIndexes:
+    """
+    Вторичные индексы книг для структурированных запросов
+
+    - год: корзины ID по году и отсортированный список годов, диапазон
+      лет находится через bisect;
+    - автор: корзины ID по нормализованному автору (Book.author_key);
+    - статус: корзины ID по статусу;
+    - начало названия: отсортированные нормализованные названия с ID.
+      Этот индекс строится при первом запросе по началу названия и затем
+      обновляется при изменениях.
+
+    Планировщик (plan) оценивает число кандидатов по каждому заданному
+    условию и выбирает самый избирательный индекс; все условия затем
+    проверяет функция из make_filter.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        """Очищает индексы"""
+        self._by_year: dict[int, set[int]] = {}
+        self._years: list[int] = []
+        self._by_author: dict[str, set[int]] = {}
+        self._by_status: dict[BookStatus, set[int]] = {}
+        self._titles: list[str] | None = None
+        self._title_ids: list[int] | None = None
+
+    @staticmethod
+    def author_key(author: str) -> str:
+        """Ключ автора, по которому выполняется точное сравнение"""
+        return normalize_text(author)
+
+    @staticmethod
+    def title_key(title: str) -> str:
+        """Ключ названия, по которому выполняется сравнение начала"""
+        return normalize_text(title)
+
+    @staticmethod
+    def prefix_key(prefix: str) -> str:
+        """Ключ начала названия (пробел в конце значим)"""
+        key = normalize_text(prefix)
+        if key and prefix[-1:].isspace():
+            key += " "
+        return key
+
+    @staticmethod
+    def _add_to_bucket(buckets: dict, key, book_id: int) -> bool:
+        """Добавляет ID в корзину, возвращает True, если корзина создана"""
+        bucket = buckets.get(key)
+        if bucket is None:
+            buckets[key] = {book_id}
+            return True
+        bucket.add(book_id)
+        return False
+
+    @staticmethod
+    def _remove_from_bucket(buckets: dict, key, book_id: int) -> bool:
+        """Удаляет ID из корзины, возвращает True, если корзина опустела"""
+        bucket = buckets.get(key)
+        if bucket is None:
+            return False
+        bucket.discard(book_id)
+        if bucket:
+            return False
+        del buckets[key]
+        return True
+
+    def add(self, book: Book) -> None:
+        """Добавляет книгу в индексы"""
+        if self._add_to_bucket(self._by_year, book.year, book.id):
+            insort(self._years, book.year)
+        self._add_to_bucket(self._by_author, book.author_key, book.id)
+        self._add_to_bucket(self._by_status, book.status, book.id)
+        if self._titles is not None:
+            key = book.title_key
+            position = bisect_right(self._titles, key)
+            self._titles.insert(position, key)
+            self._title_ids.insert(position, book.id)
+
+    def remove(self, book: Book) -> None:
+        """Удаляет книгу из индексов"""
+        if self._remove_from_bucket(self._by_year, book.year, book.id):
+            del self._years[bisect_left(self._years, book.year)]
+        self._remove_from_bucket(self._by_author, book.author_key, book.id)
+        self._remove_from_bucket(self._by_status, book.status, book.id)
+        if self._titles is not None:
+            key = book.title_key
+            position = bisect_left(self._titles, key)
+            # Среди одинаковых названий ищем запись этой книги
+            while self._title_ids[position] != book.id:
+                position += 1
+            del self._titles[position]
+            del self._title_ids[position]
+
+    def update_status(
+        self, book_id: int, old_status: BookStatus, new_status: BookStatus
+    ) -> None:
+        """Переносит книгу в корзину нового статуса"""
+        self._remove_from_bucket(self._by_status, old_status, book_id)
+        self._add_to_bucket(self._by_status, new_status, book_id)
+
+    def _build_title_index(self, books: Iterable[Book]) -> None:
+        """Строит индекс начала названия по всем книгам"""
+        entries = sorted((book.title_key, book.id) for book in books)
+        # Индекс может строиться параллельно несколькими читателями: признак
+        # готовности (_titles) присваивается последним
+        self._title_ids = [book_id for _, book_id in entries]
+        self._titles = [key for key, _ in entries]
+
+    def _year_range(self, year_from: int | None, year_to: int | None) -> list[int]:
+        """Годы из индекса, попадающие в диапазон (границы включаются)"""
+        start = 0 if year_from is None else bisect_left(self._years, year_from)
+        end = (
+            len(self._years) if year_to is None else bisect_right(self._years, year_to)
+        )
+        return self._years[start:end]
+
+    def _title_range(self, prefix: str) -> tuple[int, int]:
+        """Позиции названий, начинающихся с prefix"""
+        start = bisect_left(self._titles, prefix)
+        # Все строки с этим началом меньше prefix + максимальный символ
+        end = bisect_left(self._titles, prefix + "\U0010ffff", start)
+        return start, end
+
+    def plan(
+        self,
+        books: Mapping[int, Book],
+        author: str | None = None,
+        status: BookStatus | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        title_prefix: str | None = None,
+    ) -> tuple[str, int, Iterator[int]] | None:
+        """
+        Выбирает индекс с наименьшим числом кандидатов
+
+        Args:
+            books: Все книги (для построения индекса начала названия)
+            author: Автор
+            status: Статус
+            year_from: Минимальный год
+            year_to: Максимальный год
+            title_prefix: Начало названия
+
+        Returns:
+            tuple[str, int, Iterator[int]] | None: (название индекса,
+                число кандидатов, ID кандидатов) или None, если условий нет
+        """
+        options = []
+        if author is not None:
+            bucket = self._by_author.get(self.author_key(author), ())
+            options.append((len(bucket), "author", lambda ids=bucket: iter(ids)))
+        if status is not None:
+            bucket = self._by_status.get(status, ())
+            options.append((len(bucket), "status", lambda ids=bucket: iter(ids)))
+        if year_from is not None or year_to is not None:
+            years = self._year_range(year_from, year_to)
+            count = sum(len(self._by_year[year]) for year in years)
+            options.append(
+                (
+                    count,
+                    "year",
+                    lambda: (i for year in years for i in self._by_year[year]),
+                )
+            )
+        if title_prefix is not None:
+            if self._titles is None:
+                self._build_title_index(books.values())
+            start, end = self._title_range(self.prefix_key(title_prefix))
+            options.append(
+                (end - start, "title", lambda: iter(self._title_ids[start:end]))
+            )
+
+        if not options:
+            return None
+        count, name, candidates = min(options, key=lambda option: option[0])
+        return name, count, candidates()
+
+    def make_filter(
+        self,
+        author: str | None = None,
+        status: BookStatus | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        title_prefix: str | None = None,
+    ) -> Callable[[Book], bool]:
+        """Возвращает проверку книги на соответствие всем условиям"""
+        author_key = None if author is None else self.author_key(author)
+        prefix_key = None if title_prefix is None else self.prefix_key(title_prefix)
+
+        def matches(book: Book) -> bool:
+            if author_key is not None and book.author_key != author_key:
+                return False
+            if status is not None and book.status != status:
+                return False
+            if year_from is not None and book.year < year_from:
+                return False
+            if year_to is not None and book.year > year_to:
+                return False
+            if prefix_key is not None and not book.title_key.startswith(prefix_key):
+                return False
+            return True
+
+        return matches
@@ -0,0 +1,158 @@
+from bisect import bisect_right
+from collections.abc import Iterator
+from itertools import chain, islice
+
+from models import Book
+
+
+class BookSnapshot:
+    """
+    Неизменяемый снимок книг библиотеки на момент создания
+
+    Снимок разделяет части (chunks) с BookSequence и не копирует книги:
+    последующие изменения библиотеки создают новые части, не затрагивая
+    уже выданные снимки. Перебор снимка не требует блокировок и не видит
+    изменений, сделанных после его создания.
+
+    Attributes:
+        version (int): Версия данных библиотеки, с которой снят снимок
+    """
+
+    __slots__ = ("_chunks", "_length", "version")
+
+    def __init__(self, chunks: list[list[Book]], length: int, version: int):
+        self._chunks = chunks
+        self._length = length
+        self.version = version
+
+    def __iter__(self) -> Iterator[Book]:
+        return chain.from_iterable(self._chunks)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def page(self, offset: int = 0, limit: int = 20) -> list[Book]:
+        """
+        Возвращает страницу книг в порядке добавления
+
+        Части до смещения пропускаются целиком, поэтому стоимость
+        пропорциональна числу частей, а не смещению.
+        """
+        chunks = iter(self._chunks)
+        for chunk in chunks:
+            if offset < len(chunk):
+                return list(islice(chain(chunk[offset:], *chunks), limit))
+            offset -= len(chunk)
+        return []
+
+
+class BookSequence:
+    """
+    Книги в порядке добавления с дешевыми неизменяемыми снимками
+
+    Книги хранятся частями по CHUNK_SIZE. Снимок (snapshot) ссылается на
+    текущий список частей за O(1); после снимка изменяемая часть и список
+    частей копируются при первом изменении (копирование при записи),
+    поэтому запись стоит O(CHUNK_SIZE + число частей), а не O(n).
+
+    Пока ID добавляются по возрастанию (как их выдает LibraryService),
+    часть книги ищется бинарным поиском по первым ID частей; при
+    нарушении порядка строится словарь ID -> номер части. Части,
+    опустевшие после удалений, остаются на месте, чтобы номера частей
+    не менялись.
+    """
+
+    CHUNK_SIZE = 512
+
+    def __init__(self):
+        self._chunks: list[list[Book]] = []
+        # Первый ID, добавленный в каждую часть (границы для бинарного поиска)
+        self._first_ids: list[int] = []
+        # Словарь ID -> номер части, если ID добавлялись не по возрастанию
+        self._chunk_of: dict[int, int] | None = None
+        self._last_id: int | None = None
+        self._length = 0
+        # Список частей и части, созданные после последнего снимка:
+        # их можно изменять на месте
+        self._chunks_owned = True
+        self._owned: set[int] = set()
+
+    def __len__(self) -> int:
+        return self._length
+
+    def snapshot(self, version: int) -> BookSnapshot:
+        """Возвращает снимок текущего состояния за O(1)"""
+        self._chunks_owned = False
+        self._owned.clear()
+        return BookSnapshot(self._chunks, self._length, version)
+
+    def _writable_chunk(self, index: int) -> list[Book]:
+        """Возвращает часть, которую можно изменять, копируя ее при необходимости"""
+        if not self._chunks_owned:
+            self._chunks = list(self._chunks)
+            self._chunks_owned = True
+        if index not in self._owned:
+            self._chunks[index] = list(self._chunks[index])
+            self._owned.add(index)
+        return self._chunks[index]
+
+    def _find_chunk(self, book_id: int) -> int | None:
+        """Возвращает номер части, в которую добавлялась книга"""
+        if self._chunk_of is not None:
+            return self._chunk_of.get(book_id)
+        index = bisect_right(self._first_ids, book_id) - 1
+        return index if index >= 0 else None
+
+    def append(self, book: Book) -> None:
+        """Добавляет книгу в конец"""
+        if self._chunk_of is None and self._last_id is not None:
+            if book.id <= self._last_id:
+                self._chunk_of = {
+                    chunk_book.id: index
+                    for index, chunk in enumerate(self._chunks)
+                    for chunk_book in chunk
+                }
+        if not self._chunks or len(self._chunks[-1]) >= self.CHUNK_SIZE:
+            if not self._chunks_owned:
+                self._chunks = list(self._chunks)
+                self._chunks_owned = True
+            self._chunks.append([])
+            self._first_ids.append(book.id)
+            self._owned.add(len(self._chunks) - 1)
+        index = len(self._chunks) - 1
+        self._writable_chunk(index).append(book)
+        if self._chunk_of is not None:
+            self._chunk_of[book.id] = index
+        self._last_id = (
+            book.id if self._last_id is None else max(self._last_id, book.id)
+        )
+        self._length += 1
+
+    def _position(self, book_id: int) -> tuple[int, int] | None:
+        """Возвращает (номер части, позиция в части) книги или None"""
+        index = self._find_chunk(book_id)
+        if index is None:
+            return None
+        for position, book in enumerate(self._chunks[index]):
+            if book.id == book_id:
+                return index, position
+        return None
+
+    def remove(self, book_id: int) -> None:
+        """Удаляет книгу по ID, если она есть"""
+        found = self._position(book_id)
+        if found is None:
+            return
+        index, position = found
+        del self._writable_chunk(index)[position]
+        if self._chunk_of is not None:
+            del self._chunk_of[book_id]
+        self._length -= 1
+
+    def replace(self, book: Book) -> None:
+        """Заменяет книгу с тем же ID, сохраняя ее место"""
+        found = self._position(book.id)
+        if found is None:
+            return
+        index, position = found
+        self._writable_chunk(index)[position] = book
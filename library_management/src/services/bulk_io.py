@@ -0,0 +1,282 @@
+import csv
+import json
+import time
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass, field
+from itertools import islice
+from pathlib import Path
+from typing import TextIO
+
+from config import TRANSFER_CHUNK_SIZE, TRANSFER_MAX_REPORTED_ERRORS
+from models import Book
+from services.library_service import LibraryService
+from utils import BookValidator
+
+FORMATS = ("csv", "ndjson")
+CSV_COLUMNS = ("id", "title", "author", "year", "status")
+
+_SUFFIX_FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson"}
+
+
+@dataclass
+class TransferStats:
+    """
+    Итоги импорта или экспорта
+
+    Attributes:
+        rows (int): Обработано строк
+        succeeded (int): Импортировано или выгружено книг
+        failed (int): Строк с ошибками
+        errors (list[tuple[int, str]]): Первые ошибки (номер строки файла,
+            сообщение); число хранимых ошибок ограничено, чтобы память
+            не росла с размером файла
+        seconds (float): Длительность
+    """
+
+    rows: int = 0
+    succeeded: int = 0
+    failed: int = 0
+    errors: list[tuple[int, str]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        """Скорость обработки в строках в секунду"""
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    def add_error(self, line: int, message: str) -> None:
+        """Учитывает строку с ошибкой"""
+        self.failed += 1
+        if len(self.errors) < TRANSFER_MAX_REPORTED_ERRORS:
+            self.errors.append((line, message))
+
+
+# Строка импорта: (номер строки файла, (название, автор, год, статус) или None,
+# сообщение об ошибке разбора или None)
+ImportRow = tuple[int, tuple[str, str, int, str | None] | None, str | None]
+
+
+def detect_format(path: Path, fmt: str | None = None) -> str:
+    """
+    Определяет формат файла по аргументу или расширению
+
+    Raises:
+        ValueError: если формат не поддерживается
+    """
+    fmt = fmt or _SUFFIX_FORMATS.get(Path(path).suffix.lower())
+    if fmt not in FORMATS:
+        raise ValueError(
+            f"Неизвестный формат файла. Поддерживаются: {', '.join(FORMATS)}"
+        )
+    return fmt
+
+
+def _parse_record(
+    record: dict,
+) -> tuple[tuple[str, str, int, str | None] | None, str | None]:
+    """Приводит запись файла к (название, автор, год, статус) или ошибке"""
+    missing = [name for name in ("title", "author", "year") if record.get(name) is None]
+    if missing:
+        return None, f"Нет обязательных полей: {', '.join(missing)}"
+    title, author, year = record["title"], record["author"], record["year"]
+    if not isinstance(title, str) or not isinstance(author, str):
+        return None, "Название и автор должны быть строками"
+    if isinstance(year, str):
+        try:
+            year = int(year.strip())
+        except ValueError:
+            return None, "Год должен быть целым числом"
+    if not isinstance(year, int) or isinstance(year, bool):
+        return None, "Год должен быть целым числом"
+    status = record.get("status") or None
+    if status is not None:
+        is_valid, error = BookValidator.validate_status(status)
+        if not is_valid:
+            return None, error
+    return (title, author, year, status), None
+
+
+def read_csv(file: TextIO) -> Iterator[ImportRow]:
+    """
+    Читает книги из CSV с заголовком
+
+    Обязательные колонки: title, author, year; необязательная — status.
+    Остальные колонки (например, id) игнорируются.
+    """
+    reader = csv.DictReader(file)
+    if reader.fieldnames is None:
+        return
+    missing = {"title", "author", "year"} - set(reader.fieldnames)
+    if missing:
+        raise ValueError(f"В заголовке CSV нет колонок: {', '.join(sorted(missing))}")
+    for record in reader:
+        yield reader.line_num, *_parse_record(record)
+
+
+def read_ndjson(file: TextIO) -> Iterator[ImportRow]:
+    """Читает книги из NDJSON: по объекту JSON в строке, пустые строки пропускаются"""
+    for line_number, line in enumerate(file, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Некорректный JSON: {e.msg}"
+            continue
+        if not isinstance(record, dict):
+            yield line_number, None, "Строка должна быть объектом JSON"
+            continue
+        yield line_number, *_parse_record(record)
+
+
+def write_csv(file: TextIO, books: Iterable[Book]) -> Iterator[int]:
+    """Записывает книги в CSV с заголовком, после каждой книги выдает 1"""
+    writer = csv.writer(file)
+    writer.writerow(CSV_COLUMNS)
+    for book in books:
+        writer.writerow(
+            (book.id, book.title, book.author, book.year, book.status.value)
+        )
+        yield 1
+
+
+def write_ndjson(file: TextIO, books: Iterable[Book]) -> Iterator[int]:
+    """Записывает книги в NDJSON, после каждой книги выдает 1"""
+    for book in books:
+        file.write(json.dumps(book.to_dict(), ensure_ascii=False))
+        file.write("\n")
+        yield 1
+
+
+_READERS = {"csv": read_csv, "ndjson": read_ndjson}
+_WRITERS = {"csv": write_csv, "ndjson": write_ndjson}
+
+
+def _import_chunk(
+    library: LibraryService, chunk: list[ImportRow], stats: TransferStats
+) -> None:
+    """Добавляет строки одной части файла одним пакетом"""
+    parsed = []
+    errors = []
+    for line, row, error in chunk:
+        if row is None:
+            errors.append((line, error))
+        else:
+            parsed.append((line, row))
+
+    with library.batch():
+        results = library.add_books(
+            [(title, author, year) for _, (title, author, year, _) in parsed],
+            row_numbers=[line for line, _ in parsed],
+        )
+        for (line, (_, _, _, status)), (book, error) in zip(parsed, results):
+            if book is None:
+                errors.append((line, error))
+                continue
+            if status is not None and status != book.status.value:
+                library.change_status(book.id, status)
+            stats.succeeded += 1
+    for line, error in sorted(errors):
+        stats.add_error(line, error)
+    stats.rows += len(chunk)
+
+
+def import_books(
+    library: LibraryService,
+    path: Path,
+    fmt: str | None = None,
+    chunk_size: int = TRANSFER_CHUNK_SIZE,
+    progress: Callable[[TransferStats], None] | None = None,
+) -> TransferStats:
+    """
+    Потоковый импорт книг из CSV или NDJSON
+
+    Файл читается построчно и добавляется частями по chunk_size строк:
+    каждая часть проверяется BookValidator.validate_many и сохраняется
+    одним пакетом (LibraryService.batch), поэтому память не зависит от
+    размера файла. Книги получают новые ID; колонка status, если есть,
+    задает статус. Некорректные строки пропускаются и учитываются в
+    итогах; уже импортированные части при ошибке не откатываются.
+
+    Args:
+        library: Библиотека
+        path: Путь к файлу
+        fmt: Формат ("csv" или "ndjson"); по умолчанию — по расширению
+        chunk_size: Число строк в части
+        progress: Вызывается с текущими итогами после каждой части
+
+    Returns:
+        TransferStats: итоги импорта
+
+    Raises:
+        ValueError: если формат не поддерживается или в CSV нет колонок
+        OSError: если файл не удалось прочитать
+    """
+    if chunk_size < 1:
+        raise ValueError("Размер части должен быть положительным")
+    reader = _READERS[detect_format(path, fmt)]
+    stats = TransferStats()
+    started = time.perf_counter()
+    # utf-8-sig пропускает BOM, который добавляют табличные редакторы
+    with open(path, "r", encoding="utf-8-sig", newline="") as file:
+        rows = reader(file)
+        while chunk := list(islice(rows, chunk_size)):
+            _import_chunk(library, chunk, stats)
+            stats.seconds = time.perf_counter() - started
+            if progress is not None:
+                progress(stats)
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def export_books(
+    library: LibraryService,
+    path: Path,
+    fmt: str | None = None,
+    chunk_size: int = TRANSFER_CHUNK_SIZE,
+    progress: Callable[[TransferStats], None] | None = None,
+) -> TransferStats:
+    """
+    Потоковый экспорт книг в CSV или NDJSON
+
+    Выгружается снимок библиотеки на момент вызова (LibraryService.snapshot)
+    в порядке добавления книг: изменения, сделанные во время экспорта
+    другими потоками, в файл не попадают, а книги не копируются в память.
+    Файл записывается во временный и заменяет целевой после успешной
+    выгрузки.
+
+    Args:
+        library: Библиотека
+        path: Путь к файлу
+        fmt: Формат ("csv" или "ndjson"); по умолчанию — по расширению
+        chunk_size: Через сколько книг вызывается progress
+        progress: Вызывается с текущими итогами после каждых chunk_size книг
+
+    Returns:
+        TransferStats: итоги экспорта
+
+    Raises:
+        ValueError: если формат не поддерживается
+        OSError: если файл не удалось записать
+    """
+    if chunk_size < 1:
+        raise ValueError("Размер части должен быть положительным")
+    writer = _WRITERS[detect_format(path, fmt)]
+    path = Path(path)
+    temp_path = path.with_name(path.name + ".tmp")
+    stats = TransferStats()
+    started = time.perf_counter()
+
+    try:
+        with open(temp_path, "w", encoding="utf-8", newline="") as file:
+            for _ in writer(file, library.snapshot()):
+                stats.rows += 1
+                stats.succeeded += 1
+                if progress is not None and stats.rows % chunk_size == 0:
+                    stats.seconds = time.perf_counter() - started
+                    progress(stats)
+        temp_path.replace(path)
+    finally:
+        temp_path.unlink(missing_ok=True)
+    stats.seconds = time.perf_counter() - started
+    return stats
@@ -0,0 +1,141 @@
+from array import array
+from bisect import bisect_left
+from collections.abc import Iterator, MutableMapping
+
+from models import Book, BookStatus
+
+
+class ColumnarBookStore(MutableMapping):
+    """
+    Колоночное хранилище книг в памяти
+
+    Хранит ID, годы и статусы в параллельных массивах array, названия —
+    в списке, авторов — в таблице уникальных строк с индексами в массиве.
+    Поддерживает интерфейс словаря ID -> Book с сохранением порядка
+    добавления; объекты Book создаются при обращении, поэтому изменения
+    полученной книги нужно записать обратно через store[book.id] = book.
+
+    Пока ID добавляются по возрастанию (как их выдает LibraryService),
+    строка книги ищется бинарным поиском по массиву ID без отдельного
+    словаря; при нарушении порядка строится словарь ID -> строка.
+    """
+
+    _STATUSES = list(BookStatus)
+    _STATUS_CODES = {status: code for code, status in enumerate(_STATUSES)}
+    # Порог удаленных строк, после которого массивы уплотняются
+    _COMPACT_MIN_DELETED = 1024
+
+    def __init__(self):
+        self._ids = array("q")
+        self._years = array("q")
+        self._statuses = array("B")
+        self._author_refs = array("I")
+        # Удаленные строки помечаются None в списке названий
+        self._titles: list[str | None] = []
+        self._authors: list[str] = []
+        self._author_codes: dict[str, int] = {}
+        # Словарь ID -> строка, если ID добавлялись не по возрастанию
+        self._rows: dict[int, int] | None = None
+        self._count = 0
+
+    def _find_row(self, book_id: int) -> int | None:
+        """Возвращает номер строки живой книги или None"""
+        if self._rows is not None:
+            return self._rows.get(book_id)
+        row = bisect_left(self._ids, book_id)
+        if (
+            row < len(self._ids)
+            and self._ids[row] == book_id
+            and self._titles[row] is not None
+        ):
+            return row
+        return None
+
+    def _author_code(self, author: str) -> int:
+        """Возвращает индекс автора в таблице строк, добавляя его при необходимости"""
+        code = self._author_codes.get(author)
+        if code is None:
+            code = len(self._authors)
+            self._authors.append(author)
+            self._author_codes[author] = code
+        return code
+
+    def _make_book(self, row: int) -> Book:
+        """Создает объект книги по номеру строки"""
+        return Book(
+            id=self._ids[row],
+            title=self._titles[row],
+            author=self._authors[self._author_refs[row]],
+            year=self._years[row],
+            status=self._STATUSES[self._statuses[row]],
+        )
+
+    def __getitem__(self, book_id: int) -> Book:
+        row = self._find_row(book_id)
+        if row is None:
+            raise KeyError(book_id)
+        return self._make_book(row)
+
+    def __setitem__(self, book_id: int, book: Book) -> None:
+        row = self._find_row(book_id)
+        if row is None:
+            if self._rows is None and self._ids and book_id <= self._ids[-1]:
+                self._rows = {
+                    id_: row
+                    for row, (id_, title) in enumerate(zip(self._ids, self._titles))
+                    if title is not None
+                }
+            if self._rows is not None:
+                self._rows[book_id] = len(self._ids)
+            self._count += 1
+            self._ids.append(book_id)
+            self._years.append(book.year)
+            self._statuses.append(self._STATUS_CODES[book.status])
+            self._author_refs.append(self._author_code(book.author))
+            self._titles.append(book.title)
+            return
+
+        self._years[row] = book.year
+        self._statuses[row] = self._STATUS_CODES[book.status]
+        self._author_refs[row] = self._author_code(book.author)
+        self._titles[row] = book.title
+
+    def __delitem__(self, book_id: int) -> None:
+        row = self._find_row(book_id)
+        if row is None:
+            raise KeyError(book_id)
+        if self._rows is not None:
+            del self._rows[book_id]
+        self._titles[row] = None
+        self._count -= 1
+        deleted = len(self._ids) - self._count
+        if deleted >= self._COMPACT_MIN_DELETED and deleted * 2 > len(self._ids):
+            self._compact()
+
+    def _compact(self) -> None:
+        """Удаляет помеченные строки из массивов"""
+        alive = [row for row, title in enumerate(self._titles) if title is not None]
+        self._ids = array("q", (self._ids[row] for row in alive))
+        self._years = array("q", (self._years[row] for row in alive))
+        self._statuses = array("B", (self._statuses[row] for row in alive))
+        self._author_refs = array("I", (self._author_refs[row] for row in alive))
+        self._titles = [self._titles[row] for row in alive]
+        if self._rows is not None:
+            self._rows = {book_id: row for row, book_id in enumerate(self._ids)}
+
+    def __iter__(self) -> Iterator[int]:
+        for book_id, title in zip(self._ids, self._titles):
+            if title is not None:
+                yield book_id
+
+    def __len__(self) -> int:
+        return self._count
+
+    def __contains__(self, book_id: object) -> bool:
+        return self._find_row(book_id) is not None
+
+    def values(self) -> Iterator[Book]:
+        """Создает книги в порядке добавления"""
+        for row, title in enumerate(self._titles):
+            if title is not None:
+                yield self._make_book(row)
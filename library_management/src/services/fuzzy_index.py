@@ -0,0 +1,449 @@
+import heapq
+import re
+from collections.abc import Iterable, Iterator
+
+from models import Book, normalize_text
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def levenshtein(a: str, b: str) -> int:
+    """Расстояние Левенштейна между строками"""
+    if len(a) < len(b):
+        a, b = b, a
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(
+                min(
+                    previous[j] + 1,
+                    current[j - 1] + 1,
+                    previous[j - 1] + (char_a != char_b),
+                )
+            )
+        previous = current
+    return previous[-1]
+
+
+class BKTree:
+    """
+    BK-дерево слов для поиска по расстоянию Левенштейна
+
+    Потомки узла сгруппированы по расстоянию до слова узла, поэтому при
+    поиске с допуском k просматриваются только потомки на расстоянии
+    d - k..d + k (неравенство треугольника). Удаление слов не
+    поддерживается: вызывающий код отфильтровывает удаленные слова и
+    перестраивает дерево.
+    """
+
+    def __init__(self):
+        # Узел: [слово, {расстояние: узел}]
+        self._root: list | None = None
+        self.size = 0
+
+    def add(self, word: str) -> None:
+        """Добавляет слово (повторное добавление ничего не меняет)"""
+        if self._root is None:
+            self._root = [word, {}]
+            self.size = 1
+            return
+        node = self._root
+        while True:
+            distance = levenshtein(word, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = [word, {}]
+                self.size += 1
+                return
+            node = child
+
+    def search(self, word: str, max_distance: int) -> list[tuple[int, str]]:
+        """
+        Находит слова на расстоянии не больше max_distance
+
+        Returns:
+            list[tuple[int, str]]: пары (расстояние, слово)
+        """
+        if self._root is None:
+            return []
+        found = []
+        stack = [self._root]
+        while stack:
+            node_word, children = stack.pop()
+            distance = levenshtein(word, node_word)
+            if distance <= max_distance:
+                found.append((distance, node_word))
+            for child_distance, child in children.items():
+                if distance - max_distance <= child_distance <= distance + max_distance:
+                    stack.append(child)
+        return found
+
+
+class _TrieNode:
+    __slots__ = ("children", "count")
+
+    def __init__(self):
+        self.children: dict[str, "_TrieNode"] = {}
+        # Число книг со словом, заканчивающимся в этом узле
+        self.count = 0
+
+
+class PrefixTrie:
+    """Префиксное дерево слов с частотами для автодополнения"""
+
+    def __init__(self):
+        self._root = _TrieNode()
+
+    def add(self, word: str, count: int = 1) -> None:
+        """Увеличивает частоту слова"""
+        node = self._root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                child = node.children[char] = _TrieNode()
+            node = child
+        node.count += count
+
+    def remove(self, word: str, count: int = 1) -> None:
+        """Уменьшает частоту слова, удаляя ставшие пустыми узлы"""
+        path = []
+        node = self._root
+        for char in word:
+            child = node.children.get(char)
+            if child is None:
+                return
+            path.append((node, char))
+            node = child
+        node.count = max(node.count - count, 0)
+        # Удаляем узлы без слов и потомков, начиная с конца слова
+        for parent, char in reversed(path):
+            child = parent.children[char]
+            if child.count or child.children:
+                break
+            del parent.children[char]
+
+    def complete(self, prefix: str, limit: int) -> list[tuple[str, int]]:
+        """
+        Возвращает самые частые слова, начинающиеся с prefix
+
+        Returns:
+            list[tuple[str, int]]: пары (слово, частота) по убыванию частоты
+        """
+        node = self._root
+        for char in prefix:
+            node = node.children.get(char)
+            if node is None:
+                return []
+
+        def walk():
+            stack = [(node, prefix)]
+            while stack:
+                current, word = stack.pop()
+                if current.count:
+                    yield current.count, word
+                for char, child in current.children.items():
+                    stack.append((child, word + char))
+
+        best = heapq.nsmallest(limit, walk(), key=lambda item: (-item[0], item[1]))
+        return [(word, count) for count, word in best]
+
+
+class FuzzyIndex:
+    """
+    Индекс слов названий и авторов для нечеткого поиска и автодополнения
+
+    Слова (нормализованные, не короче MIN_WORD_LENGTH, кроме чисел)
+    хранятся в BK-дереве для поиска с опечатками и в префиксном дереве
+    с частотами для автодополнения; для каждого слова хранятся ID книг.
+    Удаленные слова остаются в BK-дереве до его перестройки, которая
+    выполняется, когда их становится больше, чем действующих.
+    """
+
+    MIN_WORD_LENGTH = 3
+    # Число первых слов запроса, участвующих в поиске: сочетаний уровней
+    # расстояний до (max_distance + 1) ** слов
+    MAX_QUERY_WORDS = 8
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self) -> None:
+        """Очищает индекс"""
+        self._postings: dict[str, set[int]] = {}
+        # Верхняя граница ID книг индекса (при удалении не уменьшается)
+        self._max_id = 0
+        self._tree = BKTree()
+        self._trie = PrefixTrie()
+
+    @staticmethod
+    def tokenize(text: str) -> list[str]:
+        """Разбивает текст на нормализованные слова"""
+        return _TOKEN_PATTERN.findall(normalize_text(text))
+
+    @classmethod
+    def book_words(cls, book: Book) -> set[str]:
+        """Индексируемые слова названия и автора книги"""
+        return {
+            word
+            for word in _TOKEN_PATTERN.findall(f"{book.title_key} {book.author_key}")
+            if len(word) >= cls.MIN_WORD_LENGTH and not word.isdigit()
+        }
+
+    def build(self, books: Iterable[Book]) -> None:
+        """
+        Строит индекс по всем книгам
+
+        Быстрее последовательного add: BK-дерево и префиксное дерево
+        заполняются один раз для каждого различного слова.
+        """
+        self.clear()
+        for book in books:
+            for word in self.book_words(book):
+                ids = self._postings.get(word)
+                if ids is None:
+                    self._postings[word] = {book.id}
+                else:
+                    ids.add(book.id)
+            self._max_id = max(self._max_id, book.id)
+        for word, ids in self._postings.items():
+            self._tree.add(word)
+            self._trie.add(word, len(ids))
+
+    def add(self, book: Book) -> None:
+        """Добавляет книгу в индекс"""
+        for word in self.book_words(book):
+            ids = self._postings.get(word)
+            if ids is None:
+                ids = self._postings[word] = set()
+                self._tree.add(word)
+            ids.add(book.id)
+            self._trie.add(word)
+        self._max_id = max(self._max_id, book.id)
+
+    def remove(self, book: Book) -> None:
+        """Удаляет книгу из индекса"""
+        for word in self.book_words(book):
+            ids = self._postings.get(word)
+            if ids is None:
+                continue
+            ids.discard(book.id)
+            if not ids:
+                del self._postings[word]
+            self._trie.remove(word)
+        if self._tree.size > 2 * len(self._postings) + 64:
+            self._rebuild_tree()
+
+    def _rebuild_tree(self) -> None:
+        """Перестраивает BK-дерево по действующим словам"""
+        tree = BKTree()
+        for word in self._postings:
+            tree.add(word)
+        self._tree = tree
+
+    @staticmethod
+    def default_distance(word: str) -> int:
+        """Допустимое число опечаток для слова запроса"""
+        if len(word) <= 4:
+            return 1
+        return 2
+
+    def _word_tiers(self, word: str, max_distance: int) -> list[set[int]]:
+        """
+        ID книг по наименьшему расстоянию до слова запроса
+
+        Возвращаемые множества могут быть множествами самого индекса
+        и не должны изменяться.
+
+        Returns:
+            list[set[int]]: i-й элемент — книги, ближайшее слово которых
+                находится на расстоянии i
+        """
+        found = [
+            (distance, self._postings[found_word])
+            for distance, found_word in self._tree.search(word, max_distance)
+            if found_word in self._postings
+        ]
+        tiers = []
+        seen: set[int] = set()
+        for distance in range(max_distance + 1):
+            postings = [
+                ids for found_distance, ids in found if found_distance == distance
+            ]
+            if len(postings) == 1:
+                tier = postings[0]
+            else:
+                tier = set().union(*postings)
+            if seen:
+                tier = tier - seen
+            tiers.append(tier)
+            if any(found_distance > distance for found_distance, _ in found):
+                seen = seen | tier
+        return tiers
+
+    def _smallest_ids(
+        self, groups: list[list[set[int]]], count: int | None
+    ) -> list[int]:
+        """
+        Наименьшие ID книг, входящих во все множества хотя бы одной группы
+
+        Если подходит одна группа плотных множеств, а count невелик, ID
+        перебираются по порядку с проверкой принадлежности без построения
+        пересечения. Перебор ограничен размером наименьшего множества;
+        если подходящие книги разрежены, пересечение строится полностью.
+
+        Args:
+            groups: Группы множеств ID
+            count: Максимальное количество ID (None — все)
+
+        Returns:
+            list[int]: ID по возрастанию
+        """
+        groups = [sorted(sets, key=len) for sets in groups]
+        groups = [sets for sets in groups if sets[0]]
+        if not groups:
+            return []
+
+        if count is not None and len(groups) == 1:
+            smallest, *others = groups[0]
+            # Ожидаемое число проверок, если остальные множества не отсеивают ID
+            if count * (self._max_id + 1) < len(smallest) * len(smallest):
+                probes = range(min(self._max_id + 1, len(smallest)))
+                found = []
+                for book_id in filter(smallest.__contains__, probes):
+                    if all(book_id in ids for ids in others):
+                        found.append(book_id)
+                        if len(found) == count:
+                            return found
+                if len(probes) > self._max_id:
+                    return found
+
+        ids = set().union(
+            *(
+                sets[0].intersection(*sets[1:]) if sets[1:] else sets[0]
+                for sets in groups
+            )
+        )
+        if count is None or count >= len(ids):
+            return sorted(ids)
+        return heapq.nsmallest(count, ids)
+
+    @staticmethod
+    def _combinations_by_score(
+        levels: list[list[int]],
+    ) -> Iterator[tuple[int, list[tuple[int, ...]]]]:
+        """
+        Сочетания расстояний слов по возрастанию суммы
+
+        Сочетания перебираются лениво через кучу векторов позиций в levels:
+        из извлеченного вектора добавляются векторы с одной увеличенной
+        позицией, сумма которых не меньше. Сочетания с одной суммой
+        выдаются вместе.
+
+        Args:
+            levels: Для каждого слова — возрастающие расстояния непустых уровней
+
+        Yields:
+            tuple[int, list[tuple[int, ...]]]: (сумма, сочетания расстояний)
+        """
+        start = (0,) * len(levels)
+        heap = [(sum(distances[0] for distances in levels), start)]
+        seen = {start}
+        while heap:
+            score = heap[0][0]
+            group = []
+            while heap and heap[0][0] == score:
+                _, positions = heapq.heappop(heap)
+                group.append(
+                    tuple(distances[i] for distances, i in zip(levels, positions))
+                )
+                for word, i in enumerate(positions):
+                    distances = levels[word]
+                    if i + 1 == len(distances):
+                        continue
+                    following = positions[:word] + (i + 1,) + positions[word + 1 :]
+                    if following not in seen:
+                        seen.add(following)
+                        following_score = score - distances[i] + distances[i + 1]
+                        heapq.heappush(heap, (following_score, following))
+            yield score, group
+
+    def search(
+        self, query: str, max_distance: int | None = None, limit: int | None = None
+    ) -> list[tuple[int, int]]:
+        """
+        Находит книги, содержащие для каждого слова запроса близкое слово
+
+        Книги каждого слова разбиваются на уровни по расстоянию, и сочетания
+        уровней перебираются по возрастанию суммы расстояний; перебор
+        останавливается, как только набрано limit книг. Учитываются только
+        первые MAX_QUERY_WORDS слов запроса.
+
+        Args:
+            query: Запрос
+            max_distance: Допустимое расстояние для каждого слова
+                (None — зависит от длины слова)
+            limit: Максимальное количество книг (None — все)
+
+        Returns:
+            list[tuple[int, int]]: пары (сумма расстояний, ID книги),
+                отсортированные по возрастанию
+        """
+        words = list(
+            dict.fromkeys(
+                word
+                for word in self.tokenize(query)
+                if len(word) >= self.MIN_WORD_LENGTH and not word.isdigit()
+            )
+        )[: self.MAX_QUERY_WORDS]
+        if not words or limit == 0:
+            return []
+
+        word_tiers = []
+        for word in words:
+            distance = (
+                self.default_distance(word) if max_distance is None else max_distance
+            )
+            tiers = self._word_tiers(word, distance)
+            if not any(tiers):
+                return []
+            word_tiers.append(tiers)
+
+        # Сочетания с пустым уровнем не дают книг и не перебираются
+        levels = [
+            [distance for distance, tier in enumerate(tiers) if tier]
+            for tiers in word_tiers
+        ]
+        results = []
+        for score, combinations in self._combinations_by_score(levels):
+            groups = [
+                [tiers[tier] for tiers, tier in zip(word_tiers, combination)]
+                for combination in combinations
+            ]
+            remaining = None if limit is None else limit - len(results)
+            results.extend(
+                (score, book_id) for book_id in self._smallest_ids(groups, remaining)
+            )
+            if limit is not None and len(results) >= limit:
+                break
+        return results
+
+    def complete(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Дополняет последнее слово запроса самыми частыми словами индекса
+
+        Args:
+            prefix: Начало запроса
+            limit: Максимальное количество вариантов
+
+        Returns:
+            list[str]: запросы с дополненным последним словом
+        """
+        text = normalize_text(prefix)
+        words = _TOKEN_PATTERN.findall(text)
+        if not words or not prefix[-1:].isalnum():
+            return []
+        head = text[: len(text) - len(words[-1])]
+        return [head + word for word, _ in self._trie.complete(words[-1], limit)]
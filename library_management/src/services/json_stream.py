@@ -0,0 +1,162 @@
+import json
+from collections.abc import Iterable, Iterator
+from typing import Any, TextIO
+
+CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = " \t\n\r"
+
+
+class _JSONStreamReader:
+    """
+    Посимвольный разбор JSON из файла по частям
+
+    Значения разбираются json.JSONDecoder.raw_decode из буфера, который
+    дочитывается, пока значение не поместится в него целиком.
+    """
+
+    def __init__(self, file: TextIO, chunk_size: int = CHUNK_SIZE):
+        self._file = file
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self) -> bool:
+        """Дочитывает следующую часть файла, возвращает False в конце файла"""
+        if self._eof:
+            return False
+        chunk = self._file.read(self._chunk_size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Возвращает следующий непробельный символ или пустую строку в конце"""
+        while True:
+            buffer, pos = self._buffer, self._pos
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < len(buffer):
+                return buffer[pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str) -> None:
+        """Пропускает ожидаемый символ"""
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buffer, self._pos)
+        self._pos += 1
+
+    def value(self) -> Any:
+        """Разбирает следующее значение целиком"""
+        self.peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                if self._fill():
+                    continue
+                raise
+            # Число на границе буфера может продолжаться в следующей части
+            if end == len(self._buffer) and self._fill():
+                continue
+            self._pos = end
+            return value
+
+
+def open_books_stream(
+    path, chunk_size: int = CHUNK_SIZE
+) -> tuple[Iterator[dict], int] | None:
+    """
+    Открывает файл книг для потокового чтения
+
+    Поддерживается файл вида {"last_id": N, "books": [...]}, в котором
+    last_id записан до списка книг (так пишет write_books).
+
+    Args:
+        path: Путь к файлу
+        chunk_size: Размер читаемой за раз части файла в символах
+
+    Returns:
+        tuple[Iterator[dict], int] | None: (книги по одной, последний ID) или
+            None, если список книг в файле идет раньше last_id
+
+    Raises:
+        json.JSONDecodeError: если файл содержит некорректный JSON
+    """
+    file = open(path, "r", encoding="utf-8")
+    try:
+        reader = _JSONStreamReader(file, chunk_size)
+        if reader.peek() != "{":
+            # Пустой файл или не объект верхнего уровня
+            file.close()
+            return iter(()), 0
+
+        reader.expect("{")
+        last_id = 0
+        has_last_id = False
+        while reader.peek() != "}":
+            key = reader.value()
+            reader.expect(":")
+            if key == "books":
+                if reader.peek() != "[":
+                    reader.value()
+                    file.close()
+                    return iter(()), last_id
+                if not has_last_id:
+                    # last_id может идти после списка книг
+                    file.close()
+                    return None
+                return _iter_array(reader, file), last_id
+            value = reader.value()
+            if key == "last_id":
+                last_id = value
+                has_last_id = True
+            if reader.peek() == ",":
+                reader.expect(",")
+        file.close()
+        return iter(()), last_id
+    except BaseException:
+        file.close()
+        raise
+
+
+def _iter_array(reader: _JSONStreamReader, file: TextIO) -> Iterator[dict]:
+    """Поэлементно читает массив, закрывает файл по завершении"""
+    with file:
+        reader.expect("[")
+        if reader.peek() == "]":
+            return
+        while True:
+            yield reader.value()
+            if reader.peek() == ",":
+                reader.expect(",")
+                continue
+            reader.expect("]")
+            return
+
+
+def write_books(file: TextIO, books: Iterable[dict], last_id: int) -> None:
+    """
+    Записывает книги в файл по одной в формате json.dump(indent=2)
+
+    Args:
+        file: Файл, открытый на запись
+        books: Книги
+        last_id: Последний использованный ID
+    """
+    file.write(f'{{\n  "last_id": {json.dumps(last_id)},\n  "books": [')
+    separator = "\n    "
+    for book in books:
+        file.write(separator)
+        file.write(
+            json.dumps(book, ensure_ascii=False, indent=2).replace("\n", "\n    ")
+        )
+        separator = ",\n    "
+    file.write("\n  ]\n}" if separator != "\n    " else "]\n}")
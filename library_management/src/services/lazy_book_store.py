@@ -0,0 +1,93 @@
+from collections.abc import Iterable, Iterator, MutableMapping
+from itertools import islice
+
+from models import Book
+from services.storage_service import BaseStorageService
+
+
+class LazyBookStore(MutableMapping):
+    """
+    Книги по ID с чтением из хранилища при обращении
+
+    В памяти хранятся только ID книг в порядке добавления; объекты Book
+    создаются из данных хранилища (get_book, get_books) при каждом
+    обращении и не запоминаются. Книги, записанные в store, но еще не
+    сохраненные в хранилище (внутри batch() или при отложенной записи),
+    остаются в памяти до вызова mark_written.
+    """
+
+    # Число книг, читаемых из хранилища одним запросом при переборе
+    READ_CHUNK_SIZE = 1000
+
+    def __init__(self, storage: BaseStorageService):
+        self._storage = storage
+        self._ids: dict[int, None] = {}
+        self._pending: dict[int, Book] = {}
+
+    def add_id(self, book_id: int) -> None:
+        """Добавляет ID книги, которая уже есть в хранилище"""
+        self._ids[book_id] = None
+
+    def mark_written(self) -> None:
+        """Забывает книги, сохраненные в хранилище"""
+        self._pending.clear()
+
+    def __getitem__(self, book_id: int) -> Book:
+        if book_id not in self._ids:
+            raise KeyError(book_id)
+        book = self._pending.get(book_id)
+        if book is not None:
+            return book
+        data = self._storage.get_book(book_id)
+        if data is None:
+            # Книга удалена другим процессом до перезагрузки
+            raise KeyError(book_id)
+        return Book.from_dict(data)
+
+    def __setitem__(self, book_id: int, book: Book) -> None:
+        self._ids[book_id] = None
+        self._pending[book_id] = book
+
+    def __delitem__(self, book_id: int) -> None:
+        del self._ids[book_id]
+        self._pending.pop(book_id, None)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._ids)
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def __contains__(self, book_id: object) -> bool:
+        return book_id in self._ids
+
+    def get_many(self, book_ids: Iterable[int]) -> list[Book]:
+        """
+        Возвращает книги по ID одним запросом к хранилищу
+
+        Args:
+            book_ids: ID книг
+
+        Returns:
+            list[Book]: найденные книги в порядке переданных ID
+        """
+        book_ids = [book_id for book_id in book_ids if book_id in self._ids]
+        missing = [book_id for book_id in book_ids if book_id not in self._pending]
+        stored = {
+            data["id"]: Book.from_dict(data)
+            for data in (self._storage.get_books(missing) if missing else ())
+        }
+        books = []
+        for book_id in book_ids:
+            book = self._pending.get(book_id)
+            if book is None:
+                book = stored.get(book_id)
+            if book is not None:
+                books.append(book)
+        return books
+
+    def values(self) -> Iterator[Book]:
+        """Читает книги из хранилища частями в порядке добавления"""
+        ids = iter(list(self._ids))
+        while chunk := list(islice(ids, self.READ_CHUNK_SIZE)):
+            yield from self.get_many(chunk)
@@ -1,28 +1,576 @@
-from models import Book, BookStatus
-from services.storage_service import StorageService
-from utils import BookValidator
+import dataclasses
+import heapq
+import threading
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator, MutableMapping, Sequence
+from contextlib import contextmanager
+from functools import wraps
+from itertools import filterfalse, islice
+from time import monotonic
+
+from config import (
+    COLUMNAR_STORE,
+    LAZY_LOAD,
+    PARALLEL_MIN_BOOKS,
+    PARALLEL_WORKERS,
+    RELOAD_CHECK_INTERVAL,
+    SEARCH_CACHE_MAX_IDS,
+    SEARCH_CACHE_SIZE,
+    THREAD_SAFE,
+    WRITE_BEHIND,
+    WRITE_BEHIND_MAX_STALENESS,
+)
+from models import Book, BookStatus, normalize_text
+from services.background_writer import BackgroundWriter
+from services.book_indexes import BookIndexes
+from services.book_sequence import BookSequence, BookSnapshot
+from services.columnar_store import ColumnarBookStore
+from services.fuzzy_index import FuzzyIndex
+from services.lazy_book_store import LazyBookStore
+from services.parallel_segments import (
+    load_partitions,
+    partition_books,
+    use_parallel,
+)
+from services.search_cache import SearchCache
+from services.search_index import SearchIndex
+from services.storage_factory import create_storage
+from services.storage_service import BaseStorageService, StorageCorruptedError
+from utils import BookValidator, metrics
+from utils.rwlock import NullLock, ReadWriteLock
+
+
+def _read_locked(method):
+    """
+    Выполняет метод сервиса под блокировкой на чтение
+
+    Перед чтением периодически проверяет, не изменено ли хранилище
+    другим процессом.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._check_for_changes()
+        with self._lock.read_locked():
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _write_locked(method):
+    """
+    Выполняет метод сервиса под блокировкой на запись
+
+    Удерживает межпроцессную блокировку хранилища и перед изменением
+    перезагружает книги, если их записал другой процесс.
+    """
+
+    @wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._lock.write_locked(), self.storage.locked():
+            if not self._batch_depth:
+                self._reload_if_changed()
+            return method(self, *args, **kwargs)
+
+    return wrapper
 
 
 class LibraryService:
-    """Сервис управления библиотекой"""
+    """
+    Сервис управления библиотекой
 
-    def __init__(self):
-        self.storage = StorageService()
-        self._books = []
+    В потокобезопасном режиме (thread_safe) чтения выполняются параллельно
+    под блокировкой ReadWriteLock, а изменения и сохранение — по одному.
+
+    Если хранилище общее для нескольких процессов, изменения выполняются
+    под его блокировкой после перезагрузки чужих изменений, а перед
+    чтением изменения проверяются не чаще раза в reload_check_interval
+    секунд (None — не проверять).
+
+    В режиме отложенной записи (write_behind) изменения записываются
+    фоновым потоком: все изменения, сделанные за max_staleness секунд,
+    сохраняются одной записью. flush() записывает их сразу, close() —
+    перед остановкой потока. Выданные ID книг записываются только вместе
+    с изменениями, поэтому хранилище не должно быть общим для нескольких
+    процессов (is_shared).
+
+    Сегментированный каталог от parallel_min_books книг загружается
+    в parallel_workers процессах (см. services.parallel_segments), если
+    их больше одного.
+
+    Из хранилища, быстро читающего книги по ID (supports_lazy_load),
+    в режиме lazy_load загружаются только ID и ключи дубликатов: книги
+    читаются из хранилища при обращении (LazyBookStore), а поисковый
+    индекс и индексы find_books строятся при первом запросе.
+    """
+
+    def __init__(
+        self,
+        storage: BaseStorageService | None = None,
+        columnar: bool = COLUMNAR_STORE,
+        thread_safe: bool = THREAD_SAFE,
+        reload_check_interval: float | None = RELOAD_CHECK_INTERVAL,
+        write_behind: bool = WRITE_BEHIND,
+        max_staleness: float = WRITE_BEHIND_MAX_STALENESS,
+        search_cache_size: int = SEARCH_CACHE_SIZE,
+        parallel_workers: int = PARALLEL_WORKERS,
+        parallel_min_books: int = PARALLEL_MIN_BOOKS,
+        lazy_load: bool = LAZY_LOAD,
+    ):
+        self.storage = storage if storage is not None else create_storage()
+        if write_behind and self.storage.is_shared:
+            # Другой процесс выдал бы те же ID книгам, добавленным до записи
+            raise ValueError(
+                "Отложенная запись возможна только для хранилища одного процесса "
+                "(locking=False)"
+            )
+        self._lazy = lazy_load and self.storage.supports_lazy_load
+        self._parallel_workers = parallel_workers
+        self._parallel_min_books = parallel_min_books
+        # Фоновый поток записи обращается к данным, поэтому нужна блокировка
+        self._lock = ReadWriteLock() if thread_safe or write_behind else NullLock()
+        self._reload_check_interval = reload_check_interval
+        self._last_change_check = monotonic()
+        self._columnar = columnar
+        # Книги по ID в порядке добавления
+        self._books: MutableMapping[int, Book] = self._new_book_store()
+        # Те же книги частями для снимков (snapshot); в колоночном режиме
+        # и при чтении книг из хранилища не ведется, чтобы не хранить
+        # объекты Book
+        self._sequence: BookSequence | None = self._new_sequence()
+        # Версия данных: увеличивается при любом изменении книг
+        self._version = 0
+        # ID по возрастанию для постраничного вывода по ключу. Удаленные ID
+        # остаются в списке до сжатия, а ID, добавленные не по возрастанию,
+        # дописываются в конец до сортировки (см. _ordered_ids)
+        self._sorted_ids: list[int] = []
+        self._removed_ids: set[int] = set()
+        self._sorted_ids_ordered = True
+        self._sorted_ids_lock = threading.Lock()
+        # Счетчики нормализованных ключей (название, автор, год) для поиска дубликатов
+        self._book_keys: dict[tuple[str, str, int], int] = {}
+        self._search_index = SearchIndex()
+        # Поколение данных: увеличивается при добавлении и удалении книг,
+        # сбрасывая кэш результатов поиска
+        self._generation = 0
+        self._search_cache = SearchCache(search_cache_size, SEARCH_CACHE_MAX_IDS)
+        # Индексы по году, автору, статусу и началу названия для find_books
+        self._indexes = BookIndexes()
+        # Построены ли поисковый индекс и индексы find_books: в режиме
+        # lazy_load они строятся при первом запросе (_ensure_indexes)
+        self._indexes_ready = not self._lazy
+        self._indexes_lock = threading.Lock()
+        # Индекс нечеткого поиска и автодополнения строится при первом
+        # обращении и затем обновляется вместе с остальными индексами
+        self._fuzzy_index: FuzzyIndex | None = None
+        self._fuzzy_index_lock = threading.Lock()
         self._last_id = 0
-        self._load_books()
+        # Глубина вложенности batch() и ID книг, измененных, но еще не записанных
+        self._batch_depth = 0
+        self._dirty_ids: dict[int, None] = {}
+        # Не удалась ли последняя загрузка из-за повреждения хранилища
+        self._load_failed = False
+        with self.storage.locked():
+            self._load_books()
+        self._writer = (
+            BackgroundWriter(self.flush, max_staleness) if write_behind else None
+        )
 
+    @metrics.timed("library.load_books")
     def _load_books(self) -> None:
         """Загружает книги и последний ID из хранилища"""
+        if self._lazy:
+            self._load_keys()
+            return
+        if use_parallel(self.storage, self._parallel_workers, self._parallel_min_books):
+            self._load_books_parallel()
+            return
         books_data, last_id = self.storage.load_data()
-        self._books = [Book.from_dict(book_data) for book_data in books_data]
+        self._clear_books()
+        try:
+            for book_data in books_data:
+                self._insert_book(Book.from_dict(book_data))
+        except StorageCorruptedError as e:
+            self._handle_corrupted(e)
+            # Как и при ошибке разбора файла целиком, начинаем с пустой библиотеки
+            last_id = 0
+        self._load_failed = False
+        self._last_id = last_id
+
+    def _load_books_parallel(self) -> None:
+        """
+        Загружает сегментированный каталог в пуле процессов
+
+        Сегменты разбираются, а n-граммы поискового индекса собираются
+        в процессах пула; здесь книги частей добавляются по порядку,
+        а n-граммы объединяются с индексом целиком.
+        """
+        partitions, last_id = load_partitions(self.storage, self._parallel_workers)
+        self._clear_books()
+        try:
+            for rows, postings in partitions:
+                for book in partition_books(rows):
+                    self._insert_book(book, index_search=False)
+                self._search_index.add_postings([row[0] for row in rows], postings)
+        except StorageCorruptedError as e:
+            self._handle_corrupted(e)
+            last_id = 0
+        self._load_failed = False
         self._last_id = last_id
 
+    def _handle_corrupted(self, error: StorageCorruptedError) -> None:
+        """
+        Очищает частично загруженные книги после ошибки чтения хранилища
+
+        Хранилище с точечной записью сохранило бы новые книги рядом
+        с непрочитанными, а ID снова начались бы с 1 и затерли бы их,
+        поэтому для такого хранилища ошибка передается вызывающему коду.
+        Пока загрузка не удастся, она повторяется перед каждым обращением
+        к библиотеке; незаписанные изменения теряются.
+
+        Raises:
+            StorageCorruptedError: если хранилище поддерживает точечную запись
+        """
+        self._clear_books()
+        if self.storage.supports_point_writes:
+            self._load_failed = True
+            self._dirty_ids.clear()
+            raise error
+
+    def _load_keys(self) -> None:
+        """
+        Загружает из хранилища только ID и ключи дубликатов книг
+
+        Объекты Book не создаются: книги читаются из хранилища при
+        обращении, а индексы строятся при первом запросе.
+        """
+        rows, last_id = self.storage.load_keys()
+        self._clear_books()
+        book_keys = self._book_keys
+        for book_id, title, author, year in rows:
+            self._books.add_id(book_id)
+            # Хранилище возвращает книги по возрастанию ID
+            self._sorted_ids.append(book_id)
+            key = BookValidator.make_duplicate_key(title, author, year)
+            book_keys[key] = book_keys.get(key, 0) + 1
+        self._last_id = last_id
+
+    def _ensure_indexes(self) -> None:
+        """Строит поисковый индекс и индексы find_books, если они еще не построены"""
+        if self._indexes_ready:
+            return
+        # Строятся под блокировкой на чтение, поэтому параллельные читатели
+        # дожидаются одного построения
+        with self._indexes_lock:
+            if self._indexes_ready:
+                return
+            for book in self._books.values():
+                self._search_index.add(book)
+                self._indexes.add(book)
+            self._indexes_ready = True
+
+    def _get_books(self, book_ids: Iterable[int]) -> Iterable[Book]:
+        """Возвращает книги по ID (из хранилища — одним запросом)"""
+        if self._lazy:
+            return self._books.get_many(book_ids)
+        return map(self._books.__getitem__, book_ids)
+
+    def reload_if_changed(self) -> bool:
+        """
+        Перезагружает книги, если хранилище изменено другим процессом
+
+        Returns:
+            bool: True, если книги были перезагружены
+        """
+        with self._lock.write_locked(), self.storage.locked():
+            return self._reload_if_changed()
+
+    def _reload_if_changed(self) -> bool:
+        """Перезагружает книги при изменении хранилища (блокировки уже захвачены)"""
+        if self._load_failed:
+            self._load_books()
+            return True
+        if self._dirty_ids or not self.storage.has_changed():
+            return False
+        self._load_books()
+        return True
+
+    def _check_for_changes(self) -> None:
+        """Проверяет изменения хранилища, если с прошлой проверки прошел интервал"""
+        if self._load_failed:
+            self.reload_if_changed()
+            return
+        interval = self._reload_check_interval
+        if interval is None:
+            return
+        now = monotonic()
+        if now - self._last_change_check < interval:
+            return
+        self._last_change_check = now
+        if self.storage.has_changed():
+            self.reload_if_changed()
+
+    def _new_book_store(self) -> MutableMapping[int, Book]:
+        """Создает пустое хранилище книг в памяти"""
+        if self._lazy:
+            return LazyBookStore(self.storage)
+        return ColumnarBookStore() if self._columnar else {}
+
+    def _new_sequence(self) -> BookSequence | None:
+        """Создает пустую последовательность книг для снимков"""
+        return None if self._columnar or self._lazy else BookSequence()
+
+    def _clear_books(self) -> None:
+        """Очищает книги в памяти и индексы"""
+        self._books = self._new_book_store()
+        self._sequence = self._new_sequence()
+        self._version += 1
+        self._sorted_ids = []
+        self._removed_ids = set()
+        self._sorted_ids_ordered = True
+        self._book_keys = {}
+        self._search_index.clear()
+        self._indexes.clear()
+        self._indexes_ready = not self._lazy
+        self._fuzzy_index = None
+        self._generation += 1
+
+    def _insert_book(self, book: Book, index_search: bool = True) -> None:
+        """
+        Добавляет книгу в память и обновляет индексы
+
+        Args:
+            book: Книга
+            index_search: Добавлять ли книгу в поисковый индекс (False, если
+                ее n-граммы добавляются отдельно через add_postings)
+        """
+        self._books[book.id] = book
+        if self._sequence is not None:
+            self._sequence.append(book)
+        if book.id in self._removed_ids:
+            # ID еще в списке
+            self._removed_ids.discard(book.id)
+        else:
+            if self._sorted_ids and book.id < self._sorted_ids[-1]:
+                self._sorted_ids_ordered = False
+            self._sorted_ids.append(book.id)
+        key = BookValidator.book_duplicate_key(book)
+        self._book_keys[key] = self._book_keys.get(key, 0) + 1
+        if self._indexes_ready:
+            if index_search:
+                self._search_index.add(book)
+            self._indexes.add(book)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.add(book)
+        self._generation += 1
+        self._version += 1
+
+    def _remove_book(self, book_id: int) -> Book | None:
+        """Удаляет книгу из памяти и индексов, возвращает удаленную книгу"""
+        book = self._books.pop(book_id, None)
+        if book is None:
+            return None
+        if self._sequence is not None:
+            self._sequence.remove(book_id)
+        self._removed_ids.add(book_id)
+        if len(self._removed_ids) * 2 > len(self._sorted_ids):
+            self._compact_sorted_ids()
+        key = BookValidator.book_duplicate_key(book)
+        count = self._book_keys.get(key, 0)
+        if count > 1:
+            self._book_keys[key] = count - 1
+        else:
+            self._book_keys.pop(key, None)
+        if self._indexes_ready:
+            self._search_index.remove(book)
+            self._indexes.remove(book)
+        if self._fuzzy_index is not None:
+            self._fuzzy_index.remove(book)
+        self._generation += 1
+        self._version += 1
+        return book
+
+    def _compact_sorted_ids(self) -> None:
+        """Убирает удаленные ID из списка ID и сортирует его"""
+        removed = self._removed_ids
+        self._sorted_ids = sorted(i for i in self._sorted_ids if i not in removed)
+        self._removed_ids = set()
+        self._sorted_ids_ordered = True
+
+    def _ordered_ids(self) -> list[int]:
+        """
+        Возвращает ID книг по возрастанию
+
+        Список может содержать ID удаленных книг (_removed_ids): удаление
+        не сдвигает список, а сжимает его, когда удаленных ID становится
+        больше половины. ID, добавленные не по возрастанию, сортируются
+        здесь при первом чтении.
+        """
+        if not self._sorted_ids_ordered:
+            # Сортируется под блокировкой на чтение, поэтому параллельные
+            # читатели дожидаются одной сортировки
+            with self._sorted_ids_lock:
+                if not self._sorted_ids_ordered:
+                    self._compact_sorted_ids()
+        return self._sorted_ids
+
+    @metrics.timed("library.save_books")
     def _save_books(self) -> None:
         """Сохраняет книги и последний ID в хранилище"""
-        data = [book.to_dict() for book in self._books]
+        data = (book.to_dict() for book in self._books.values())
         self.storage.save_data(data, self._last_id)
 
+    @metrics.timed("library.persist_changes")
+    def _persist_changes(
+        self, upserts: Iterable[Book] = (), deletes: Iterable[int] = ()
+    ) -> None:
+        """
+        Сохраняет изменения в хранилище
+
+        Если хранилище поддерживает точечную запись, передаются только
+        измененные книги, иначе сохраняется вся библиотека.
+        Внутри batch() и в режиме отложенной записи изменения только
+        запоминаются до выхода из пакета или до фоновой записи.
+        """
+        if self._batch_depth or self._writer is not None:
+            for book in upserts:
+                self._dirty_ids[book.id] = None
+            for book_id in deletes:
+                self._dirty_ids[book_id] = None
+            if not self._batch_depth:
+                self._writer.mark_dirty()
+            return
+
+        self._write_changes(upserts, deletes)
+
+    def _write_changes(self, upserts: Iterable[Book], deletes: Iterable[int]) -> None:
+        """Записывает изменения в хранилище точечно или всей библиотекой"""
+        if self.storage.supports_point_writes:
+            self.storage.apply_changes(
+                [book.to_dict() for book in upserts], list(deletes), self._last_id
+            )
+        else:
+            self._save_books()
+        if self._lazy:
+            self._books.mark_written()
+
+    @contextmanager
+    def batch(self) -> Iterator["LibraryService"]:
+        """
+        Контекст пакетного изменения библиотеки
+
+        Внутри контекста add_book, delete_book и change_status изменяют
+        только данные в памяти; при выходе выполняется одно сохранение.
+        Если блок завершился исключением, состояние в памяти откатывается
+        к сохраненному в хранилище. Вложенные пакеты входят во внешний.
+        Блокировка на запись и блокировка хранилища удерживаются до конца
+        пакета.
+        """
+        with self._lock.write_locked(), self.storage.locked():
+            if not self._batch_depth:
+                # Отложенные изменения записываются до пакета, чтобы откат
+                # пакета не потерял их
+                self._write_dirty()
+                self._reload_if_changed()
+            self._batch_depth += 1
+            try:
+                yield self
+            except BaseException:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._dirty_ids.clear()
+                    self._load_books()
+                raise
+            else:
+                self._batch_depth -= 1
+                if not self._batch_depth:
+                    self._commit_batch()
+
+    def _commit_batch(self) -> None:
+        """Сохраняет изменения, накопленные в пакете"""
+        if self._writer is not None:
+            if self._dirty_ids:
+                self._writer.mark_dirty()
+            return
+        self._write_dirty()
+
+    def _write_dirty(self) -> None:
+        """Записывает книги, измененные с прошлой записи"""
+        if self._load_failed:
+            self._load_books()
+        dirty_ids = self._dirty_ids
+        if not dirty_ids:
+            return
+        self._dirty_ids = {}
+
+        try:
+            upserts = list(self._get_books(i for i in dirty_ids if i in self._books))
+            deletes = [i for i in dirty_ids if i not in self._books]
+            self._write_changes(upserts, deletes)
+        except BaseException:
+            # Изменения остаются незаписанными до следующей попытки, если
+            # книги в памяти не сброшены неудачной загрузкой
+            if not self._load_failed:
+                dirty_ids.update(self._dirty_ids)
+                self._dirty_ids = dirty_ids
+            raise
+
+    @metrics.timed("library.flush")
+    def flush(self) -> None:
+        """
+        Записывает отложенные изменения в хранилище
+
+        Внутри batch() ничего не делает: изменения пакета записываются
+        при выходе из него.
+        """
+        with self._lock.write_locked(), self.storage.locked():
+            if not self._batch_depth:
+                self._write_dirty()
+
+    def close(self) -> None:
+        """Записывает отложенные изменения и останавливает фоновый поток записи"""
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+    @metrics.timed("library.add_books")
+    @_write_locked
+    def add_books(
+        self,
+        books: Iterable[tuple[str, str, int]],
+        row_numbers: Sequence[int] | None = None,
+    ) -> list[tuple[Book | None, str | None]]:
+        """
+        Добавляет несколько книг с одним сохранением
+
+        Книги проверяются одним вызовом BookValidator.validate_many.
+
+        Args:
+            books: Последовательность (название, автор, год)
+            row_numbers: Номера строк, на которые ссылаются сообщения
+                о повторах внутри пакета (по умолчанию с 0)
+
+        Returns:
+            list[tuple[Book | None, str | None]]: для каждой книги
+                (добавленная книга, None) или (None, сообщения об ошибках
+                через «; »)
+        """
+        books = list(books)
+        results = []
+        with self.batch():
+            if row_numbers is None:
+                row_numbers = range(len(books))
+            errors = BookValidator.validate_many(books, self._book_keys, row_numbers)
+            for row, (title, author, year) in zip(row_numbers, books):
+                row_errors = errors.get(row)
+                if row_errors:
+                    results.append((None, "; ".join(row_errors)))
+                else:
+                    results.append((self._create_book(title, author, year), None))
+        return results
+
+    @metrics.timed("library.add_book")
+    @_write_locked
     def add_book(self, title: str, author: str, year: int) -> Book:
         """
         Добавляет новую книгу в библиотеку
@@ -32,17 +580,23 @@ class LibraryService:
         """
         # Проверяем валидность данных (включая проверку на дубликаты)
         is_valid, error = BookValidator.validate_book_data(
-            title, author, year, self._books
+            title, author, year, existing_keys=self._book_keys
         )
         if not is_valid:
             raise ValueError(error)
 
+        return self._create_book(title, author, year)
+
+    def _create_book(self, title: str, author: str, year: int) -> Book:
+        """Добавляет проверенную книгу с новым ID и сохраняет изменения"""
         self._last_id += 1
         book = Book(id=self._last_id, title=title, author=author, year=year)
-        self._books.append(book)
-        self._save_books()
+        self._insert_book(book)
+        self._persist_changes(upserts=[book])
         return book
 
+    @metrics.timed("library.delete_book")
+    @_write_locked
     def delete_book(self, book_id: int) -> bool:
         """
         Удаляет книгу из библиотеки
@@ -54,31 +608,316 @@ class LibraryService:
         if not is_valid:
             raise ValueError(error)
 
-        initial_length = len(self._books)
-        self._books = [book for book in self._books if book.id != book_id]
-        if len(self._books) < initial_length:
-            self._save_books()
-            return True
-        return False
+        if self._remove_book(book_id) is None:
+            return False
+        self._persist_changes(deletes=[book_id])
+        return True
 
+    @metrics.timed("library.search_books")
+    @_read_locked
     def search_books(self, query: str) -> list[Book]:
-        """Поиск книг по названию, автору или году"""
+        """
+        Поиск книг по названию, автору или году
+
+        Запрос и поля книг сравниваются в нормализованном виде (без учета
+        регистра, «ё»/«е» и повторных пробелов). ID найденных книг
+        запоминаются в кэше до следующего добавления или удаления книги;
+        изменение статуса не влияет на результат поиска.
+        """
         if not query:
             return []
 
-        query = str(query).lower()
+        query = normalize_text(str(query))
+        if not query:
+            return []
+        ids = self._search_cache.get(query, self._generation)
+        if ids is not None:
+            metrics.increment("search_cache.hits")
+            return list(self._get_books(ids))
+
+        metrics.increment("search_cache.misses")
+        books = self._search(query)
+        self._search_cache.put(
+            query, self._generation, tuple(book.id for book in books)
+        )
+        return books
+
+    def _search(self, query: str) -> list[Book]:
+        """Поиск книг по нормализованному запросу без кэша"""
+        self._ensure_indexes()
+        candidate_ids = self._search_index.candidates(query)
+        if candidate_ids is None:
+            # Запрос короче триграммы — индекс не сужает выборку
+            candidates = self._books.values()
+        else:
+            candidates = self._get_books(candidate_ids)
+
         return [
             book
-            for book in self._books
-            if query in book.title.lower()
-            or query in book.author.lower()
-            or query in str(book.year)
+            for book in candidates
+            if any(query in field for field in SearchIndex.book_fields(book))
         ]
 
+    def _get_fuzzy_index(self) -> FuzzyIndex:
+        """Возвращает индекс нечеткого поиска, при необходимости строя его"""
+        # Строится под блокировкой на чтение, поэтому параллельные читатели
+        # дожидаются одного построения
+        with self._fuzzy_index_lock:
+            if self._fuzzy_index is None:
+                index = FuzzyIndex()
+                index.build(self._books.values())
+                self._fuzzy_index = index
+            return self._fuzzy_index
+
+    @metrics.timed("library.fuzzy_search")
+    @_read_locked
+    def fuzzy_search(
+        self, query: str, max_distance: int | None = None, limit: int = 20
+    ) -> list[Book]:
+        """
+        Поиск книг по словам названия и автора с учетом опечаток
+
+        Для каждого слова запроса в книге должно найтись слово на расстоянии
+        Левенштейна не больше max_distance (по умолчанию 1 для слов до
+        4 букв и 2 для более длинных). Книги упорядочены по сумме расстояний.
+
+        Args:
+            query: Запрос
+            max_distance: Допустимое число опечаток в каждом слове
+            limit: Максимальное количество книг
+
+        Returns:
+            list[Book]: найденные книги, самые близкие первыми
+
+        Raises:
+            ValueError: если limit или max_distance отрицательны
+        """
+        if limit < 0:
+            raise ValueError("Количество книг не может быть отрицательным")
+        if max_distance is not None and max_distance < 0:
+            raise ValueError("Допустимое число опечаток не может быть отрицательным")
+        if not query:
+            return []
+        matches = self._get_fuzzy_index().search(str(query), max_distance, limit)
+        return list(self._get_books(book_id for _, book_id in matches))
+
+    @metrics.timed("library.autocomplete")
+    @_read_locked
+    def autocomplete(self, prefix: str, limit: int = 10) -> list[str]:
+        """
+        Варианты дополнения последнего слова запроса
+
+        Args:
+            prefix: Начало запроса
+            limit: Максимальное количество вариантов
+
+        Returns:
+            list[str]: запросы, последнее слово которых дополнено словами
+                из названий и авторов, начиная с самых частых
+
+        Raises:
+            ValueError: если limit отрицателен
+        """
+        if limit < 0:
+            raise ValueError("Количество вариантов не может быть отрицательным")
+        if not prefix:
+            return []
+        return self._get_fuzzy_index().complete(str(prefix), limit)
+
+    def search_cache_stats(self) -> dict[str, int]:
+        """Статистика кэша поиска: попадания, промахи, вытеснения, размер"""
+        return self._search_cache.stats()
+
+    # Ключи сортировки find_books; ID в конце делает порядок однозначным
+    _SORT_KEYS = {
+        "id": lambda book: book.id,
+        "title": lambda book: (book.title_key, book.id),
+        "author": lambda book: (book.author_key, book.id),
+        "year": lambda book: (book.year, book.id),
+    }
+
+    @metrics.timed("library.find_books")
+    @_read_locked
+    def find_books(
+        self,
+        author: str | None = None,
+        status: str | None = None,
+        year_from: int | None = None,
+        year_to: int | None = None,
+        title_prefix: str | None = None,
+        sort_by: str = "id",
+        descending: bool = False,
+        limit: int | None = None,
+    ) -> list[Book]:
+        """
+        Выбирает книги по набору условий
+
+        Условия объединяются через «и». Кандидаты берутся из самого
+        избирательного вторичного индекса, остальные условия проверяются
+        для каждого кандидата.
+
+        Args:
+            author: Автор (точное совпадение без учета регистра)
+            status: Статус книги
+            year_from: Минимальный год издания (включительно)
+            year_to: Максимальный год издания (включительно)
+            title_prefix: Начало названия (без учета регистра)
+            sort_by: Поле сортировки: "id", "title", "author" или "year"
+            descending: Сортировать по убыванию
+            limit: Максимальное количество книг (None — все)
+
+        Returns:
+            list[Book]: найденные книги
+
+        Raises:
+            ValueError: если статус, поле сортировки или limit некорректны
+        """
+        if status is not None:
+            is_valid, error = BookValidator.validate_status(status)
+            if not is_valid:
+                raise ValueError(error)
+            status = BookStatus(status)
+        sort_key = self._SORT_KEYS.get(sort_by)
+        if sort_key is None:
+            valid_keys = ", ".join(self._SORT_KEYS)
+            raise ValueError(
+                f"Недопустимое поле сортировки. Допустимые значения: {valid_keys}"
+            )
+        if limit is not None and limit < 0:
+            raise ValueError("Количество книг не может быть отрицательным")
+
+        conditions = {
+            "author": author,
+            "status": status,
+            "year_from": year_from,
+            "year_to": year_to,
+            "title_prefix": title_prefix,
+        }
+        self._ensure_indexes()
+        plan = self._indexes.plan(self._books, **conditions)
+        matches = self._indexes.make_filter(**conditions)
+        if sort_by == "id" and limit is not None:
+            # Просмотр книг по порядку ID до limit совпадений выгоднее индекса,
+            # если ожидаемое число просмотренных книг (limit / доля совпадений)
+            # меньше числа кандидатов индекса
+            if plan is None or limit * len(self._books) < plan[1] * plan[1]:
+                ids = self._ordered_ids()
+                if descending:
+                    ids = reversed(ids)
+                if self._removed_ids:
+                    ids = filterfalse(self._removed_ids.__contains__, ids)
+                books = map(self._books.__getitem__, ids)
+                if plan is not None:
+                    books = filter(matches, books)
+                return list(islice(books, limit))
+
+        if plan is None:
+            books = self._books.values()
+        else:
+            _, _, candidate_ids = plan
+            books = filter(matches, self._get_books(candidate_ids))
+
+        if limit is None:
+            return sorted(books, key=sort_key, reverse=descending)
+        select = heapq.nlargest if descending else heapq.nsmallest
+        return select(limit, books, key=sort_key)
+
+    @metrics.timed("library.snapshot")
+    @_read_locked
+    def snapshot(self) -> BookSnapshot:
+        """
+        Возвращает неизменяемый снимок книг в порядке добавления
+
+        Снимок создается за O(1) без копирования книг и не меняется при
+        последующих изменениях библиотеки (книги тоже не изменяются на
+        месте: change_status заменяет объект книги). Перебирать снимок
+        можно без блокировок, в том числе во время записи из других
+        потоков. В колоночном режиме снимок создается копированием.
+
+        Returns:
+            BookSnapshot: снимок с версией данных (version)
+        """
+        return self._snapshot()
+
+    def _snapshot(self) -> BookSnapshot:
+        """Создает снимок книг (блокировка на чтение уже захвачена)"""
+        if self._sequence is None:
+            return BookSnapshot(
+                [list(self._books.values())], len(self._books), self._version
+            )
+        return self._sequence.snapshot(self._version)
+
+    @metrics.timed("library.get_all_books")
     def get_all_books(self) -> list[Book]:
         """Возвращает список всех книг"""
-        return self._books.copy()
+        # Список строится из снимка вне блокировки
+        return list(self.snapshot())
+
+    @_read_locked
+    def count_books(self) -> int:
+        """Возвращает количество книг в библиотеке"""
+        return len(self._books)
+
+    def iter_books(self) -> Iterator[Book]:
+        """
+        Перебирает книги в порядке добавления без копирования списка
 
+        Перебирается снимок на момент вызова (см. snapshot), поэтому
+        библиотеку можно изменять во время перебора.
+        """
+        return iter(self.snapshot())
+
+    @metrics.timed("library.get_books_page")
+    @_read_locked
+    def get_books_page(self, offset: int = 0, limit: int = 20) -> list[Book]:
+        """
+        Возвращает страницу книг в порядке добавления
+
+        Args:
+            offset: Количество пропускаемых книг
+            limit: Максимальное количество книг на странице
+
+        Raises:
+            ValueError: если offset или limit отрицательны
+        """
+        if offset < 0 or limit < 0:
+            raise ValueError("Смещение и размер страницы не могут быть отрицательными")
+        return self._snapshot().page(offset, limit)
+
+    @metrics.timed("library.get_books_after")
+    @_read_locked
+    def get_books_after(
+        self, after_id: int | None = None, limit: int = 20
+    ) -> list[Book]:
+        """
+        Возвращает страницу книг с ID больше заданного, в порядке возрастания ID
+
+        В отличие от get_books_page, стоимость не зависит от номера страницы.
+
+        Args:
+            after_id: ID последней книги предыдущей страницы (None — с начала)
+            limit: Максимальное количество книг на странице
+
+        Raises:
+            ValueError: если limit отрицателен
+        """
+        if limit < 0:
+            raise ValueError("Размер страницы не может быть отрицательным")
+        ids = self._ordered_ids()
+        start = 0 if after_id is None else bisect_right(ids, after_id)
+        removed = self._removed_ids
+        if not removed:
+            return list(self._get_books(ids[start : start + limit]))
+        page_ids = []
+        for position in range(start, len(ids)):
+            if len(page_ids) >= limit:
+                break
+            if ids[position] not in removed:
+                page_ids.append(ids[position])
+        return list(self._get_books(page_ids))
+
+    @metrics.timed("library.change_status")
+    @_write_locked
     def change_status(self, book_id: int, new_status: str) -> Book | None:
         """
         Изменяет статус книги
@@ -103,13 +942,27 @@ class LibraryService:
         if not is_valid:
             raise ValueError(error)
 
-        for book in self._books:
-            if book.id == book_id:
-                book.status = BookStatus(new_status)
-                self._save_books()
-                return book
-        return None
+        old_book = self._books.get(book_id)
+        if old_book is None:
+            return None
+        book = self._replace_status(old_book, BookStatus(new_status))
+        self._persist_changes(upserts=[book])
+        return book
+
+    def _replace_status(self, old_book: Book, status: BookStatus) -> Book:
+        """Заменяет книгу в памяти копией с новым статусом и обновляет индексы"""
+        # Книга заменяется новым объектом, чтобы не изменять книги в снимках
+        book = dataclasses.replace(old_book, status=status)
+        self._books[book.id] = book
+        if self._sequence is not None:
+            self._sequence.replace(book)
+        self._version += 1
+        if self._indexes_ready:
+            self._indexes.update_status(book.id, old_book.status, book.status)
+        return book
 
+    @metrics.timed("library.get_book_by_id")
+    @_read_locked
     def get_book_by_id(self, book_id: int) -> Book | None:
         """
         Получает книгу по ID
@@ -121,7 +974,4 @@ class LibraryService:
         if not is_valid:
             raise ValueError(error)
 
-        for book in self._books:
-            if book.id == book_id:
-                return book
-        return None
+        return self._books.get(book_id)
@@ -0,0 +1,181 @@
+from array import array
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from config import PARALLEL_MIN_BOOKS, PARALLEL_WORKERS
+from models import Book, BookStatus, normalize_author, normalize_text
+from services.search_index import SearchIndex
+from services.segmented_storage_service import (
+    SegmentedStorageService,
+    read_segment_file,
+)
+from services.storage_service import BaseStorageService
+
+# Частей на процесс: небольшие части выравнивают нагрузку, если сегменты
+# разного размера
+PARTITIONS_PER_WORKER = 4
+
+# Загруженная часть каталога: строки книг (ID, название, автор, год, статус)
+# в порядке сегментов и массивы их ID по n-граммам для SearchIndex.add_postings.
+# Кортежи и массивы передаются между процессами в несколько раз быстрее
+# объектов Book
+LoadedPartition = tuple[list[tuple[int, str, str, int, str]], dict[str, array]]
+
+
+def use_parallel(
+    storage: BaseStorageService,
+    workers: int = PARALLEL_WORKERS,
+    min_books: int = PARALLEL_MIN_BOOKS,
+) -> bool:
+    """
+    Проверяет, стоит ли обрабатывать хранилище в пуле процессов
+
+    Пул используется только для сегментированного хранилища, если
+    процессов больше одного и в каталоге не меньше min_books книг.
+    """
+    return (
+        workers > 1
+        and isinstance(storage, SegmentedStorageService)
+        and storage.count_books() >= min_books
+    )
+
+
+def _partition(entries: list[dict], parts: int) -> list[list[dict]]:
+    """Делит сегменты на смежные части с близким числом книг"""
+    total = sum(entry["count"] for entry in entries)
+    target = max(1, -(-total // parts))
+    partitions = [[]]
+    size = 0
+    for entry in entries:
+        if size >= target:
+            partitions.append([])
+            size = 0
+        partitions[-1].append(entry)
+        size += entry["count"]
+    return [partition for partition in partitions if partition]
+
+
+def _load_partition(directory: str, entries: list[dict]) -> LoadedPartition:
+    """Разбирает сегменты части и собирает n-граммы ее книг (в процессе пула)"""
+    rows = []
+    postings: dict[str, list[int]] = {}
+    for entry in entries:
+        for data in read_segment_file(
+            Path(directory) / entry["file"], entry["checksum"]
+        ):
+            book = Book.from_dict(data)
+            rows.append((book.id, book.title, book.author, book.year, data["status"]))
+            for ngram in SearchIndex.book_ngrams(book):
+                ids = postings.get(ngram)
+                if ids is None:
+                    postings[ngram] = [book.id]
+                else:
+                    ids.append(book.id)
+    return rows, {ngram: array("q", ids) for ngram, ids in postings.items()}
+
+
+def partition_books(rows: list[tuple[int, str, str, int, str]]) -> Iterator[Book]:
+    """Создает книги из строк загруженной части"""
+    for book_id, title, author, year, status in rows:
+        yield Book(book_id, title, author, year, BookStatus(status))
+
+
+def _search_partition(directory: str, entries: list[dict], query: str) -> list[dict]:
+    """Ищет нормализованный запрос в книгах сегментов части (в процессе пула)"""
+    found = []
+    for entry in entries:
+        for data in read_segment_file(
+            Path(directory) / entry["file"], entry["checksum"]
+        ):
+            # Те же поля, что в SearchIndex.book_fields, без создания Book
+            if (
+                query in normalize_text(data["title"])
+                or query in normalize_author(data["author"])
+                or query in str(data["year"])
+            ):
+                found.append(data)
+    return found
+
+
+def load_partitions(
+    storage: SegmentedStorageService, workers: int = PARALLEL_WORKERS
+) -> tuple[Iterator[LoadedPartition], int]:
+    """
+    Загружает сегменты хранилища в пуле процессов
+
+    Процессы разбирают свои части каталога и собирают n-граммы для
+    поискового индекса; части возвращаются в порядке сегментов, то есть
+    по возрастанию ID. Книги части создаются partition_books. Как и для
+    load_data, если хранилище общее для нескольких процессов, итерацию
+    нужно выполнять внутри locked().
+
+    Args:
+        storage: Сегментированное хранилище
+        workers: Число процессов
+
+    Returns:
+        tuple[Iterator[LoadedPartition], int]: (части каталога, последний ID)
+
+    Raises:
+        StorageCorruptedError: при итерации, если сегмент поврежден
+    """
+    # load_data запоминает версию манифеста для has_changed
+    _, last_id = storage.load_data()
+    entries = storage.segments()
+    return _map_partitions(storage, entries, workers, _load_partition), last_id
+
+
+def _map_partitions(
+    storage: SegmentedStorageService,
+    entries: list[dict],
+    workers: int,
+    function,
+    *args,
+) -> Iterator:
+    """Выполняет функцию над частями сегментов в пуле, выдавая результаты по порядку"""
+    partitions = _partition(entries, workers * PARTITIONS_PER_WORKER)
+    directory = str(storage.directory)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(function, directory, partition, *args)
+            for partition in partitions
+        ]
+        for future in futures:
+            yield future.result()
+
+
+def search_segments(
+    storage: SegmentedStorageService,
+    query: str,
+    workers: int = PARALLEL_WORKERS,
+    min_books: int = PARALLEL_MIN_BOOKS,
+) -> list[dict]:
+    """
+    Поиск книг по подстроке прямо в файлах сегментов
+
+    В отличие от LibraryService.search_books не требует загрузки
+    библиотеки и построения индексов: сегменты просматриваются целиком,
+    для каталога от min_books книг — частями в пуле процессов. Запрос
+    сравнивается с полями книг так же, как в search_books.
+
+    Args:
+        storage: Сегментированное хранилище
+        query: Поисковый запрос
+        workers: Число процессов
+        min_books: Размер каталога, начиная с которого используется пул
+
+    Returns:
+        list[dict]: данные найденных книг в порядке сегментов (по возрастанию ID)
+
+    Raises:
+        StorageCorruptedError: если сегмент поврежден
+    """
+    query = normalize_text(str(query))
+    if not query:
+        return []
+    entries = storage.segments()
+    if not use_parallel(storage, workers, min_books):
+        return _search_partition(str(storage.directory), entries, query)
+    results = _map_partitions(storage, entries, workers, _search_partition, query)
+    return [book for found in results for book in found]
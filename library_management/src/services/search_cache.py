@@ -0,0 +1,93 @@
+import threading
+from collections import OrderedDict
+
+
+class SearchCache:
+    """
+    LRU-кэш результатов поиска: запрос → ID найденных книг
+
+    Результаты действительны для одного поколения данных библиотеки.
+    Библиотека увеличивает номер поколения при добавлении и удалении
+    книг; при обращении с новым номером кэш очищается. Размер кэша
+    ограничен числом запросов (max_entries) и суммарным числом ID во
+    всех результатах (max_ids); при превышении вытесняются давно не
+    использованные запросы. Результаты длиннее max_ids не кэшируются.
+    """
+
+    def __init__(self, max_entries: int, max_ids: int):
+        self.max_entries = max_entries
+        self.max_ids = max_ids
+        self._entries: OrderedDict[str, tuple[int, ...]] = OrderedDict()
+        self._generation: int | None = None
+        self._total_ids = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _check_generation(self, generation: int) -> None:
+        """Очищает кэш, если данные библиотеки изменились"""
+        if generation != self._generation:
+            self._entries.clear()
+            self._total_ids = 0
+            self._generation = generation
+
+    def get(self, query: str, generation: int) -> tuple[int, ...] | None:
+        """
+        Возвращает ID книг, найденных по запросу, или None при промахе
+
+        Args:
+            query: Нормализованный запрос
+            generation: Текущее поколение данных библиотеки
+        """
+        with self._lock:
+            self._check_generation(generation)
+            ids = self._entries.get(query)
+            if ids is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(query)
+            self.hits += 1
+            return ids
+
+    def put(self, query: str, generation: int, ids: tuple[int, ...]) -> None:
+        """
+        Запоминает результат поиска
+
+        Args:
+            query: Нормализованный запрос
+            generation: Поколение данных, для которого получен результат
+            ids: ID найденных книг
+        """
+        if not self.max_entries or len(ids) > self.max_ids:
+            return
+        with self._lock:
+            self._check_generation(generation)
+            previous = self._entries.pop(query, None)
+            if previous is not None:
+                self._total_ids -= len(previous)
+            self._entries[query] = ids
+            self._total_ids += len(ids)
+            while (
+                len(self._entries) > self.max_entries or self._total_ids > self.max_ids
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self._total_ids -= len(evicted)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Очищает кэш"""
+        with self._lock:
+            self._entries.clear()
+            self._total_ids = 0
+
+    def stats(self) -> dict[str, int]:
+        """Статистика кэша: попадания, промахи, вытеснения, размер"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "ids": self._total_ids,
+            }
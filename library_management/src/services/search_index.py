@@ -0,0 +1,113 @@
+from collections.abc import Iterable
+from itertools import count
+
+from models import Book
+
+
+class SearchIndex:
+    """
+    Инвертированный индекс триграмм для поиска книг по подстроке
+
+    Индексирует нормализованные название и автора (Book.title_key,
+    Book.author_key) и год книги. Поиск возвращает кандидатов, содержащих
+    все триграммы запроса; окончательную проверку вхождения подстроки
+    выполняет вызывающий код.
+    """
+
+    NGRAM_SIZE = 3
+
+    def __init__(self):
+        self._postings: dict[str, set[int]] = {}
+        # Порядковые номера добавления для сортировки результатов
+        self._order: dict[int, int] = {}
+        self._next_order = 0
+
+    @staticmethod
+    def book_fields(book: Book) -> tuple[str, str, str]:
+        """Возвращает индексируемые поля книги в том виде, в котором по ним ищут"""
+        return book.title_key, book.author_key, str(book.year)
+
+    @classmethod
+    def _ngrams(cls, text: str) -> set[str]:
+        """Возвращает множество n-грамм строки"""
+        size = cls.NGRAM_SIZE
+        return {text[i : i + size] for i in range(len(text) - size + 1)}
+
+    @classmethod
+    def book_ngrams(cls, book: Book) -> set[str]:
+        """Возвращает n-граммы всех полей книги (без n-грамм на стыке полей)"""
+        ngrams = set()
+        for field in cls.book_fields(book):
+            ngrams |= cls._ngrams(field)
+        return ngrams
+
+    def add(self, book: Book) -> None:
+        """Добавляет книгу в индекс"""
+        for ngram in self.book_ngrams(book):
+            self._postings.setdefault(ngram, set()).add(book.id)
+        self._order[book.id] = self._next_order
+        self._next_order += 1
+
+    def remove(self, book: Book) -> None:
+        """Удаляет книгу из индекса"""
+        for ngram in self.book_ngrams(book):
+            ids = self._postings.get(ngram)
+            if ids is None:
+                continue
+            ids.discard(book.id)
+            if not ids:
+                del self._postings[ngram]
+        self._order.pop(book.id, None)
+
+    def add_postings(self, ids: list[int], postings: dict[str, Iterable[int]]) -> None:
+        """
+        Добавляет книги, n-граммы которых собраны заранее
+
+        Используется при параллельной загрузке: списки ID по n-граммам
+        (см. book_ngrams) собираются в других процессах и объединяются
+        с индексом без обхода книг по одной.
+
+        Args:
+            ids: ID книг в порядке добавления
+            postings: n-грамма → ID книг, содержащих ее
+        """
+        for ngram, ngram_ids in postings.items():
+            existing = self._postings.get(ngram)
+            if existing is None:
+                self._postings[ngram] = set(ngram_ids)
+            else:
+                existing.update(ngram_ids)
+        self._order.update(zip(ids, count(self._next_order)))
+        self._next_order += len(ids)
+
+    def clear(self) -> None:
+        """Очищает индекс"""
+        self._postings.clear()
+        self._order.clear()
+        self._next_order = 0
+
+    def candidates(self, query: str) -> list[int] | None:
+        """
+        Возвращает ID книг, которые могут содержать запрос
+
+        Args:
+            query: Запрос, нормализованный normalize_text
+
+        Returns:
+            list[int] | None: ID кандидатов в порядке добавления книг или None,
+                              если запрос короче n-граммы и индекс неприменим
+        """
+        ngrams = self._ngrams(query)
+        if not ngrams:
+            return None
+
+        # Пересекаем, начиная с самых коротких списков
+        postings = sorted(
+            (self._postings.get(ngram, set()) for ngram in ngrams), key=len
+        )
+        result = set(postings[0])
+        for ids in postings[1:]:
+            if not result:
+                break
+            result &= ids
+        return sorted(result, key=self._order.__getitem__)
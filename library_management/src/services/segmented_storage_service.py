@@ -0,0 +1,370 @@
+import io
+import json
+import os
+import zlib
+from collections.abc import Iterable, Iterator
+from contextlib import nullcontext
+from pathlib import Path
+from typing import ContextManager
+
+from config import FILE_LOCKING, SEGMENT_SIZE, SEGMENTS_DIR
+from services.binary_snapshot import read_snapshot, write_snapshot
+from services.storage_service import (
+    BaseStorageService,
+    StorageCorruptedError,
+    fsync_directory,
+    fsync_file,
+)
+from utils.file_lock import FileLock
+from utils.metrics import metrics
+
+
+def read_segment_file(path: Path, checksum: int) -> Iterator[dict]:
+    """
+    Читает книги файла сегмента, проверяя контрольную сумму
+
+    Args:
+        path: Путь к файлу сегмента
+        checksum: CRC-32 файла из манифеста
+
+    Raises:
+        StorageCorruptedError: если файла нет, контрольная сумма не
+            совпадает или снимок поврежден
+    """
+    try:
+        with open(path, "rb") as file:
+            data = file.read()
+    except FileNotFoundError:
+        raise StorageCorruptedError(f"Файл сегмента {path.name} не найден") from None
+    if zlib.crc32(data) != checksum:
+        raise StorageCorruptedError(
+            f"Сегмент {path.name} поврежден: контрольная сумма не совпадает"
+        )
+    books, _ = read_snapshot(data)
+    return books
+
+
+class SegmentedStorageService(BaseStorageService):
+    """
+    Хранилище книг в файлах сегментов по диапазонам ID
+
+    Книга с ID n хранится в сегменте (n - 1) // segment_size; каждый
+    сегмент — двоичный снимок (см. services.binary_snapshot). Манифест
+    manifest.json содержит последний ID, размер сегмента и для каждого
+    сегмента имя файла, число книг и контрольную сумму CRC-32.
+
+    Точечные изменения (apply_changes) переписывают только сегменты,
+    в которые попали измененные книги, поэтому стоимость записи
+    пропорциональна объему изменений, а не размеру библиотеки.
+    Измененные сегменты записываются в новые файлы, после чего манифест
+    атомарно заменяется и старые файлы удаляются: при сбое остается
+    прежний согласованный набор сегментов.
+
+    При включенной блокировке (locking) запись выполняется под
+    исключительной блокировкой файла manifest.json.lock, а изменения
+    другими процессами определяются по inode, времени изменения и
+    размеру манифеста.
+    """
+
+    MANIFEST_VERSION = 1
+
+    def __init__(
+        self,
+        directory: str | Path = SEGMENTS_DIR,
+        segment_size: int = SEGMENT_SIZE,
+        locking: bool = FILE_LOCKING,
+    ):
+        if segment_size < 1:
+            raise ValueError("Размер сегмента должен быть положительным")
+        self.directory = Path(directory)
+        self.manifest_path = self.directory / "manifest.json"
+        self._file_lock = (
+            FileLock(self.directory / "manifest.json.lock") if locking else None
+        )
+        # Версия манифеста, известная этому экземпляру (после загрузки или записи)
+        self._known_version = None
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        try:
+            with self.locked():
+                manifest = self._read_manifest()
+                if manifest is None:
+                    # Сегменты без манифеста не удаляются и не перезаписываются
+                    if any(self.directory.glob("segment-*.bin")):
+                        raise StorageCorruptedError(
+                            f"В {self.directory} есть файлы сегментов, но нет манифеста"
+                        )
+                    manifest = self._new_manifest(segment_size)
+                    self._write_manifest(manifest)
+                else:
+                    self._remove_orphans(manifest)
+                # Размер сегмента существующего хранилища задан его манифестом
+                self.segment_size = manifest["segment_size"]
+        except BaseException:
+            self.close()
+            raise
+
+    def locked(self) -> ContextManager[None]:
+        """Контекст исключительного доступа к сегментам между процессами"""
+        if self._file_lock is None:
+            return nullcontext()
+        return self._file_lock.exclusive()
+
+    @property
+    def is_shared(self) -> bool:
+        """Может ли хранилище изменяться другими процессами (включена блокировка)"""
+        return self._file_lock is not None
+
+    def _manifest_version(self) -> tuple[int, int, int] | None:
+        try:
+            stat = os.stat(self.manifest_path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def has_changed(self) -> bool:
+        """Изменен ли манифест другим процессом после последней загрузки или записи"""
+        return self._manifest_version() != self._known_version
+
+    def close(self) -> None:
+        """Закрывает файл блокировки"""
+        if self._file_lock is not None:
+            self._file_lock.close()
+
+    @property
+    def supports_point_writes(self) -> bool:
+        """Поддерживает ли хранилище запись отдельных изменений"""
+        return True
+
+    def segment_index(self, book_id: int) -> int:
+        """Возвращает номер сегмента, в котором хранится книга"""
+        return (book_id - 1) // self.segment_size
+
+    @classmethod
+    def _new_manifest(cls, segment_size: int) -> dict:
+        """Манифест пустого хранилища"""
+        return {
+            "version": cls.MANIFEST_VERSION,
+            "segment_size": segment_size,
+            "last_id": 0,
+            "generation": 0,
+            "segments": {},
+        }
+
+    def _read_manifest(self) -> dict | None:
+        """
+        Читает манифест
+
+        Returns:
+            dict | None: манифест с сегментами по номеру или None, если
+                манифеста нет
+
+        Raises:
+            StorageCorruptedError: если манифест поврежден или его версия
+                не поддерживается; файлы сегментов при этом не изменяются
+        """
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            raise StorageCorruptedError(f"Манифест сегментов поврежден: {e}") from e
+        if not isinstance(data, dict) or data.get("version") != self.MANIFEST_VERSION:
+            raise StorageCorruptedError(
+                "Манифест сегментов поврежден или имеет неподдерживаемую версию"
+            )
+        try:
+            data["segments"] = {entry["index"]: entry for entry in data["segments"]}
+            for key in ("segment_size", "last_id", "generation"):
+                data[key] = int(data[key])
+        except (KeyError, TypeError, ValueError) as e:
+            raise StorageCorruptedError(f"Манифест сегментов поврежден: {e}") from e
+        return data
+
+    def _write_manifest(self, manifest: dict) -> None:
+        """Атомарно заменяет манифест"""
+        data = dict(manifest)
+        data["segments"] = [
+            manifest["segments"][index] for index in sorted(manifest["segments"])
+        ]
+        temp_path = self.manifest_path.with_name(self.manifest_path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(data, file, ensure_ascii=False)
+            fsync_file(file)
+        os.replace(temp_path, self.manifest_path)
+        fsync_directory(self.directory)
+        self._known_version = self._manifest_version()
+
+    def _remove_orphans(self, manifest: dict) -> None:
+        """Удаляет файлы сегментов, не попавшие в манифест из-за сбоя записи"""
+        used = {entry["file"] for entry in manifest["segments"].values()}
+        for path in self.directory.glob("segment-*.bin"):
+            if path.name not in used:
+                path.unlink(missing_ok=True)
+
+    def _read_segment(self, entry: dict) -> Iterator[dict]:
+        """Читает книги сегмента из записи манифеста (см. read_segment_file)"""
+        return read_segment_file(self.directory / entry["file"], entry["checksum"])
+
+    def segments(self) -> list[dict]:
+        """
+        Возвращает записи манифеста о сегментах в порядке номеров
+
+        Returns:
+            list[dict]: записи с ключами index, file (имя файла в directory),
+                count и checksum
+        """
+        manifest = self._read_manifest()
+        if manifest is None:
+            return []
+        return [manifest["segments"][index] for index in sorted(manifest["segments"])]
+
+    def _commit(
+        self, manifest: dict, segments: dict[int, list[dict]], last_id: int
+    ) -> None:
+        """
+        Записывает сегменты и новый манифест
+
+        Args:
+            manifest: Текущий манифест
+            segments: Новое содержимое сегментов по номеру; пустой список
+                удаляет сегмент
+            last_id: Последний использованный ID
+        """
+        generation = manifest["generation"] + 1
+        entries = dict(manifest["segments"])
+        obsolete = []
+        bytes_written = 0
+        for index, books in segments.items():
+            old_entry = entries.pop(index, None)
+            if old_entry is not None:
+                obsolete.append(old_entry["file"])
+            if not books:
+                continue
+            buffer = io.BytesIO()
+            write_snapshot(buffer, books, 0)
+            data = buffer.getvalue()
+            name = f"segment-{index:06d}-{generation}.bin"
+            with open(self.directory / name, "wb") as file:
+                file.write(data)
+                fsync_file(file)
+            bytes_written += len(data)
+            entries[index] = {
+                "index": index,
+                "file": name,
+                "count": len(books),
+                "checksum": zlib.crc32(data),
+            }
+
+        if bytes_written:
+            # Новые файлы сегментов должны оказаться на диске раньше манифеста
+            fsync_directory(self.directory)
+        manifest = dict(manifest, generation=generation, last_id=last_id)
+        manifest["segments"] = entries
+        self._write_manifest(manifest)
+        for name in obsolete:
+            (self.directory / name).unlink(missing_ok=True)
+        metrics.increment("storage.segments_written", len(segments))
+        metrics.increment("storage.bytes_written", bytes_written)
+
+    def load_data(self) -> tuple[Iterable[dict], int]:
+        """
+        Загружает данные и последний использованный ID
+
+        Сегменты читаются по одному по мере итерации. Если хранилище могут
+        изменять другие процессы, итерацию нужно выполнять внутри locked().
+
+        Returns:
+            tuple[Iterable[dict], int]: (книги, последний использованный ID)
+
+        Raises:
+            StorageCorruptedError: если поврежден манифест, а при итерации —
+                если поврежден сегмент
+        """
+        self._known_version = self._manifest_version()
+        manifest = self._read_manifest()
+        if manifest is None:
+            return [], 0
+        return self._iter_books(manifest), manifest["last_id"]
+
+    def _iter_books(self, manifest: dict) -> Iterator[dict]:
+        """Книги всех сегментов в порядке номеров сегментов"""
+        segments = manifest["segments"]
+        for index in sorted(segments):
+            yield from self._read_segment(segments[index])
+
+    @metrics.timed("storage.save_data")
+    def save_data(self, books: Iterable[dict], last_id: int) -> None:
+        """
+        Сохраняет данные и последний использованный ID, переписывая все сегменты
+
+        Args:
+            books: Книги
+            last_id: Последний использованный ID
+        """
+        segments: dict[int, list[dict]] = {}
+        for book in books:
+            segments.setdefault(self.segment_index(book["id"]), []).append(book)
+        with self.locked():
+            manifest = self._read_manifest() or self._new_manifest(self.segment_size)
+            for index in manifest["segments"]:
+                segments.setdefault(index, [])
+            self._commit(manifest, segments, last_id)
+
+    @metrics.timed("storage.apply_changes")
+    def apply_changes(
+        self, upserts: list[dict], deletes: list[int], last_id: int
+    ) -> None:
+        """
+        Переписывает сегменты с добавленными/измененными и удаленными книгами
+
+        Args:
+            upserts: Добавленные или измененные книги
+            deletes: ID удаленных книг
+            last_id: Последний использованный ID
+        """
+        # Изменения по сегментам: ID → книга или None, если удалена
+        changes: dict[int, dict[int, dict | None]] = {}
+        for book in upserts:
+            changes.setdefault(self.segment_index(book["id"]), {})[book["id"]] = book
+        for book_id in deletes:
+            changes.setdefault(self.segment_index(book_id), {})[book_id] = None
+
+        with self.locked():
+            manifest = self._read_manifest() or self._new_manifest(self.segment_size)
+            segments = {}
+            for index, segment_changes in changes.items():
+                entry = manifest["segments"].get(index)
+                books = (
+                    {book["id"]: book for book in self._read_segment(entry)}
+                    if entry is not None
+                    else {}
+                )
+                for book_id, book in segment_changes.items():
+                    if book is None:
+                        books.pop(book_id, None)
+                    else:
+                        books[book_id] = book
+                segments[index] = list(books.values())
+            self._commit(manifest, segments, last_id)
+
+    def get_book(self, book_id: int) -> dict | None:
+        """Возвращает данные книги по ID или None, читая только ее сегмент"""
+        manifest = self._read_manifest()
+        if manifest is None:
+            return None
+        entry = manifest["segments"].get(self.segment_index(book_id))
+        if entry is None:
+            return None
+        return next(
+            (book for book in self._read_segment(entry) if book["id"] == book_id),
+            None,
+        )
+
+    def count_books(self) -> int:
+        """Возвращает количество книг по манифесту"""
+        manifest = self._read_manifest()
+        if manifest is None:
+            return 0
+        return sum(entry["count"] for entry in manifest["segments"].values())
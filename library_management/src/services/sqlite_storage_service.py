@@ -0,0 +1,257 @@
+import sqlite3
+import threading
+from collections.abc import Iterable, Iterator
+from contextlib import nullcontext
+from pathlib import Path
+from typing import ContextManager
+from config import FILE_LOCKING, SQLITE_FILE
+from services.storage_service import BaseStorageService
+from utils.file_lock import FileLock
+from utils.metrics import metrics
+
+
+class SQLiteStorageService(BaseStorageService):
+    """
+    Хранилище книг в базе SQLite
+
+    Каждая книга хранится отдельной строкой, поэтому точечные изменения
+    записывают только затронутые строки. Последний использованный ID
+    хранится в таблице meta. Изменения другими процессами определяются
+    по PRAGMA data_version, а чтение-изменение-запись между процессами
+    упорядочивается блокировкой файла books.db.lock.
+    """
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS books (
+            id INTEGER PRIMARY KEY,
+            title TEXT NOT NULL,
+            author TEXT NOT NULL,
+            year INTEGER NOT NULL,
+            status TEXT NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS idx_books_author ON books (author);
+        CREATE INDEX IF NOT EXISTS idx_books_year ON books (year);
+        CREATE INDEX IF NOT EXISTS idx_books_status ON books (status);
+        CREATE TABLE IF NOT EXISTS meta (
+            key TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        );
+    """
+
+    _UPSERT = """
+        INSERT INTO books (id, title, author, year, status)
+        VALUES (:id, :title, :author, :year, :status)
+        ON CONFLICT (id) DO UPDATE SET
+            title = excluded.title,
+            author = excluded.author,
+            year = excluded.year,
+            status = excluded.status
+    """
+
+    _COLUMNS = ("id", "title", "author", "year", "status")
+
+    # Число ID в одном запросе get_books (ограничение числа параметров SQLite)
+    _MAX_QUERY_IDS = 500
+
+    def __init__(self, db_path: str | Path = SQLITE_FILE, locking: bool = FILE_LOCKING):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._file_lock = (
+            FileLock(self.db_path.with_name(self.db_path.name + ".lock"))
+            if locking
+            else None
+        )
+        self._connection = sqlite3.connect(self.db_path, check_same_thread=False)
+        with self._lock, self._connection:
+            self._connection.executescript(self._SCHEMA)
+        self._known_version = None
+
+    def locked(self) -> ContextManager[None]:
+        """Контекст исключительного доступа к базе между процессами"""
+        if self._file_lock is None:
+            return nullcontext()
+        return self._file_lock.exclusive()
+
+    @property
+    def is_shared(self) -> bool:
+        """Может ли хранилище изменяться другими процессами (включена блокировка)"""
+        return self._file_lock is not None
+
+    def _data_version(self) -> int:
+        """Значение PRAGMA data_version, меняющееся при записи другими соединениями"""
+        with self._lock:
+            return self._connection.execute("PRAGMA data_version").fetchone()[0]
+
+    def has_changed(self) -> bool:
+        """Изменена ли база другим соединением после последней загрузки"""
+        return self._data_version() != self._known_version
+
+    @property
+    def supports_point_writes(self) -> bool:
+        """Поддерживает ли хранилище запись отдельных изменений"""
+        return True
+
+    @property
+    def supports_lazy_load(self) -> bool:
+        """Быстро ли хранилище читает отдельные книги по ID"""
+        return True
+
+    def load_data(self) -> tuple[Iterator[dict], int]:
+        """
+        Загружает данные и последний использованный ID
+
+        Книги читаются из курсора по мере итерации, без промежуточного списка.
+
+        Returns:
+            tuple[Iterator[dict], int]: (книги в порядке ID, последний ID)
+        """
+        self._known_version = self._data_version()
+        rows = self._iter_rows(
+            "SELECT id, title, author, year, status FROM books ORDER BY id"
+        )
+        columns = self._COLUMNS
+        return (dict(zip(columns, row)) for row in rows), self._get_last_id()
+
+    def load_keys(self) -> tuple[Iterator[tuple[int, str, str, int]], int]:
+        """
+        Загружает ключевые поля книг и последний использованный ID
+
+        Returns:
+            tuple[Iterator[tuple[int, str, str, int]], int]: ((ID, название,
+                автор, год) книг в порядке ID, последний использованный ID)
+        """
+        self._known_version = self._data_version()
+        rows = self._iter_rows("SELECT id, title, author, year FROM books ORDER BY id")
+        return rows, self._get_last_id()
+
+    def _iter_rows(self, query: str) -> Iterator[tuple]:
+        """Построчно читает результат запроса, без промежуточного списка"""
+        with self._lock:
+            cursor = self._connection.execute(query)
+        while True:
+            with self._lock:
+                rows = cursor.fetchmany(1000)
+            if not rows:
+                return
+            yield from rows
+
+    def _get_last_id(self) -> int:
+        """Возвращает последний использованный ID"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM meta WHERE key = 'last_id'"
+            ).fetchone()
+        return row[0] if row else 0
+
+    @staticmethod
+    def _set_last_id(connection: sqlite3.Connection, last_id: int) -> None:
+        connection.execute(
+            "INSERT INTO meta (key, value) VALUES ('last_id', ?) "
+            "ON CONFLICT (key) DO UPDATE SET value = excluded.value",
+            (last_id,),
+        )
+
+    @metrics.timed("storage.sqlite.save_data")
+    def save_data(self, books: Iterable[dict], last_id: int) -> None:
+        """
+        Полностью заменяет данные в базе
+
+        Args:
+            books: Книги
+            last_id: Последний использованный ID
+        """
+        with self._lock, self._connection:
+            self._connection.execute("DELETE FROM books")
+            self._connection.executemany(self._UPSERT, books)
+            self._set_last_id(self._connection, last_id)
+
+    @metrics.timed("storage.sqlite.apply_changes")
+    def apply_changes(
+        self, upserts: list[dict], deletes: list[int], last_id: int
+    ) -> None:
+        """
+        Записывает добавленные/измененные и удаленные книги одной транзакцией
+
+        Args:
+            upserts: Добавленные или измененные книги
+            deletes: ID удаленных книг
+            last_id: Последний использованный ID
+        """
+        with self._lock, self._connection:
+            self._connection.executemany(self._UPSERT, upserts)
+            self._connection.executemany(
+                "DELETE FROM books WHERE id = ?", [(book_id,) for book_id in deletes]
+            )
+            self._set_last_id(self._connection, last_id)
+
+    def get_book(self, book_id: int) -> dict | None:
+        """Возвращает данные книги по ID или None"""
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id, title, author, year, status FROM books WHERE id = ?",
+                (book_id,),
+            ).fetchone()
+        return dict(zip(self._COLUMNS, row)) if row else None
+
+    def get_books(self, book_ids: Iterable[int]) -> list[dict]:
+        """Возвращает данные найденных книг в порядке переданных ID"""
+        book_ids = list(book_ids)
+        found = {}
+        for start in range(0, len(book_ids), self._MAX_QUERY_IDS):
+            chunk = book_ids[start : start + self._MAX_QUERY_IDS]
+            placeholders = ", ".join("?" * len(chunk))
+            with self._lock:
+                rows = self._connection.execute(
+                    "SELECT id, title, author, year, status FROM books "
+                    f"WHERE id IN ({placeholders})",
+                    chunk,
+                ).fetchall()
+            for row in rows:
+                found[row[0]] = dict(zip(self._COLUMNS, row))
+        return [found[book_id] for book_id in book_ids if book_id in found]
+
+    def count_books(self) -> int:
+        """Возвращает количество книг в хранилище"""
+        with self._lock:
+            return self._connection.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+
+    def find_books(
+        self,
+        author: str | None = None,
+        year: int | None = None,
+        status: str | None = None,
+    ) -> list[dict]:
+        """
+        Выбирает книги по точному совпадению полей с использованием индексов
+
+        Args:
+            author: Автор книги
+            year: Год издания
+            status: Статус книги
+
+        Returns:
+            list[dict]: найденные книги в порядке ID
+        """
+        conditions = []
+        params = []
+        for column, value in (("author", author), ("year", year), ("status", status)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                params.append(value)
+
+        query = "SELECT id, title, author, year, status FROM books"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY id"
+
+        with self._lock:
+            rows = self._connection.execute(query, params).fetchall()
+        return [dict(zip(self._COLUMNS, row)) for row in rows]
+
+    def close(self) -> None:
+        """Закрывает соединение с базой"""
+        with self._lock:
+            self._connection.close()
+        if self._file_lock is not None:
+            self._file_lock.close()
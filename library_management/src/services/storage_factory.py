@@ -0,0 +1,32 @@
+from config import STORAGE_BACKEND
+from services.binary_storage_service import BinaryStorageService
+from services.segmented_storage_service import SegmentedStorageService
+from services.storage_service import BaseStorageService, StorageService
+from services.sqlite_storage_service import SQLiteStorageService
+
+STORAGE_BACKENDS: dict[str, type[BaseStorageService]] = {
+    "json": StorageService,
+    "binary": BinaryStorageService,
+    "sqlite": SQLiteStorageService,
+    "segmented": SegmentedStorageService,
+}
+
+
+def create_storage(backend: str = STORAGE_BACKEND) -> BaseStorageService:
+    """
+    Создает хранилище выбранного типа с настройками по умолчанию
+
+    Args:
+        backend: Название хранилища из STORAGE_BACKENDS
+
+    Raises:
+        ValueError: если хранилище с таким названием не существует
+    """
+    try:
+        storage_class = STORAGE_BACKENDS[backend]
+    except KeyError:
+        valid_backends = ", ".join(STORAGE_BACKENDS)
+        raise ValueError(
+            f"Неизвестное хранилище '{backend}'. Допустимые значения: {valid_backends}"
+        ) from None
+    return storage_class()
@@ -1,24 +1,306 @@
 import json
+import os
+from abc import ABC, abstractmethod
+from collections.abc import Iterable, Iterator
+from contextlib import nullcontext
 from pathlib import Path
-from config import BOOKS_FILE
+from time import perf_counter
+from typing import IO, ContextManager, TextIO
+from config import (
+    BOOKS_FILE,
+    FILE_LOCKING,
+    JOURNAL_COMPACT_RATIO,
+    JOURNAL_COMPACT_THRESHOLD,
+    STORAGE_JOURNAL,
+)
+from services.json_stream import open_books_stream, write_books
+from utils.file_lock import FileLock
+from utils.metrics import metrics
 
 
-class StorageService:
-    """Сервис для работы с хранилищем данных"""
+class StorageCorruptedError(ValueError):
+    """Данные в хранилище повреждены и не могут быть прочитаны"""
 
-    def __init__(self, file_path: str | Path = BOOKS_FILE):
+
+def fsync_file(file: IO) -> None:
+    """Сбрасывает буферы открытого файла на диск"""
+    file.flush()
+    os.fsync(file.fileno())
+
+
+def fsync_directory(path: Path) -> None:
+    """
+    Сбрасывает на диск записи каталога (созданные и переименованные файлы)
+
+    В Windows каталог нельзя открыть для fsync, там вызов ничего не делает.
+    """
+    if os.name == "nt":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+class _TimedWriter:
+    """Обертка файла, суммирующая время вызовов write"""
+
+    __slots__ = ("_file", "seconds")
+
+    def __init__(self, file: TextIO):
+        self._file = file
+        self.seconds = 0.0
+
+    def write(self, data: str) -> int:
+        started = perf_counter()
+        try:
+            return self._file.write(data)
+        finally:
+            self.seconds += perf_counter() - started
+
+
+class BaseStorageService(ABC):
+    """
+    Интерфейс хранилища книг
+
+    Хранилище обязано уметь загружать и целиком сохранять данные.
+    Хранилища с supports_point_writes = True дополнительно принимают
+    точечные изменения через apply_changes. Методы чтения отдельных
+    книг и ключей книг (load_keys) имеют реализацию по умолчанию через
+    load_data и могут быть переопределены хранилищами, умеющими
+    выполнять запросы; такие хранилища сообщают supports_lazy_load = True.
+
+    Хранилища, общие для нескольких процессов, предоставляют locked()
+    для чтения-изменения-записи и has_changed() для определения записи
+    другим процессом.
+    """
+
+    @property
+    def supports_point_writes(self) -> bool:
+        """Поддерживает ли хранилище запись отдельных изменений"""
+        return False
+
+    @abstractmethod
+    def load_data(self) -> tuple[Iterable[dict], int]:
+        """
+        Загружает данные и последний использованный ID
+
+        Returns:
+            tuple[Iterable[dict], int]: (книги, последний использованный ID)
+        """
+
+    @abstractmethod
+    def save_data(self, books: Iterable[dict], last_id: int) -> None:
+        """
+        Сохраняет данные и последний использованный ID
+
+        Args:
+            books: Книги
+            last_id: Последний использованный ID
+        """
+
+    def apply_changes(
+        self, upserts: list[dict], deletes: list[int], last_id: int
+    ) -> None:
+        """
+        Сохраняет добавленные/измененные и удаленные книги
+
+        Args:
+            upserts: Добавленные или измененные книги
+            deletes: ID удаленных книг
+            last_id: Последний использованный ID
+
+        Raises:
+            RuntimeError: если хранилище не поддерживает точечную запись
+        """
+        raise RuntimeError("Хранилище не поддерживает точечную запись")
+
+    def locked(self) -> ContextManager[None]:
+        """Контекст исключительного доступа к хранилищу между процессами"""
+        return nullcontext()
+
+    @property
+    def is_shared(self) -> bool:
+        """Может ли хранилище изменяться другими процессами"""
+        return False
+
+    def has_changed(self) -> bool:
+        """Изменено ли хранилище другим процессом после последней загрузки или записи"""
+        return False
+
+    @property
+    def supports_lazy_load(self) -> bool:
+        """
+        Быстро ли хранилище читает отдельные книги по ID
+
+        Такие хранилища LibraryService загружает без самих книг (load_keys)
+        и читает книги при обращении.
+        """
+        return False
+
+    def load_keys(self) -> tuple[Iterable[tuple[int, str, str, int]], int]:
+        """
+        Загружает ключевые поля книг и последний использованный ID
+
+        Returns:
+            tuple[Iterable[tuple[int, str, str, int]], int]: ((ID, название,
+                автор, год) книг в порядке ID, последний использованный ID)
+        """
+        books, last_id = self.load_data()
+        keys = sorted(
+            (book["id"], book["title"], book["author"], book["year"]) for book in books
+        )
+        return keys, last_id
+
+    def get_book(self, book_id: int) -> dict | None:
+        """Возвращает данные книги по ID или None"""
+        books, _ = self.load_data()
+        return next((book for book in books if book.get("id") == book_id), None)
+
+    def get_books(self, book_ids: Iterable[int]) -> list[dict]:
+        """Возвращает данные найденных книг в порядке переданных ID"""
+        books = (self.get_book(book_id) for book_id in book_ids)
+        return [book for book in books if book is not None]
+
+    def count_books(self) -> int:
+        """Возвращает количество книг в хранилище"""
+        books, _ = self.load_data()
+        return sum(1 for _ in books)
+
+    def close(self) -> None:
+        """Освобождает ресурсы хранилища"""
+
+
+class StorageService(BaseStorageService):
+    """
+    Сервис для работы с хранилищем данных в JSON-файле
+
+    В журнальном режиме точечные изменения (apply_changes) дописываются
+    отдельными строками в файл журнала рядом со снимком, а load_data
+    применяет журнал поверх снимка. Журнал сворачивается в новый снимок,
+    когда в нем не меньше compact_threshold записей и его размер достиг
+    compact_ratio от размера снимка. Второе условие делает стоимость
+    сворачивания пропорциональной объему изменений: при массовом добавлении
+    большой снимок не переписывается после каждой тысячи записей.
+
+    При включенной блокировке (locking) запись выполняется под
+    исключительной блокировкой файла books.json.lock, а изменения другими
+    процессами определяются по inode, времени изменения и размеру файлов.
+    """
+
+    def __init__(
+        self,
+        file_path: str | Path = BOOKS_FILE,
+        journal: bool = STORAGE_JOURNAL,
+        compact_threshold: int = JOURNAL_COMPACT_THRESHOLD,
+        locking: bool = FILE_LOCKING,
+        compact_ratio: float = JOURNAL_COMPACT_RATIO,
+    ):
         self.file_path = Path(file_path)
+        self.journal_path = self.file_path.with_name(self.file_path.name + ".journal")
+        self.journal = journal
+        self.compact_threshold = compact_threshold
+        self.compact_ratio = compact_ratio
+        self._journal_records = 0
+        self._file_lock = (
+            FileLock(self.file_path.with_name(self.file_path.name + ".lock"))
+            if locking
+            else None
+        )
+        # Версия файлов, известная этому экземпляру (после загрузки или записи)
+        self._known_version = None
+
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
-        if not self.file_path.exists():
-            self.save_data([], 0)
+        with self.locked():
+            if not self.file_path.exists() and not self.journal_path.exists():
+                self.save_data([], 0)
+            elif self.journal:
+                # Журнал без снимка применяется к пустому снимку при загрузке
+                self._journal_records = self._repair_journal()
+
+    def locked(self) -> ContextManager[None]:
+        """Контекст исключительного доступа к файлам между процессами"""
+        if self._file_lock is None:
+            return nullcontext()
+        return self._file_lock.exclusive()
 
-    def load_data(self) -> tuple[list[dict], int]:
+    @property
+    def is_shared(self) -> bool:
+        """Может ли хранилище изменяться другими процессами (включена блокировка)"""
+        return self._file_lock is not None
+
+    @staticmethod
+    def _stat_version(path: Path) -> tuple[int, int, int] | None:
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+    def _current_version(self) -> tuple:
+        """Версия файлов снимка и журнала"""
+        return self._stat_version(self.file_path), self._stat_version(self.journal_path)
+
+    def has_changed(self) -> bool:
+        """Изменены ли файлы другим процессом после последней загрузки или записи"""
+        return self._current_version() != self._known_version
+
+    def close(self) -> None:
+        """Закрывает файл блокировки"""
+        if self._file_lock is not None:
+            self._file_lock.close()
+
+    @property
+    def supports_point_writes(self) -> bool:
+        """Поддерживает ли хранилище запись отдельных изменений"""
+        return self.journal
+
+    def load_data(self) -> tuple[Iterable[dict], int]:
         """
         Загружает данные и последний использованный ID
 
+        Книги читаются из файла по одной по мере итерации, поэтому
+        файл не разбирается в память целиком. Если файл могут изменять
+        другие процессы, итерацию нужно выполнять внутри locked().
+
         Returns:
-            tuple[list[dict], int]: (список книг, последний использованный ID)
+            tuple[Iterable[dict], int]: (книги, последний использованный ID)
+
+        Raises:
+            StorageCorruptedError: при итерации, если файл поврежден
         """
+        self._known_version = self._current_version()
+        books, last_id = self._load_snapshot()
+        if self.journal:
+            books, last_id = self._replay_journal(books, last_id)
+        return books, last_id
+
+    def _load_snapshot(self) -> tuple[Iterable[dict], int]:
+        """Загружает снимок данных без учета журнала"""
+        try:
+            stream = open_books_stream(self.file_path)
+        except FileNotFoundError:
+            return [], 0
+        except json.JSONDecodeError:
+            return [], 0
+
+        if stream is None:
+            # Файл старого формата: last_id записан после списка книг
+            return self._load_snapshot_whole()
+        books, last_id = stream
+        return self._check_stream(books), last_id
+
+    @staticmethod
+    def _check_stream(books: Iterator[dict]) -> Iterator[dict]:
+        """Преобразует ошибки разбора при потоковом чтении в StorageCorruptedError"""
+        try:
+            yield from books
+        except json.JSONDecodeError as e:
+            raise StorageCorruptedError(f"Файл данных поврежден: {e}") from e
+
+    def _load_snapshot_whole(self) -> tuple[list[dict], int]:
+        """Загружает снимок данных целиком"""
         try:
             with open(self.file_path, "r", encoding="utf-8") as file:
                 data = json.load(file)
@@ -33,17 +315,207 @@ class StorageService:
         except json.JSONDecodeError:
             return [], 0
 
-    def save_data(self, books: list[dict], last_id: int) -> None:
+    def save_data(self, books: Iterable[dict], last_id: int) -> None:
         """
         Сохраняет данные и последний использованный ID
 
+        Данные пишутся во временный файл, который сбрасывается на диск
+        и затем заменяет основной; после сбоя питания остается старый или
+        новый снимок целиком. В журнальном режиме сохраненный снимок
+        заменяет журнал.
+
         Args:
-            books: Список книг
+            books: Книги
             last_id: Последний использованный ID
         """
-        data = {"books": books, "last_id": last_id}
         # Создаем директорию, если она не существует
         self.file_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(self.file_path, "w", encoding="utf-8") as file:
-            json.dump(data, file, ensure_ascii=False, indent=2)
+        temp_path = self.file_path.with_name(self.file_path.name + ".tmp")
+        with self.locked():
+            with metrics.timer("storage.save_data"):
+                self._write_snapshot(temp_path, books, last_id)
+                os.replace(temp_path, self.file_path)
+                fsync_directory(self.file_path.parent)
+            if metrics.enabled:
+                metrics.increment(
+                    "storage.bytes_written", self.file_path.stat().st_size
+                )
+
+            if self.journal_path.exists():
+                self.journal_path.unlink()
+            self._journal_records = 0
+            self._known_version = self._current_version()
+
+    def _write_snapshot(self, path: Path, books: Iterable[dict], last_id: int) -> None:
+        """Записывает снимок данных в файл и сбрасывает его на диск"""
+        with open(path, "w", encoding="utf-8") as file:
+            if metrics.enabled:
+                self._write_books_timed(file, books, last_id)
+            else:
+                write_books(file, books, last_id)
+            fsync_file(file)
+
+    @staticmethod
+    def _write_books_timed(file: TextIO, books: Iterable[dict], last_id: int) -> None:
+        """Записывает книги, раздельно замеряя сериализацию и запись в файл"""
+        writer = _TimedWriter(file)
+        started = perf_counter()
+        write_books(writer, books, last_id)
+        flush_started = perf_counter()
+        file.flush()
+        finished = perf_counter()
+        write_seconds = writer.seconds + finished - flush_started
+        metrics.observe("storage.save_data.write", write_seconds)
+        metrics.observe(
+            "storage.save_data.serialize", finished - started - write_seconds
+        )
+
+    @metrics.timed("storage.apply_changes")
+    def apply_changes(
+        self, upserts: list[dict], deletes: list[int], last_id: int
+    ) -> None:
+        """
+        Записывает в журнал добавленные/измененные и удаленные книги
+
+        Args:
+            upserts: Добавленные или измененные книги
+            deletes: ID удаленных книг
+            last_id: Последний использованный ID
+
+        Raises:
+            RuntimeError: если журнальный режим выключен
+        """
+        if not self.journal:
+            raise RuntimeError("Точечная запись доступна только в журнальном режиме")
+
+        records = [{"op": "upsert", "book": book} for book in upserts]
+        records += [{"op": "delete", "id": book_id} for book_id in deletes]
+        records.append({"op": "last_id", "last_id": last_id})
+
+        with metrics.timer("storage.apply_changes.serialize"):
+            data = "".join(
+                json.dumps(record, ensure_ascii=False) + "\n" for record in records
+            ).encode("utf-8")
+        with self.locked():
+            with metrics.timer("storage.apply_changes.write"):
+                with open(self.journal_path, "ab") as file:
+                    file.write(data)
+            metrics.increment("storage.bytes_written", len(data))
+            self._journal_records += len(records)
+            self._known_version = self._current_version()
+
+            if self._journal_records >= self.compact_threshold and (
+                self.journal_path.stat().st_size
+                >= self.compact_ratio * self._snapshot_size()
+            ):
+                self.compact()
+
+    def _snapshot_size(self) -> int:
+        """Размер файла снимка в байтах (0, если снимка еще нет)"""
+        try:
+            return self.file_path.stat().st_size
+        except FileNotFoundError:
+            return 0
+
+    def compact(self) -> None:
+        """Сворачивает журнал в новый снимок"""
+        with self.locked():
+            books, last_id = self.load_data()
+            self.save_data(books, last_id)
+
+    def _repair_journal(self) -> int:
+        """
+        Отрезает недописанный хвост журнала, чтобы новые записи не склеились с ним
+
+        Returns:
+            int: количество целых записей в журнале
+        """
+        valid_size = 0
+        records = 0
+        try:
+            with open(self.journal_path, "rb") as file:
+                for line in file:
+                    if not line.endswith(b"\n"):
+                        break
+                    try:
+                        json.loads(line)
+                    except json.JSONDecodeError:
+                        break
+                    valid_size += len(line)
+                    records += 1
+        except FileNotFoundError:
+            return 0
+
+        if self.journal_path.stat().st_size > valid_size:
+            with open(self.journal_path, "r+b") as file:
+                file.truncate(valid_size)
+        return records
+
+    def _read_journal(self) -> list[dict]:
+        """
+        Читает записи журнала
+
+        Недописанная последняя строка (например, после сбоя) пропускается.
+        """
+        records = []
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        break
+        except FileNotFoundError:
+            pass
+        return records
+
+    def _replay_journal(
+        self, books: Iterable[dict], last_id: int
+    ) -> tuple[Iterable[dict], int]:
+        """Применяет записи журнала к книгам снимка"""
+        # Итоговое состояние каждой затронутой книги: dict или None, если удалена
+        changes: dict[int, dict | None] = {}
+        records = self._read_journal()
+        self._journal_records = len(records)
+        for record in records:
+            op = record.get("op")
+            if op == "upsert":
+                book = record["book"]
+                changes[book["id"]] = book
+            elif op == "delete":
+                changes[record["id"]] = None
+            elif op == "last_id":
+                last_id = record["last_id"]
+
+        if not changes:
+            return books, last_id
+        return self._apply_journal_changes(books, changes), last_id
+
+    @staticmethod
+    def _apply_journal_changes(
+        books: Iterable[dict], changes: dict[int, dict | None]
+    ) -> Iterator[dict]:
+        """Заменяет или пропускает книги снимка согласно журналу"""
+        for book in books:
+            book_id = book.get("id")
+            if book_id in changes:
+                book = changes.pop(book_id)
+                if book is None:
+                    continue
+            yield book
+        # Оставшиеся изменения — книги, добавленные после снимка
+        yield from (book for book in changes.values() if book is not None)
+
+
+def convert_storage(source: BaseStorageService, target: BaseStorageService) -> None:
+    """
+    Копирует все книги и последний ID из одного хранилища в другое
+
+    Args:
+        source: Хранилище, из которого читаются данные
+        target: Хранилище, данные которого заменяются
+    """
+    with source.locked(), target.locked():
+        books, last_id = source.load_data()
+        target.save_data(books, last_id)
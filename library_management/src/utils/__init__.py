@@ -1,3 +1,4 @@
 from .validators import BookValidator
+from .metrics import Metrics, metrics
 
-__all__ = ["BookValidator"]
+__all__ = ["BookValidator", "Metrics", "metrics"]
@@ -0,0 +1,66 @@
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Iterator
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """
+    Межпроцессная рекомендательная блокировка через отдельный файл
+
+    Блокировка всегда исключительная: на POSIX используется flock,
+    на Windows — msvcrt.locking. Внутри процесса блокировка реентерабельна
+    для захватившего потока, а разные потоки процесса получают ее
+    по очереди.
+    """
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self._thread_lock = threading.RLock()
+        self._fd: int | None = None
+        self._depth = 0
+
+    def _lock_file(self) -> None:
+        if self._fd is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_LOCK, 1)
+
+    def _unlock_file(self) -> None:
+        if fcntl is not None:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+        else:
+            os.lseek(self._fd, 0, os.SEEK_SET)
+            msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+
+    @contextmanager
+    def exclusive(self) -> Iterator[None]:
+        """Контекст с исключительной блокировкой (для чтения-изменения-записи)"""
+        with self._thread_lock:
+            if not self._depth:
+                self._lock_file()
+            self._depth += 1
+            try:
+                yield
+            finally:
+                self._depth -= 1
+                if not self._depth:
+                    self._unlock_file()
+
+    def close(self) -> None:
+        """Закрывает файл блокировки"""
+        with self._thread_lock:
+            if self._fd is not None:
+                os.close(self._fd)
+                self._fd = None
@@ -0,0 +1,206 @@
+import json
+import re
+import threading
+from bisect import bisect_left
+from functools import wraps
+from pathlib import Path
+from time import perf_counter
+
+from config import METRICS_ENABLED
+
+
+class _Histogram:
+    """Гистограмма длительностей операции с фиксированными границами корзин"""
+
+    __slots__ = ("buckets", "counts", "count", "total")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self.buckets = buckets
+        # Последняя корзина — значения больше всех границ (+Inf)
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+    def to_dict(self) -> dict:
+        cumulative = []
+        running = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            running += count
+            cumulative.append(["+Inf" if bound == float("inf") else bound, running])
+        return {"count": self.count, "sum": self.total, "buckets": cumulative}
+
+
+class _Timer:
+    """Контекстный менеджер замера длительности блока"""
+
+    __slots__ = ("_metrics", "_name", "_started")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self._metrics = metrics
+        self._name = name
+        self._started = None
+
+    def __enter__(self):
+        if self._metrics.enabled:
+            self._started = perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._started is not None:
+            self._metrics.observe(self._name, perf_counter() - self._started)
+
+
+class Metrics:
+    """
+    Реестр счетчиков и гистограмм длительностей операций
+
+    Пока сбор выключен (enabled = False), декоратор timed и timer сводятся
+    к проверке флага, а observe/increment ничего не делают.
+    """
+
+    DEFAULT_BUCKETS = (
+        0.00001,
+        0.00005,
+        0.0001,
+        0.0005,
+        0.001,
+        0.005,
+        0.01,
+        0.05,
+        0.1,
+        0.5,
+        1.0,
+        5.0,
+    )
+
+    def __init__(
+        self, enabled: bool = False, buckets: tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        self.enabled = enabled
+        self._buckets = buckets
+        self._histograms: dict[str, _Histogram] = {}
+        self._counters: dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        """Включает сбор метрик"""
+        self.enabled = True
+
+    def disable(self) -> None:
+        """Выключает сбор метрик"""
+        self.enabled = False
+
+    def reset(self) -> None:
+        """Сбрасывает собранные значения"""
+        with self._lock:
+            self._histograms.clear()
+            self._counters.clear()
+
+    def observe(self, name: str, seconds: float) -> None:
+        """Добавляет длительность операции в гистограмму"""
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = _Histogram(self._buckets)
+            histogram.observe(seconds)
+
+    def increment(self, name: str, value: float = 1) -> None:
+        """Увеличивает счетчик"""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def timer(self, name: str) -> _Timer:
+        """Контекстный менеджер, записывающий длительность блока"""
+        return _Timer(self, name)
+
+    def timed(self, name: str):
+        """Декоратор, записывающий длительность каждого вызова функции"""
+
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                started = perf_counter()
+                try:
+                    return func(*args, **kwargs)
+                finally:
+                    self.observe(name, perf_counter() - started)
+
+            return wrapper
+
+        return decorator
+
+    def snapshot(self) -> dict:
+        """
+        Возвращает собранные метрики
+
+        Returns:
+            dict: {"operations": {имя: гистограмма}, "counters": {имя: значение}}
+        """
+        with self._lock:
+            return {
+                "operations": {
+                    name: histogram.to_dict()
+                    for name, histogram in sorted(self._histograms.items())
+                },
+                "counters": dict(sorted(self._counters.items())),
+            }
+
+    def to_json(self) -> str:
+        """Метрики в формате JSON"""
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self, prefix: str = "library") -> str:
+        """Метрики в текстовом формате Prometheus"""
+        snapshot = self.snapshot()
+        lines = []
+
+        if snapshot["operations"]:
+            metric = f"{prefix}_operation_duration_seconds"
+            lines.append(f"# TYPE {metric} histogram")
+            for name, histogram in snapshot["operations"].items():
+                label = f'operation="{name}"'
+                for bound, count in histogram["buckets"]:
+                    lines.append(f'{metric}_bucket{{{label},le="{bound}"}} {count}')
+                lines.append(f"{metric}_sum{{{label}}} {histogram['sum']}")
+                lines.append(f"{metric}_count{{{label}}} {histogram['count']}")
+
+        for name, value in snapshot["counters"].items():
+            metric = f"{prefix}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}_total"
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path: str | Path, format: str = "json") -> None:
+        """
+        Записывает метрики в файл
+
+        Args:
+            path: Путь к файлу
+            format: "json" или "prometheus"
+
+        Raises:
+            ValueError: если формат не поддерживается
+        """
+        if format == "json":
+            content = self.to_json()
+        elif format == "prometheus":
+            content = self.to_prometheus()
+        else:
+            raise ValueError(f"Неизвестный формат метрик '{format}'")
+        Path(path).write_text(content, encoding="utf-8")
+
+
+# Общий реестр метрик приложения
+metrics = Metrics(enabled=METRICS_ENABLED)
@@ -0,0 +1,104 @@
+import threading
+from contextlib import contextmanager, nullcontext
+from typing import ContextManager, Iterator
+
+
+class ReadWriteLock:
+    """
+    Блокировка «много читателей / один писатель»
+
+    Читатели работают параллельно, писатель получает исключительный доступ.
+    Ожидающий писатель блокирует новых читателей, чтобы не голодать.
+    Поток-писатель может повторно захватывать блокировку на запись и
+    на чтение; поток-читатель — повторно на чтение. Повышение чтения
+    до записи не поддерживается.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer: int | None = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+        self._local = threading.local()
+
+    def _read_depth(self) -> int:
+        return getattr(self._local, "read_depth", 0)
+
+    def acquire_read(self) -> None:
+        """Захватывает блокировку на чтение"""
+        me = threading.get_ident()
+        depth = self._read_depth()
+        with self._condition:
+            if self._writer != me and not depth:
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+            self._readers += 1
+        self._local.read_depth = depth + 1
+
+    def release_read(self) -> None:
+        """Освобождает блокировку на чтение"""
+        self._local.read_depth = self._read_depth() - 1
+        with self._condition:
+            self._readers -= 1
+            if not self._readers:
+                self._condition.notify_all()
+
+    def acquire_write(self) -> None:
+        """
+        Захватывает блокировку на запись
+
+        Raises:
+            RuntimeError: если поток удерживает блокировку только на чтение
+        """
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                self._write_depth += 1
+                return
+            if self._read_depth():
+                raise RuntimeError("Нельзя повысить блокировку чтения до записи")
+            self._waiting_writers += 1
+            try:
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+            finally:
+                self._waiting_writers -= 1
+            self._writer = me
+            self._write_depth = 1
+
+    def release_write(self) -> None:
+        """Освобождает блокировку на запись"""
+        with self._condition:
+            self._write_depth -= 1
+            if not self._write_depth:
+                self._writer = None
+                self._condition.notify_all()
+
+    @contextmanager
+    def read_locked(self) -> Iterator[None]:
+        """Контекст с блокировкой на чтение"""
+        self.acquire_read()
+        try:
+            yield
+        finally:
+            self.release_read()
+
+    @contextmanager
+    def write_locked(self) -> Iterator[None]:
+        """Контекст с блокировкой на запись"""
+        self.acquire_write()
+        try:
+            yield
+        finally:
+            self.release_write()
+
+
+class NullLock:
+    """Заглушка ReadWriteLock для однопоточного режима"""
+
+    def read_locked(self) -> ContextManager[None]:
+        return nullcontext()
+
+    def write_locked(self) -> ContextManager[None]:
+        return nullcontext()
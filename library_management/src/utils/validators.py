@@ -1,5 +1,8 @@
+from collections.abc import Container, Iterable, Sequence
+from itertools import count
 from datetime import datetime
-from models import BookStatus, Book
+from models import BookStatus, Book, normalize_author, normalize_text
+from utils.metrics import metrics
 
 
 class BookValidator:
@@ -46,17 +49,21 @@ class BookValidator:
         return True, None
 
     @staticmethod
-    def validate_year(year: int) -> tuple[bool, str | None]:
+    def validate_year(
+        year: int, current_year: int | None = None
+    ) -> tuple[bool, str | None]:
         """
         Проверяет корректность года издания
 
         Args:
             year: Год издания
+            current_year: Текущий год (по умолчанию определяется по часам)
 
         Returns:
             tuple[bool, str | None]: (результат валидации, сообщение об ошибке)
         """
-        current_year = datetime.now().year
+        if current_year is None:
+            current_year = datetime.now().year
 
         if not isinstance(year, int):
             return False, "Год должен быть целым числом"
@@ -102,9 +109,35 @@ class BookValidator:
 
         return True, None
 
+    @staticmethod
+    def make_duplicate_key(title: str, author: str, year: int) -> tuple[str, str, int]:
+        """
+        Формирует нормализованный ключ книги для проверки на дубликаты
+
+        Args:
+            title: Название книги
+            author: Автор книги
+            year: Год издания
+
+        Returns:
+            tuple[str, str, int]: (название, автор, год), нормализованные
+                                  normalize_text
+        """
+        return normalize_text(title), normalize_author(author), year
+
+    @staticmethod
+    def book_duplicate_key(book: Book) -> tuple[str, str, int]:
+        """
+        Ключ существующей книги для проверки на дубликаты
+
+        Совпадает с make_duplicate_key, но использует ключи, вычисленные
+        при создании книги.
+        """
+        return book.title_key, book.author_key, book.year
+
     @staticmethod
     def check_duplicate(
-        title: str, author: str, year: int, existing_books: list[Book]
+        title: str, author: str, year: int, existing_books: Iterable[Book]
     ) -> tuple[bool, str | None]:
         """
         Проверяет, существует ли уже такая книга
@@ -119,17 +152,28 @@ class BookValidator:
             tuple[bool, str | None]: (True, None) если дубликата нет,
                                    (False, error_message) если дубликат найден
         """
-        title = title.lower().strip()
-        author = author.lower().strip()
+        key = BookValidator.make_duplicate_key(title, author, year)
+        existing_keys = map(BookValidator.book_duplicate_key, existing_books)
+        return BookValidator.check_duplicate_key(key, existing_keys)
 
-        duplicate_exists = any(
-            book.title.lower().strip() == title
-            and book.author.lower().strip() == author
-            and book.year == year
-            for book in existing_books
-        )
+    @staticmethod
+    def check_duplicate_key(
+        key: tuple[str, str, int],
+        existing_keys: Container[tuple[str, str, int]] | Iterable[tuple[str, str, int]],
+    ) -> tuple[bool, str | None]:
+        """
+        Проверяет наличие книги по индексу нормализованных ключей
 
-        if duplicate_exists:
+        Args:
+            key: Ключ книги, полученный из make_duplicate_key
+            existing_keys: Набор ключей существующих книг
+
+        Returns:
+            tuple[bool, str | None]: (True, None) если дубликата нет,
+                                   (False, error_message) если дубликат найден
+        """
+        if key in existing_keys:
+            title, author, year = key
             return (
                 False,
                 f"Книга '{title}' ({author}, {year}) уже существует в библиотеке",
@@ -137,8 +181,14 @@ class BookValidator:
         return True, None
 
     @classmethod
+    @metrics.timed("validator.validate_book_data")
     def validate_book_data(
-        cls, title: str, author: str, year: int, existing_books: list
+        cls,
+        title: str,
+        author: str,
+        year: int,
+        existing_books: Iterable[Book] = (),
+        existing_keys: Container[tuple[str, str, int]] | None = None,
     ) -> tuple[bool, str | None]:
         """
         Комплексная проверка данных книги
@@ -148,6 +198,8 @@ class BookValidator:
             author: Автор книги
             year: Год издания
             existing_books: Список существующих книг
+            existing_keys: Индекс ключей существующих книг (см. make_duplicate_key);
+                           если передан, используется вместо перебора existing_books
 
         Returns:
             tuple[bool, str | None]: (результат валидации, сообщение об ошибке)
@@ -168,8 +220,71 @@ class BookValidator:
             return False, error
 
         # Проверяем на дубликаты
-        is_valid, error = cls.check_duplicate(title, author, year, existing_books)
+        if existing_keys is not None:
+            key = cls.make_duplicate_key(title, author, year)
+            is_valid, error = cls.check_duplicate_key(key, existing_keys)
+        else:
+            is_valid, error = cls.check_duplicate(title, author, year, existing_books)
         if not is_valid:
             return False, error
 
         return True, None
+
+    @classmethod
+    @metrics.timed("validator.validate_many")
+    def validate_many(
+        cls,
+        books: Iterable[tuple[str, str, int]],
+        existing_keys: Container[tuple[str, str, int]] = frozenset(),
+        row_numbers: Sequence[int] | None = None,
+    ) -> dict[int, list[str]]:
+        """
+        Проверка пакета книг за один проход
+
+        В отличие от validate_book_data собирает все ошибки каждой книги.
+        Текущий год определяется один раз на пакет, повторы внутри пакета
+        находятся по множеству ключей, дубликаты в библиотеке — по индексу
+        existing_keys.
+
+        Args:
+            books: Последовательность (название, автор, год)
+            existing_keys: Индекс ключей существующих книг (см. make_duplicate_key)
+            row_numbers: Номера строк (например, строк файла); по умолчанию
+                строки нумеруются с 0
+
+        Returns:
+            dict[int, list[str]]: номер строки → сообщения об ошибках;
+                строки без ошибок не включаются
+        """
+        current_year = datetime.now().year
+        # Ключ → номер первой строки с этой книгой
+        batch_keys: dict[tuple[str, str, int], int] = {}
+        errors: dict[int, list[str]] = {}
+
+        rows = count() if row_numbers is None else row_numbers
+        for row, (title, author, year) in zip(rows, books):
+            row_errors = [
+                error
+                for is_valid, error in (
+                    cls.validate_title(title),
+                    cls.validate_author(author),
+                    cls.validate_year(year, current_year),
+                )
+                if not is_valid
+            ]
+            if not row_errors:
+                key = cls.make_duplicate_key(title, author, year)
+                is_valid, error = cls.check_duplicate_key(key, existing_keys)
+                if not is_valid:
+                    row_errors.append(error)
+                elif key in batch_keys:
+                    row_errors.append(
+                        f"Книга '{key[0]}' ({key[1]}, {key[2]}) "
+                        f"повторяет строку {batch_keys[key]}"
+                    )
+                else:
+                    batch_keys[key] = row
+            if row_errors:
+                errors[row] = row_errors
+
+        return errors
@@ -0,0 +1,149 @@
+from api_server import MAX_BODY_SIZE, LibraryAPIServer
+from services import LibraryService, StorageService
+
+from pathlib import Path
+import asyncio
+import json
+import tempfile
+import unittest
+
+
+class TestAPIServer(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        storage = StorageService(Path(self.temp_dir.name) / "books.json")
+        self.server = LibraryAPIServer(LibraryService(storage, thread_safe=True))
+        await self.server.start("127.0.0.1", 0)
+        self.reader, self.writer = await asyncio.open_connection(
+            "127.0.0.1", self.server.port
+        )
+
+    async def asyncTearDown(self):
+        self.writer.close()
+        await self.server.stop()
+        self.server.library.storage.close()
+        self.temp_dir.cleanup()
+
+    async def request(self, method: str, path: str, data=None):
+        """Отправляет запрос по keep-alive соединению и возвращает (статус, JSON)"""
+        body = b"" if data is None else json.dumps(data).encode("utf-8")
+        self.writer.write(
+            f"{method} {path} HTTP/1.1\r\nHost: test\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+        )
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(head.split(b" ", 2)[1])
+        length = 0
+        for line in head.decode("latin-1").split("\r\n")[1:]:
+            if line.lower().startswith("content-length:"):
+                length = int(line.split(":", 1)[1])
+        payload = await self.reader.readexactly(length)
+        return status, json.loads(payload) if payload else None
+
+    async def test_crud(self):
+        """Тест добавления, получения, изменения статуса и удаления книги"""
+        status, book = await self.request(
+            "POST",
+            "/books",
+            {"title": "Война и мир", "author": "Толстой", "year": 1869},
+        )
+        self.assertEqual(status, 201)
+        self.assertEqual(book["id"], 1)
+
+        status, found = await self.request("GET", "/books/1")
+        self.assertEqual((status, found), (200, book))
+
+        status, changed = await self.request(
+            "PUT", "/books/1/status", {"status": "выдана"}
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual(changed["status"], "выдана")
+
+        status, _ = await self.request("DELETE", "/books/1")
+        self.assertEqual(status, 204)
+        status, _ = await self.request("GET", "/books/1")
+        self.assertEqual(status, 404)
+
+    async def test_list_and_search(self):
+        """Тест постраничного списка и поиска"""
+        for i in range(5):
+            await self.request(
+                "POST",
+                "/books",
+                {"title": f"Книга {i}", "author": "Автор", "year": 2000},
+            )
+
+        status, page = await self.request("GET", "/books?limit=2")
+        self.assertEqual(status, 200)
+        self.assertEqual([b["id"] for b in page["books"]], [1, 2])
+        self.assertEqual(page["next_after_id"], 2)
+
+        _, page = await self.request("GET", "/books?after_id=4&limit=2")
+        self.assertEqual([b["id"] for b in page["books"]], [5])
+        self.assertIsNone(page["next_after_id"])
+
+        status, result = await self.request(
+            "GET", "/search?q=%D0%BA%D0%BD%D0%B8%D0%B3%D0%B0%203"
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual([b["id"] for b in result["books"]], [4])
+        self.assertEqual(result["total"], 1)
+
+        _, result = await self.request(
+            "GET", "/search?q=%D0%BA%D0%BD%D0%B8%D0%B3%D0%B0&limit=2"
+        )
+        self.assertEqual([b["id"] for b in result["books"]], [1, 2])
+        self.assertEqual(result["total"], 5)
+
+        status, result = await self.request(
+            "GET", "/search/fuzzy?q=%D0%BA%D0%BD%D0%B8%D0%B3%D1%8B&limit=2"
+        )
+        self.assertEqual(status, 200)
+        self.assertEqual([b["id"] for b in result["books"]], [1, 2])
+
+        status, result = await self.request("GET", "/autocomplete?q=%D0%B0%D0%B2")
+        self.assertEqual(status, 200)
+        self.assertEqual(result["suggestions"], ["автор"])
+
+    async def test_errors(self):
+        """Тест ответов на некорректные запросы"""
+        status, error = await self.request(
+            "POST", "/books", {"title": "", "author": "Автор", "year": 2000}
+        )
+        self.assertEqual(status, 400)
+        self.assertIn("error", error)
+
+        status, _ = await self.request("GET", "/books?limit=abc")
+        self.assertEqual(status, 400)
+        status, _ = await self.request("GET", "/books?limit=0")
+        self.assertEqual(status, 400)
+        status, _ = await self.request("PUT", "/books/7/status", {"status": "выдана"})
+        self.assertEqual(status, 404)
+        status, _ = await self.request("GET", "/unknown")
+        self.assertEqual(status, 404)
+        status, _ = await self.request("PATCH", "/books")
+        self.assertEqual(status, 405)
+
+    async def test_unread_body_closes_connection(self):
+        """Тест закрытия соединения, если тело запроса не прочитано"""
+        for length, status in ((MAX_BODY_SIZE + 1, 413), (-5, 400)):
+            with self.subTest(length=length):
+                reader, writer = await asyncio.open_connection(
+                    "127.0.0.1", self.server.port
+                )
+                writer.write(
+                    f"POST /books HTTP/1.1\r\nContent-Length: {length}\r\n\r\n"
+                    "GET /books HTTP/1.1\r\n\r\n".encode("latin-1")
+                )
+                head = await reader.readuntil(b"\r\n\r\n")
+                self.assertEqual(int(head.split(b" ", 2)[1]), status)
+                self.assertIn(b"Connection: close", head)
+                # После ответа на ошибку сервер закрывает соединение и не
+                # выполняет оставшиеся байты как следующий запрос
+                rest = await asyncio.wait_for(reader.read(), 5)
+                self.assertIn("error", json.loads(rest))
+                writer.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
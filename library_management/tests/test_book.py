@@ -1,4 +1,4 @@
-from models import Book, BookStatus
+from models import Book, BookStatus, normalize_text
 
 import unittest
 
@@ -43,3 +43,32 @@ class TestBook(unittest.TestCase):
         self.assertEqual(book.author, "Оруэлл")
         self.assertEqual(book.year, 1949)
         self.assertEqual(book.status, BookStatus.BORROWED)
+
+    def test_book_compact(self):
+        """Тест компактного представления книги"""
+        first = Book.from_dict(
+            {"id": 1, "title": "Война и мир", "author": " ".join(["Лев", "Толстой"])}
+        )
+        second = Book.from_dict(
+            {"id": 2, "title": "Анна Каренина", "author": "Лев Толстой"}
+        )
+
+        self.assertFalse(hasattr(first, "__dict__"))
+        self.assertIs(first.author, second.author)
+        self.assertIs(first.author_key, second.author_key)
+
+    def test_normalized_keys(self):
+        """Тест нормализованных ключей названия и автора"""
+        book = Book(id=1, title="  Ёлка  И\tЗВЁЗДЫ ", author="Фёдор Ёлкин", year=2000)
+        self.assertEqual(book.title_key, "елка и звезды")
+        self.assertEqual(book.author_key, "федор елкин")
+        self.assertEqual(normalize_text("STRASSE Straße"), "strasse strasse")
+
+        # Нормализованное название хранится одной строкой
+        book = Book(id=2, title="война и мир", author="Толстой")
+        self.assertIs(book.title_key, book.title)
+
+        # Ключи не сериализуются и не участвуют в сравнении
+        self.assertNotIn("title_key", book.to_dict())
+        self.assertEqual(Book.from_dict(book.to_dict()), book)
+        self.assertNotIn("title_key", repr(book))
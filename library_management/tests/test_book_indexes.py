@@ -0,0 +1,67 @@
+from services.book_indexes import BookIndexes
+from models import Book, BookStatus
+
+import unittest
+
+
+class TestBookIndexes(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.books = {
+            book.id: book
+            for book in [
+                Book(id=1, title="Война и мир", author="Лев Толстой", year=1869),
+                Book(id=2, title="Анна Каренина", author="Лев Толстой", year=1877),
+                Book(id=3, title="Воскресение", author="Лев Толстой", year=1899),
+                Book(id=4, title="1984", author="Джордж Оруэлл", year=1949),
+                Book(id=5, title="Война миров", author="Герберт Уэллс", year=1897),
+            ]
+        }
+        self.indexes = BookIndexes()
+        for book in self.books.values():
+            self.indexes.add(book)
+
+    def plan(self, **conditions) -> tuple[str, list[int]]:
+        name, count, candidates = self.indexes.plan(self.books, **conditions)
+        candidates = sorted(candidates)
+        self.assertEqual(count, len(candidates))
+        return name, candidates
+
+    def test_planner_picks_most_selective_index(self):
+        """Тест выбора самого избирательного индекса"""
+        self.assertIsNone(self.indexes.plan(self.books))
+        self.assertEqual(
+            self.plan(author="лев толстой ", year_from=1898), ("year", [3, 4])
+        )
+        self.assertEqual(
+            self.plan(author="Джордж Оруэлл", year_from=1800), ("author", [4])
+        )
+        self.assertEqual(
+            self.plan(title_prefix="вой", status=BookStatus.AVAILABLE),
+            ("title", [1, 5]),
+        )
+        self.assertEqual(self.plan(year_from=1870, year_to=1880), ("year", [2]))
+
+    def test_incremental_updates(self):
+        """Тест обновления индексов при изменениях"""
+        self.plan(title_prefix="в")  # строит индекс названий
+        self.indexes.remove(self.books.pop(1))
+        book = Book(id=6, title="Война и мир", author="Лев Толстой", year=1869)
+        self.books[6] = book
+        self.indexes.add(book)
+        self.assertEqual(self.plan(title_prefix="война и"), ("title", [6]))
+        self.assertEqual(self.plan(year_from=1869, year_to=1869), ("year", [6]))
+
+        self.indexes.update_status(6, BookStatus.AVAILABLE, BookStatus.BORROWED)
+        self.assertEqual(self.plan(status=BookStatus.BORROWED), ("status", [6]))
+
+    def test_make_filter(self):
+        """Тест проверки всех условий"""
+        matches = self.indexes.make_filter(author="ЛЕВ ТОЛСТОЙ", title_prefix=" Во")
+        self.assertEqual(
+            [book.id for book in self.books.values() if matches(book)], [1, 3]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
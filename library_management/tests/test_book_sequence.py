@@ -0,0 +1,145 @@
+from services.book_sequence import BookSequence
+from services import LibraryService, StorageService
+from models import Book, BookStatus
+
+from pathlib import Path
+import tempfile
+import unittest
+
+
+def make_book(book_id: int, status: BookStatus = BookStatus.AVAILABLE) -> Book:
+    return Book(
+        id=book_id, title=f"Книга {book_id}", author="Автор", year=2000, status=status
+    )
+
+
+class SmallChunkSequence(BookSequence):
+    CHUNK_SIZE = 4
+
+
+class TestBookSequence(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.sequence = SmallChunkSequence()
+        for book_id in range(1, 11):
+            self.sequence.append(make_book(book_id))
+
+    def ids(self, books) -> list[int]:
+        return [book.id for book in books]
+
+    def test_snapshot_isolation(self):
+        """Тест неизменности снимка при последующих изменениях"""
+        snapshot = self.sequence.snapshot(1)
+        self.sequence.append(make_book(11))
+        self.sequence.remove(2)
+        self.sequence.replace(make_book(9, BookStatus.BORROWED))
+
+        self.assertEqual(self.ids(snapshot), list(range(1, 11)))
+        self.assertEqual(len(snapshot), 10)
+        self.assertTrue(all(book.status == BookStatus.AVAILABLE for book in snapshot))
+
+        current = self.sequence.snapshot(2)
+        self.assertEqual(self.ids(current), [1, *range(3, 12)])
+        self.assertEqual(len(current), 10)
+        self.assertEqual(list(current)[-3].status, BookStatus.BORROWED)
+
+    def test_unchanged_chunks_shared(self):
+        """Тест копирования только измененной части"""
+        first = self.sequence.snapshot(1)
+        self.sequence.remove(6)
+        second = self.sequence.snapshot(2)
+        self.assertIs(first._chunks[0], second._chunks[0])
+        self.assertIsNot(first._chunks[1], second._chunks[1])
+        self.assertIs(first._chunks[2], second._chunks[2])
+
+    def test_page(self):
+        """Тест страниц снимка с пропуском частей"""
+        self.sequence.remove(3)
+        snapshot = self.sequence.snapshot(1)
+        self.assertEqual(self.ids(snapshot.page(0, 3)), [1, 2, 4])
+        self.assertEqual(self.ids(snapshot.page(3, 4)), [5, 6, 7, 8])
+        self.assertEqual(self.ids(snapshot.page(8, 5)), [10])
+        self.assertEqual(snapshot.page(9, 5), [])
+
+    def test_unordered_ids(self):
+        """Тест поиска книг после добавления ID не по возрастанию"""
+        self.sequence.remove(10)
+        self.sequence.append(make_book(10))
+        self.sequence.append(make_book(5 + 100))
+        self.sequence.remove(4)
+        self.sequence.replace(make_book(10, BookStatus.BORROWED))
+        books = list(self.sequence.snapshot(1))
+        self.assertEqual(self.ids(books), [1, 2, 3, 5, 6, 7, 8, 9, 10, 105])
+        self.assertEqual(books[-2].status, BookStatus.BORROWED)
+
+
+class LateChangeStorage(StorageService):
+    """Хранилище, которое замечает изменение только со второй проверки"""
+
+    hidden_checks = 0
+
+    def has_changed(self) -> bool:
+        if self.hidden_checks:
+            self.hidden_checks -= 1
+            return False
+        return super().has_changed()
+
+
+class TestLibrarySnapshot(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        path = Path(self.temp_dir.name) / "books.json"
+        self.library = LibraryService(StorageService(path, journal=True))
+        self.library.add_books([("1984", "Оруэлл", 1949), ("Мы", "Замятин", 1924)])
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.temp_dir.cleanup()
+
+    def test_snapshot_versions(self):
+        """Тест версий снимков и неизменности книг в снимке"""
+        snapshot = self.library.snapshot()
+        borrowed = self.library.change_status(1, BookStatus.BORROWED.value)
+        self.library.add_book("Собачье сердце", "Булгаков", 1925)
+
+        self.assertEqual([book.status for book in snapshot], [BookStatus.AVAILABLE] * 2)
+        self.assertEqual(borrowed.status, BookStatus.BORROWED)
+        latest = self.library.snapshot()
+        self.assertGreater(latest.version, snapshot.version)
+        self.assertEqual(len(latest), 3)
+        self.assertIs(self.library.get_book_by_id(1), borrowed)
+
+    def test_iterate_while_writing(self):
+        """Тест перебора книг во время изменения библиотеки"""
+        titles = []
+        for book in self.library.iter_books():
+            titles.append(book.title)
+            self.library.delete_book(book.id)
+            self.library.add_book(f"Новая {book.id}", "Автор", 2000)
+        self.assertEqual(titles, ["1984", "Мы"])
+        self.assertEqual(
+            [book.title for book in self.library.get_all_books()],
+            ["Новая 1", "Новая 2"],
+        )
+
+    def test_columnar_snapshot(self):
+        """Тест снимка в колоночном режиме"""
+        library = LibraryService(self.library.storage, columnar=True)
+        snapshot = library.snapshot()
+        library.delete_book(1)
+        self.assertEqual([book.title for book in snapshot], ["1984", "Мы"])
+        self.assertEqual(library.get_books_page(0, 5)[0].title, "Мы")
+
+    def test_page_with_reload(self):
+        """Тест страницы, если изменение хранилища замечено во время чтения"""
+        storage = LateChangeStorage(self.library.storage.file_path, journal=True)
+        library = LibraryService(storage, thread_safe=True, reload_check_interval=0)
+        self.library.add_book("Собачье сердце", "Булгаков", 1925)
+        storage.hidden_checks = 1
+        self.assertEqual(len(library.get_books_page(0, 5)), 2)
+        self.assertEqual(len(library.get_books_page(0, 5)), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
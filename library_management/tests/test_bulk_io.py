@@ -0,0 +1,116 @@
+from services import LibraryService, StorageService
+from services.bulk_io import detect_format, export_books, import_books
+from models import BookStatus
+
+from pathlib import Path
+import json
+import tempfile
+import unittest
+
+
+class TestBulkIO(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.dir = Path(self.temp_dir.name)
+        self.library = LibraryService(StorageService(self.dir / "books.json"))
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.library.storage.close()
+        self.temp_dir.cleanup()
+
+    def write(self, name: str, text: str) -> Path:
+        path = self.dir / name
+        path.write_text(text, encoding="utf-8")
+        return path
+
+    def test_import_csv(self):
+        """Тест импорта CSV с ошибками по номерам строк"""
+        path = self.write(
+            "books.csv",
+            "﻿title,author,year,status\n"
+            "Война и мир,Лев Толстой,1869,выдана\n"
+            "Идиот,Фёдор Достоевский,abc,\n"
+            '"Преступление, наказание",Фёдор Достоевский,1866,\n'
+            "война и мир,лев толстой,1869,\n"
+            ",Автор,3000,потеряна\n",
+        )
+        progress = []
+        stats = import_books(
+            self.library,
+            path,
+            chunk_size=2,
+            progress=lambda s: progress.append(s.rows),
+        )
+        self.assertEqual((stats.rows, stats.succeeded, stats.failed), (5, 2, 3))
+        self.assertEqual(progress, [2, 4, 5])
+        self.assertEqual([line for line, _ in stats.errors], [3, 5, 6])
+        self.assertIn("целым числом", stats.errors[0][1])
+
+        books = self.library.get_all_books()
+        self.assertEqual(
+            [(book.title, book.status) for book in books],
+            [
+                ("Война и мир", BookStatus.BORROWED),
+                ("Преступление, наказание", BookStatus.AVAILABLE),
+            ],
+        )
+        # Одно сохранение на часть: изменения уже в хранилище
+        reloaded = LibraryService(StorageService(self.dir / "books.json"))
+        self.assertEqual(reloaded.count_books(), 2)
+        reloaded.storage.close()
+
+    def test_import_ndjson(self):
+        """Тест импорта NDJSON с повтором внутри части"""
+        path = self.write(
+            "books.ndjson",
+            '{"title": "1984", "author": "Оруэлл", "year": 1949}\n'
+            "\n"
+            "не json\n"
+            '{"title": "1984", "author": "ОРУЭЛЛ", "year": 1949}\n'
+            '["список"]\n'
+            '{"title": "Мы", "author": "Замятин"}\n',
+        )
+        stats = import_books(self.library, path)
+        self.assertEqual((stats.rows, stats.succeeded, stats.failed), (5, 1, 4))
+        self.assertEqual([line for line, _ in stats.errors], [3, 4, 5, 6])
+        self.assertIn("повторяет строку 1", stats.errors[1][1])
+
+    def test_export_roundtrip(self):
+        """Тест экспорта и повторного импорта в обоих форматах"""
+        self.library.add_books(
+            [(f"Книга {i}", "Автор, «с запятой»", 1900 + i) for i in range(25)]
+        )
+        self.library.change_status(3, BookStatus.BORROWED.value)
+
+        for name in ("books.csv", "books.ndjson"):
+            path = self.dir / name
+            stats = export_books(self.library, path, chunk_size=10)
+            self.assertEqual(stats.succeeded, 25)
+
+            target = LibraryService(StorageService(self.dir / f"{name}.json"))
+            stats = import_books(target, path)
+            self.assertEqual(stats.succeeded, 25)
+            self.assertEqual(
+                [book.to_dict() for book in target.get_all_books()],
+                [book.to_dict() for book in self.library.get_all_books()],
+            )
+            target.storage.close()
+
+        lines = (self.dir / "books.ndjson").read_text(encoding="utf-8").splitlines()
+        self.assertEqual(json.loads(lines[2])["status"], "выдана")
+        self.assertFalse((self.dir / "books.ndjson.tmp").exists())
+
+    def test_errors(self):
+        """Тест неподдерживаемого формата и заголовка CSV"""
+        with self.assertRaises(ValueError):
+            detect_format(Path("books.xml"))
+        self.assertEqual(detect_format(Path("books.txt"), "csv"), "csv")
+        path = self.write("books.csv", "name,year\nКнига,2000\n")
+        with self.assertRaises(ValueError):
+            import_books(self.library, path)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,84 @@
+from services.columnar_store import ColumnarBookStore
+from services import LibraryService, StorageService
+from models import Book, BookStatus
+
+from pathlib import Path
+import tempfile
+import unittest
+
+
+class TestColumnarBookStore(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.store = ColumnarBookStore()
+        for book_id, year in ((1, 1869), (2, 1877), (3, 1949)):
+            self.store[book_id] = Book(
+                id=book_id, title=f"Книга {book_id}", author="Лев Толстой", year=year
+            )
+
+    def test_roundtrip(self):
+        """Тест получения книги из колонок"""
+        book = self.store[2]
+        self.assertEqual(
+            book, Book(id=2, title="Книга 2", author="Лев Толстой", year=1877)
+        )
+        self.assertEqual(len(self.store._authors), 1)
+
+    def test_update_and_delete(self):
+        """Тест изменения и удаления книг с сохранением порядка"""
+        book = self.store[1]
+        book.status = BookStatus.BORROWED
+        self.store[1] = book
+        del self.store[2]
+
+        self.assertEqual(list(self.store), [1, 3])
+        self.assertEqual(self.store[1].status, BookStatus.BORROWED)
+        self.assertNotIn(2, self.store)
+        self.assertIsNone(self.store.pop(2, None))
+
+    def test_compaction(self):
+        """Тест уплотнения массивов после массового удаления"""
+        for book_id in range(4, 3000):
+            self.store[book_id] = Book(id=book_id, title="Т", author="А", year=2000)
+        for book_id in range(1, 2900):
+            del self.store[book_id]
+
+        self.assertLess(len(self.store._ids), 3000)
+        self.assertEqual(list(self.store), list(range(2900, 3000)))
+        self.assertEqual([book.id for book in self.store.values()][:2], [2900, 2901])
+
+    def test_unordered_ids(self):
+        """Тест добавления ID не по возрастанию"""
+        del self.store[2]
+        self.store[2] = Book(id=2, title="Снова", author="Автор", year=2000)
+        self.store[0] = Book(id=0, title="Ноль", author="Автор", year=2000)
+
+        self.assertEqual(list(self.store), [1, 3, 2, 0])
+        self.assertEqual(self.store[2].title, "Снова")
+        self.assertEqual(len(self.store), 4)
+
+
+class TestColumnarLibrary(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        storage = StorageService(Path(self.temp_dir.name) / "books.json")
+        self.library = LibraryService(storage, columnar=True)
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.temp_dir.cleanup()
+
+    def test_library_operations(self):
+        """Тест операций библиотеки с колоночным хранилищем"""
+        book = self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.add_book("1984", "Оруэлл", 1949)
+
+        self.library.change_status(book.id, BookStatus.BORROWED.value)
+        self.assertEqual(
+            self.library.get_book_by_id(book.id).status, BookStatus.BORROWED
+        )
+        self.assertEqual(len(self.library.search_books("толстой")), 1)
+
+        self.assertTrue(self.library.delete_book(book.id))
+        self.assertEqual([b.title for b in self.library.get_all_books()], ["1984"])
@@ -0,0 +1,204 @@
+from services import LibraryService, StorageService
+from models import BookStatus
+from utils.rwlock import ReadWriteLock
+
+from pathlib import Path
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+
+
+class TestReadWriteLock(unittest.TestCase):
+    def test_readers_parallel(self):
+        """Тест одновременной работы читателей"""
+        lock = ReadWriteLock()
+        inside = []
+        barrier = threading.Barrier(3, timeout=5)
+
+        def reader():
+            with lock.read_locked():
+                inside.append(1)
+                barrier.wait()
+
+        threads = [threading.Thread(target=reader) for _ in range(3)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(inside), 3)
+
+    def test_writer_exclusive(self):
+        """Тест исключительного доступа писателя"""
+        lock = ReadWriteLock()
+        events = []
+
+        def writer():
+            with lock.write_locked():
+                events.append("write")
+
+        with lock.read_locked():
+            thread = threading.Thread(target=writer)
+            thread.start()
+            time.sleep(0.05)
+            events.append("read done")
+        thread.join()
+        self.assertEqual(events, ["read done", "write"])
+
+    def test_reentrant_and_upgrade(self):
+        """Тест повторного захвата и запрета повышения"""
+        lock = ReadWriteLock()
+        with lock.write_locked():
+            with lock.write_locked():
+                with lock.read_locked():
+                    pass
+        with lock.read_locked():
+            with self.assertRaises(RuntimeError):
+                lock.acquire_write()
+
+
+class TestConcurrentLibrary(unittest.TestCase):
+    THREADS = 8
+    BOOKS_PER_THREAD = 40
+
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "books.json"
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.temp_dir.cleanup()
+
+    def run_stress(self, journal: bool):
+        storage = StorageService(self.file_path, journal=journal, compact_threshold=50)
+        library = LibraryService(storage, thread_safe=True)
+        errors = []
+        added = [[] for _ in range(self.THREADS)]
+
+        def worker(index: int):
+            rng = random.Random(index)
+            try:
+                for i in range(self.BOOKS_PER_THREAD):
+                    book = library.add_book(
+                        f"Книга {index}-{i}", f"Автор {index}", 2000
+                    )
+                    added[index].append(book.id)
+                    library.search_books(f"Автор {index}")
+                    library.get_books_after(None, 10)
+                    if i % 3 == 0:
+                        library.change_status(book.id, BookStatus.BORROWED.value)
+                    if i % 5 == 0:
+                        victim = rng.choice(added[index])
+                        if library.delete_book(victim):
+                            added[index].remove(victim)
+            except Exception as e:
+                errors.append(e)
+
+        threads = [
+            threading.Thread(target=worker, args=(i,)) for i in range(self.THREADS)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        expected_ids = sorted(book_id for ids in added for book_id in ids)
+        books = library.get_all_books()
+        ids = [book.id for book in books]
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(sorted(ids), expected_ids)
+        self.assertEqual(library.count_books(), len(expected_ids))
+
+        # Файл согласован с памятью
+        reloaded = LibraryService(
+            StorageService(self.file_path, journal=journal), thread_safe=True
+        )
+        self.assertEqual(
+            [book.to_dict() for book in reloaded.get_all_books()],
+            [book.to_dict() for book in books],
+        )
+        self.assertEqual(
+            reloaded.add_book("Новая", "Автор", 2000).id,
+            self.THREADS * self.BOOKS_PER_THREAD + 1,
+        )
+
+    def test_stress_json(self):
+        """Нагрузочный тест с полным сохранением"""
+        self.run_stress(journal=False)
+
+    def test_stress_journal(self):
+        """Нагрузочный тест с журналом"""
+        self.run_stress(journal=True)
+
+
+class TestSharedStorage(unittest.TestCase):
+    PROCESSES = 4
+    BOOKS_PER_PROCESS = 20
+
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "books.json"
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.temp_dir.cleanup()
+
+    def make_library(self, journal: bool = False) -> LibraryService:
+        storage = StorageService(self.file_path, journal=journal)
+        return LibraryService(storage, reload_check_interval=0)
+
+    def test_reload_on_change(self):
+        """Тест подхвата изменений другого экземпляра"""
+        for journal in (False, True):
+            with self.subTest(journal=journal):
+                self.file_path.unlink(missing_ok=True)
+                first = self.make_library(journal)
+                second = self.make_library(journal)
+
+                first.add_book("1984", "Оруэлл", 1949)
+                self.assertEqual(len(second.get_all_books()), 1)
+
+                # Второй экземпляр не затирает книгу первого и не повторяет ID
+                book = second.add_book("Мы", "Замятин", 1924)
+                self.assertEqual(book.id, 2)
+                self.assertTrue(first.reload_if_changed())
+                self.assertEqual(first.count_books(), 2)
+                self.assertFalse(first.reload_if_changed())
+
+    def test_processes(self):
+        """Тест одновременной записи из нескольких процессов"""
+        self.make_library()
+        src_dir = Path(__file__).parent.parent / "src"
+        script = (
+            "import sys; sys.path.insert(0, sys.argv[1]);"
+            "from services import LibraryService, StorageService;"
+            "library = LibraryService(StorageService(sys.argv[2]), reload_check_interval=0);"
+            "[library.add_book(f'Книга {sys.argv[3]}-{i}', 'Автор', 2000)"
+            f" for i in range({self.BOOKS_PER_PROCESS})]"
+        )
+        processes = [
+            subprocess.Popen(
+                [
+                    sys.executable,
+                    "-c",
+                    script,
+                    str(src_dir),
+                    str(self.file_path),
+                    str(n),
+                ]
+            )
+            for n in range(self.PROCESSES)
+        ]
+        for process in processes:
+            self.assertEqual(process.wait(timeout=60), 0)
+
+        books = self.make_library().get_all_books()
+        ids = [book.id for book in books]
+        total = self.PROCESSES * self.BOOKS_PER_PROCESS
+        self.assertEqual(sorted(ids), list(range(1, total + 1)))
@@ -0,0 +1,106 @@
+from services.fuzzy_index import BKTree, FuzzyIndex, PrefixTrie, levenshtein
+from models import Book
+
+import time
+import unittest
+
+
+class TestFuzzyIndex(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.books = [
+            Book(id=1, title="Война и мир", author="Лев Толстой", year=1869),
+            Book(id=2, title="Анна Каренина", author="Лев Толстой", year=1877),
+            Book(id=3, title="Идиот", author="Фёдор Достоевский", year=1869),
+            Book(id=4, title="Бесы", author="Фёдор Достоевский", year=1872),
+            Book(id=5, title="Война миров", author="Герберт Уэллс", year=1897),
+        ]
+        self.index = FuzzyIndex()
+        self.index.build(self.books)
+
+    def test_levenshtein(self):
+        """Тест расстояния Левенштейна"""
+        self.assertEqual(levenshtein("достоевский", "достоевский"), 0)
+        self.assertEqual(levenshtein("достоевкий", "достоевский"), 1)
+        self.assertEqual(levenshtein("толстй", "толстой"), 1)
+        self.assertEqual(levenshtein("", "мир"), 3)
+        self.assertEqual(levenshtein("война", "вина"), 2)
+
+    def test_bk_tree(self):
+        """Тест поиска слов в BK-дереве"""
+        tree = BKTree()
+        for word in ["мир", "миров", "мира", "война", "вина", "мир"]:
+            tree.add(word)
+        self.assertEqual(tree.size, 5)
+        self.assertEqual(sorted(tree.search("мир", 1)), [(0, "мир"), (1, "мира")])
+        self.assertEqual(
+            sorted(tree.search("мир", 2)), [(0, "мир"), (1, "мира"), (2, "миров")]
+        )
+        self.assertEqual(tree.search("самолет", 1), [])
+
+    def test_prefix_trie(self):
+        """Тест автодополнения по частоте"""
+        trie = PrefixTrie()
+        for word in ["война", "воин", "война", "вода"]:
+            trie.add(word)
+        self.assertEqual(trie.complete("во", 2), [("война", 2), ("вода", 1)])
+        trie.remove("война", 2)
+        self.assertEqual(trie.complete("вой", 5), [])
+        self.assertEqual(trie.complete("в", 5), [("вода", 1), ("воин", 1)])
+
+    def test_search_ranking(self):
+        """Тест ранжирования по сумме расстояний"""
+        self.assertEqual(self.index.search("Достоевкий"), [(1, 3), (1, 4)])
+        self.assertEqual(self.index.search("война мир"), [(0, 1)])
+        self.assertEqual(self.index.search("войны миры"), [(2, 1)])
+        self.assertEqual(self.index.search("войны миры", 2), [(2, 1), (3, 5)])
+        self.assertEqual(self.index.search("войны миры", 2, limit=1), [(2, 1)])
+        self.assertEqual(self.index.search("лев толстый бесы"), [])
+        self.assertEqual(self.index.search("ии 1869"), [])
+
+    def test_long_query(self):
+        """Тест длинного запроса: учитываются только первые слова"""
+        words = [f"слово{i:02d}" for i in range(20)]
+        index = FuzzyIndex()
+        index.build(
+            [
+                Book(id=1, title=" ".join(words), author="Автор", year=2000),
+                Book(id=2, title=" ".join(words[:8]), author="Автор", year=2000),
+                Book(id=3, title=" ".join(words[1:9]), author="Автор", year=2000),
+            ]
+        )
+        started = time.perf_counter()
+        self.assertEqual(index.search(" ".join(words)), [(0, 1), (0, 2), (1, 3)])
+        self.assertEqual(index.search(" ".join(words), limit=1), [(0, 1)])
+        self.assertEqual(
+            index.search(" ".join(reversed(words))), [(0, 1), (9, 3), (10, 2)]
+        )
+        self.assertLess(time.perf_counter() - started, 1)
+
+    def test_incremental_updates(self):
+        """Тест согласованности индекса после добавления и удаления книг"""
+        self.index.remove(self.books[2])
+        self.assertEqual(self.index.search("достоевский"), [(0, 4)])
+        self.index.add(Book(id=6, title="Идиот", author="Фёдор Достоевский", year=1869))
+        self.assertEqual(self.index.search("идиот"), [(0, 6)])
+
+        built = FuzzyIndex()
+        built.build([book for book in self.books if book.id != 3])
+        for book in self.books:
+            self.index.remove(book)
+            built.remove(book)
+        self.assertEqual(self.index.search("идиот"), [(0, 6)])
+        self.assertEqual(self.index.complete("бе"), [])
+        self.assertEqual(built.search("война"), [])
+
+    def test_complete(self):
+        """Тест дополнения последнего слова запроса"""
+        self.assertEqual(self.index.complete("Лев То"), ["лев толстой"])
+        self.assertEqual(self.index.complete("во"), ["война"])
+        self.assertEqual(self.index.complete("м"), ["мир", "миров"])
+        self.assertEqual(self.index.complete("фёдор "), [])
+        self.assertEqual(self.index.complete(""), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,7 +1,10 @@
-from services import LibraryService
+from services import LibraryService, StorageService
 from models import BookStatus
 from config import BOOKS_FILE
 
+from pathlib import Path
+import tempfile
+import time
 import unittest
 import os
 
@@ -65,3 +68,285 @@ class TestLibraryService(unittest.TestCase):
         # Изменение на невалидный статус
         with self.assertRaises(ValueError):
             self.library.change_status(self.test_book.id, "INVALID_STATUS")
+
+    def test_get_book_by_id(self):
+        """Тест получения книги по ID"""
+        book = self.library.get_book_by_id(self.test_book.id)
+        self.assertIs(book, self.test_book)
+
+        self.library.delete_book(self.test_book.id)
+        self.assertIsNone(self.library.get_book_by_id(self.test_book.id))
+
+    def test_get_all_books_order(self):
+        """Тест сохранения порядка добавления книг"""
+        first = self.library.add_book("1984", "Оруэлл", 1949)
+        second = self.library.add_book("Война и мир", "Лев Толстой", 1869)
+        self.library.delete_book(self.test_book.id)
+
+        ids = [book.id for book in self.library.get_all_books()]
+        self.assertEqual(ids, [first.id, second.id])
+
+    def test_duplicate_after_delete(self):
+        """Тест повторного добавления книги после удаления"""
+        with self.assertRaises(ValueError):
+            self.library.add_book(" тестовая КНИГА", "тестовый автор ", 2000)
+
+        self.library.delete_book(self.test_book.id)
+        book = self.library.add_book("Тестовая книга", "Тестовый автор", 2000)
+        self.assertIsNotNone(book.id)
+
+    def test_search_books_order(self):
+        """Тест порядка результатов поиска"""
+        first = self.library.add_book("Мир полудня", "Стругацкие", 1962)
+        second = self.library.add_book("Война и мир", "Лев Толстой", 1869)
+
+        results = self.library.search_books("МИР")
+        self.assertEqual([book.id for book in results], [first.id, second.id])
+
+        # Короткий запрос обрабатывается без индекса
+        results = self.library.search_books("ир")
+        self.assertEqual([book.id for book in results], [first.id, second.id])
+
+    def test_search_books_normalized(self):
+        """Тест поиска без учета «ё» и повторных пробелов"""
+        book = self.library.add_book("Ёжик в  тумане", "Сергей Козлов", 1969)
+        self.assertEqual(self.library.search_books("ежик в тумане"), [book])
+        self.assertEqual(self.library.search_books("  ЁЖИК   В "), [book])
+        self.assertEqual(self.library.search_books("   "), [])
+        with self.assertRaises(ValueError):
+            self.library.add_book("ежик в тумане", "сергей козлов", 1969)
+
+    def test_add_books(self):
+        """Тест пакетного добавления книг"""
+        results = self.library.add_books(
+            [
+                ("1984", "Оруэлл", 1949),
+                ("Тестовая книга", "Тестовый автор", 2000),  # дубликат
+                ("", "Автор", 2000),  # пустое название
+                ("1984 ", "оруэлл", 1949),  # повтор внутри пакета
+            ]
+        )
+        self.assertEqual(len(results), 4)
+        self.assertEqual(results[0][0].title, "1984")
+        self.assertIsNone(results[0][1])
+        self.assertIsNone(results[1][0])
+        self.assertIsNotNone(results[1][1])
+        self.assertIsNone(results[2][0])
+        self.assertIsNone(results[3][0])
+        self.assertIn("повторяет строку 0", results[3][1])
+
+        # Изменения сохранены в хранилище
+        reloaded = LibraryService()
+        self.assertEqual(len(reloaded.get_all_books()), 2)
+
+    def test_batch_rollback(self):
+        """Тест отката пакета при ошибке"""
+        with self.assertRaises(RuntimeError):
+            with self.library.batch():
+                self.library.add_book("1984", "Оруэлл", 1949)
+                self.library.change_status(self.test_book.id, BookStatus.BORROWED.value)
+                self.library.delete_book(self.test_book.id)
+                raise RuntimeError("ошибка импорта")
+
+        books = self.library.get_all_books()
+        self.assertEqual([book.id for book in books], [self.test_book.id])
+        self.assertEqual(books[0].status, BookStatus.AVAILABLE)
+
+        # Следующий ID не изменился
+        book = self.library.add_book("1984", "Оруэлл", 1949)
+        self.assertEqual(book.id, self.test_book.id + 1)
+
+    def test_pagination(self):
+        """Тест постраничного получения книг"""
+        self.library.add_books([(f"Книга {i}", "Автор", 2000) for i in range(1, 6)])
+        self.library.delete_book(3)
+        self.assertEqual(self.library.count_books(), 5)
+
+        page = self.library.get_books_page(offset=1, limit=2)
+        self.assertEqual([book.id for book in page], [2, 4])
+
+        page = self.library.get_books_after(after_id=None, limit=3)
+        self.assertEqual([book.id for book in page], [1, 2, 4])
+        page = self.library.get_books_after(after_id=page[-1].id, limit=3)
+        self.assertEqual([book.id for book in page], [5, 6])
+        self.assertEqual(self.library.get_books_after(after_id=6), [])
+
+        with self.assertRaises(ValueError):
+            self.library.get_books_page(offset=-1)
+
+    def test_pagination_by_id_after_changes(self):
+        """Тест страниц по ID после удалений и загрузки ID не по возрастанию"""
+        self.library.add_books([(f"Книга {i}", "Автор", 2000) for i in range(2, 21)])
+        for book_id in range(2, 21, 3):
+            self.library.delete_book(book_id)
+        expected = [i for i in range(1, 21) if i < 2 or (i - 2) % 3]
+        self.assertEqual(
+            [book.id for book in self.library.get_books_after(4, limit=3)],
+            [i for i in expected if i > 4][:3],
+        )
+        self.assertEqual(
+            [book.id for book in self.library.find_books(limit=4, descending=True)],
+            expected[::-1][:4],
+        )
+
+        storage = self.library.storage
+        data, last_id = storage.load_data()
+        storage.save_data(list(data)[::-1], last_id)
+        library = LibraryService(storage)
+        library.delete_book(1)
+        pages = []
+        after_id = None
+        while page := library.get_books_after(after_id, limit=4):
+            pages.extend(book.id for book in page)
+            after_id = page[-1].id
+        self.assertEqual(pages, expected[1:])
+
+    def test_find_books(self):
+        """Тест выборки книг по условиям с сортировкой и ограничением"""
+        self.library.add_books(
+            [
+                ("Война и мир", "Лев Толстой", 1869),
+                ("Анна Каренина", "Лев Толстой", 1877),
+                ("Воскресение", "Лев Толстой", 1899),
+                ("1984", "Джордж Оруэлл", 1949),
+            ]
+        )
+        self.library.change_status(3, BookStatus.BORROWED.value)
+
+        books = self.library.find_books(
+            author="лев толстой", year_from=1860, year_to=1880
+        )
+        self.assertEqual([book.id for book in books], [2, 3])
+        books = self.library.find_books(
+            author="Лев Толстой", status=BookStatus.AVAILABLE.value
+        )
+        self.assertEqual([book.id for book in books], [2, 4])
+        books = self.library.find_books(
+            title_prefix="во", sort_by="year", descending=True
+        )
+        self.assertEqual([book.title for book in books], ["Воскресение", "Война и мир"])
+        books = self.library.find_books(sort_by="title", limit=2)
+        self.assertEqual([book.title for book in books], ["1984", "Анна Каренина"])
+        books = self.library.find_books(
+            status=BookStatus.AVAILABLE.value, limit=2, descending=True
+        )
+        self.assertEqual([book.id for book in books], [5, 4])
+
+        self.library.delete_book(3)
+        self.assertEqual(self.library.find_books(year_from=1877, year_to=1877), [])
+
+        with self.assertRaises(ValueError):
+            self.library.find_books(status="потеряна")
+        with self.assertRaises(ValueError):
+            self.library.find_books(sort_by="isbn")
+
+    def test_fuzzy_search_and_autocomplete(self):
+        """Тест поиска с опечатками и автодополнения"""
+        self.library.add_books(
+            [
+                ("Преступление и наказание", "Фёдор Достоевский", 1866),
+                ("Война и мир", "Лев Толстой", 1869),
+                ("Идиот", "Фёдор Достоевский", 1869),
+            ]
+        )
+        self.assertEqual(self.library.search_books("Достоевкий"), [])
+        books = self.library.fuzzy_search("Достоевкий")
+        self.assertEqual([book.id for book in books], [2, 4])
+        books = self.library.fuzzy_search("достоевкий идот")
+        self.assertEqual([book.id for book in books], [4])
+        self.assertEqual(self.library.fuzzy_search("Достоевкий", max_distance=0), [])
+        self.assertEqual(self.library.fuzzy_search("Достоевкий", limit=1)[0].id, 2)
+
+        self.assertEqual(self.library.autocomplete("фёдор до"), ["федор достоевский"])
+        self.assertEqual(self.library.autocomplete("т")[0], "тестовая")
+
+        # Индекс обновляется при изменениях
+        self.library.delete_book(2)
+        book = self.library.add_book("Братья Карамазовы", "Фёдор Достоевский", 1880)
+        books = self.library.fuzzy_search("карамазов")
+        self.assertEqual([book.id for book in books], [5])
+        self.assertEqual(
+            [book.id for book in self.library.fuzzy_search("достоевский")], [4, 5]
+        )
+        self.assertEqual(self.library.autocomplete("прест"), [])
+
+        with self.assertRaises(ValueError):
+            self.library.fuzzy_search("идиот", limit=-1)
+
+
+class CountingStorage(StorageService):
+    """Хранилище, считающее полные сохранения"""
+
+    def __init__(self, *args, **kwargs):
+        self.saves = 0
+        super().__init__(*args, **kwargs)
+        self.saves = 0
+
+    def save_data(self, books, last_id):
+        self.saves += 1
+        super().save_data(books, last_id)
+
+
+class TestWriteBehind(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "books.json"
+        self.storage = CountingStorage(self.path, locking=False)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def stored_titles(self) -> list[str]:
+        library = LibraryService(StorageService(self.path))
+        return [book.title for book in library.get_all_books()]
+
+    def test_coalesced_flush(self):
+        """Тест объединения изменений в одну запись"""
+        library = LibraryService(self.storage, write_behind=True, max_staleness=60)
+        for i in range(20):
+            library.add_book(f"Книга {i}", "Автор", 2000)
+        library.change_status(1, BookStatus.BORROWED.value)
+        library.delete_book(2)
+        self.assertEqual(self.stored_titles(), [])
+
+        library.flush()
+        self.assertEqual(self.storage.saves, 1)
+        self.assertEqual(len(self.stored_titles()), 19)
+
+        library.flush()
+        self.assertEqual(self.storage.saves, 1)
+        library.close()
+
+    def test_background_flush_and_close(self):
+        """Тест фоновой записи по истечении max_staleness и записи при закрытии"""
+        library = LibraryService(self.storage, write_behind=True, max_staleness=0.05)
+        library.add_book("1984", "Оруэлл", 1949)
+        deadline = time.monotonic() + 5
+        while not self.stored_titles() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self.stored_titles(), ["1984"])
+
+        library._writer.max_staleness = 60
+        library.add_book("Мы", "Замятин", 1920)
+        library.close()
+        self.assertEqual(self.stored_titles(), ["1984", "Мы"])
+
+    def test_batch_rollback_keeps_pending(self):
+        """Тест сохранения отложенных изменений при откате пакета"""
+        library = LibraryService(self.storage, write_behind=True, max_staleness=60)
+        library.add_book("1984", "Оруэлл", 1949)
+        with self.assertRaises(RuntimeError):
+            with library.batch():
+                library.add_book("Мы", "Замятин", 1920)
+                raise RuntimeError("ошибка импорта")
+
+        self.assertEqual([book.title for book in library.get_all_books()], ["1984"])
+        self.assertEqual(self.stored_titles(), ["1984"])
+        library.close()
+
+    def test_shared_storage_rejected(self):
+        """Тест отказа от отложенной записи в хранилище нескольких процессов"""
+        storage = StorageService(self.path)
+        with self.assertRaises(ValueError):
+            LibraryService(storage, write_behind=True)
+        storage.close()
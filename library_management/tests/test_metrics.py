@@ -0,0 +1,76 @@
+from services import LibraryService, StorageService
+from utils.metrics import Metrics, metrics
+
+from pathlib import Path
+import json
+import tempfile
+import unittest
+
+
+class TestMetrics(unittest.TestCase):
+    def test_disabled(self):
+        """Тест отсутствия записи при выключенном сборе"""
+        registry = Metrics(enabled=False)
+
+        @registry.timed("operation")
+        def operation():
+            return 42
+
+        self.assertEqual(operation(), 42)
+        registry.increment("counter")
+        self.assertEqual(registry.snapshot(), {"operations": {}, "counters": {}})
+
+    def test_export(self):
+        """Тест экспорта гистограмм и счетчиков"""
+        registry = Metrics(enabled=True, buckets=(0.001, 0.01))
+        registry.observe("library.add_book", 0.0005)
+        registry.observe("library.add_book", 0.005)
+        registry.observe("library.add_book", 0.5)
+        registry.increment("storage.bytes_written", 100)
+
+        snapshot = json.loads(registry.to_json())
+        histogram = snapshot["operations"]["library.add_book"]
+        self.assertEqual(histogram["count"], 3)
+        self.assertEqual(histogram["buckets"], [[0.001, 1], [0.01, 2], ["+Inf", 3]])
+
+        text = registry.to_prometheus()
+        self.assertIn(
+            'library_operation_duration_seconds_bucket{operation="library.add_book",'
+            'le="0.01"} 2',
+            text,
+        )
+        self.assertIn("library_storage_bytes_written_total 100", text)
+
+
+class TestLibraryMetrics(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.storage = StorageService(Path(self.temp_dir.name) / "books.json")
+        metrics.reset()
+        metrics.enable()
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        metrics.disable()
+        metrics.reset()
+        self.temp_dir.cleanup()
+
+    def test_operations_recorded(self):
+        """Тест записи метрик операций библиотеки и хранилища"""
+        library = LibraryService(self.storage)
+        library.add_book("1984", "Оруэлл", 1949)
+        library.search_books("1984")
+
+        snapshot = metrics.snapshot()
+        for name in (
+            "library.load_books",
+            "library.add_book",
+            "library.search_books",
+            "validator.validate_book_data",
+            "storage.save_data",
+            "storage.save_data.write",
+            "storage.save_data.serialize",
+        ):
+            self.assertIn(name, snapshot["operations"])
+        self.assertGreater(snapshot["counters"]["storage.bytes_written"], 0)
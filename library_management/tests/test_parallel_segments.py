@@ -0,0 +1,85 @@
+from services import LibraryService, SegmentedStorageService, StorageService
+from services.parallel_segments import search_segments, use_parallel
+from services.storage_service import StorageCorruptedError
+
+from pathlib import Path
+import tempfile
+import unittest
+
+
+class TestParallelSegments(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name) / "segments"
+        self.storages = []
+        library = LibraryService(self.make_storage())
+        library.add_books(
+            (f"Книга {i}", f"Автор {i % 7}", 1900 + i % 100) for i in range(1, 301)
+        )
+        library.add_book("Война и мир", "Лев Толстой", 1869)
+        library.delete_book(5)
+        library.change_status(150, "выдана")
+        self.serial = LibraryService(self.make_storage())
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        for storage in self.storages:
+            storage.close()
+        self.temp_dir.cleanup()
+
+    def make_storage(self) -> SegmentedStorageService:
+        """Открывает хранилище тестового каталога, закрываемое в tearDown"""
+        storage = SegmentedStorageService(self.directory, segment_size=20)
+        self.storages.append(storage)
+        return storage
+
+    def test_use_parallel(self):
+        """Тест порога и условий запуска пула процессов"""
+        storage = self.make_storage()
+        self.assertTrue(use_parallel(storage, workers=2, min_books=300))
+        self.assertFalse(use_parallel(storage, workers=2, min_books=301))
+        self.assertFalse(use_parallel(storage, workers=1, min_books=0))
+        json_storage = StorageService(Path(self.temp_dir.name) / "books.json")
+        self.assertFalse(use_parallel(json_storage, workers=2, min_books=0))
+
+    def test_parallel_load(self):
+        """Тест совпадения параллельной загрузки с последовательной"""
+        library = LibraryService(
+            self.make_storage(), parallel_workers=2, parallel_min_books=0
+        )
+        self.assertEqual(
+            [book.to_dict() for book in library.get_all_books()],
+            [book.to_dict() for book in self.serial.get_all_books()],
+        )
+        for query in ("книга 1", "толстой", "автор 3", "1869", "ми"):
+            self.assertEqual(
+                library.search_books(query), self.serial.search_books(query)
+            )
+        self.assertEqual(library.add_book("Мы", "Замятин", 1924).id, 302)
+        self.assertEqual(library.search_books("замятин")[0].title, "Мы")
+
+    def test_parallel_load_corrupted(self):
+        """Тест загрузки с поврежденным сегментом"""
+        path = self.directory / self.make_storage().segments()[0]["file"]
+        path.write_bytes(path.read_bytes()[:-1])
+        with self.assertRaises(StorageCorruptedError):
+            LibraryService(
+                self.make_storage(), parallel_workers=2, parallel_min_books=0
+            )
+        self.assertEqual(self.make_storage().count_books(), 300)
+
+    def test_search_segments(self):
+        """Тест поиска по файлам сегментов"""
+        storage = self.make_storage()
+        for query in ("книга 1", "ТОЛСТОЙ", "1869", "нет такой"):
+            expected = [book.to_dict() for book in self.serial.search_books(query)]
+            self.assertEqual(search_segments(storage, query, workers=1), expected)
+            self.assertEqual(
+                search_segments(storage, query, workers=2, min_books=0), expected
+            )
+        self.assertEqual(search_segments(storage, "  "), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,76 @@
+from services.search_cache import SearchCache
+from services import LibraryService, StorageService
+from models import BookStatus
+
+from pathlib import Path
+import tempfile
+import unittest
+
+
+class TestSearchCache(unittest.TestCase):
+    def test_lru_eviction(self):
+        """Тест вытеснения давно не использованных запросов"""
+        cache = SearchCache(max_entries=2, max_ids=10)
+        cache.put("мир", 0, (1, 2))
+        cache.put("война", 0, (1,))
+        self.assertEqual(cache.get("мир", 0), (1, 2))
+        cache.put("анна", 0, (3,))
+
+        self.assertIsNone(cache.get("война", 0))
+        self.assertEqual(cache.get("мир", 0), (1, 2))
+        self.assertEqual(
+            cache.stats(),
+            {"hits": 2, "misses": 1, "evictions": 1, "entries": 2, "ids": 3},
+        )
+
+    def test_max_ids(self):
+        """Тест ограничения суммарного числа ID"""
+        cache = SearchCache(max_entries=10, max_ids=4)
+        cache.put("a", 0, (1, 2, 3, 4, 5))
+        self.assertIsNone(cache.get("a", 0))
+        cache.put("b", 0, (1, 2, 3))
+        cache.put("c", 0, (4, 5))
+        self.assertIsNone(cache.get("b", 0))
+        self.assertEqual(cache.get("c", 0), (4, 5))
+
+    def test_generation(self):
+        """Тест сброса кэша при смене поколения данных"""
+        cache = SearchCache(max_entries=10, max_ids=10)
+        cache.put("мир", 1, (1,))
+        self.assertIsNone(cache.get("мир", 2))
+        self.assertEqual(cache.stats()["entries"], 0)
+
+
+class TestLibrarySearchCache(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        storage = StorageService(Path(self.temp_dir.name) / "books.json")
+        self.library = LibraryService(storage)
+        self.library.add_book("Война и мир", "Лев Толстой", 1869)
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.temp_dir.cleanup()
+
+    def test_invalidation(self):
+        """Тест сброса результатов поиска при изменении библиотеки"""
+        self.assertEqual(len(self.library.search_books("МИР")), 1)
+        self.assertEqual(len(self.library.search_books("мир")), 1)
+        self.assertEqual(self.library.search_cache_stats()["hits"], 1)
+
+        # Изменение статуса не сбрасывает кэш, но книга возвращается актуальной
+        self.library.change_status(1, BookStatus.BORROWED.value)
+        books = self.library.search_books("мир")
+        self.assertEqual(books[0].status, BookStatus.BORROWED)
+        self.assertEqual(self.library.search_cache_stats()["hits"], 2)
+
+        self.library.add_book("Мир полудня", "Стругацкие", 1962)
+        self.assertEqual(len(self.library.search_books("мир")), 2)
+        self.library.delete_book(1)
+        self.assertEqual(len(self.library.search_books("мир")), 1)
+        self.assertEqual(self.library.search_cache_stats()["hits"], 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
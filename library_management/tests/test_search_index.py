@@ -0,0 +1,51 @@
+from services.search_index import SearchIndex
+from models import Book
+
+import unittest
+
+
+class TestSearchIndex(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.books = [
+            Book(id=1, title="Война и мир", author="Лев Толстой", year=1869),
+            Book(id=2, title="Анна Каренина", author="Лев Толстой", year=1877),
+            Book(id=3, title="1984", author="Джордж Оруэлл", year=1949),
+            Book(id=4, title="Мир полудня", author="Стругацкие", year=1962),
+        ]
+        self.index = SearchIndex()
+        for book in self.books:
+            self.index.add(book)
+
+    def scan(self, query: str) -> list[int]:
+        """Эталонный поиск полным перебором"""
+        return [
+            book.id
+            for book in self.books
+            if any(query in field for field in SearchIndex.book_fields(book))
+        ]
+
+    def verified(self, query: str) -> list[int]:
+        """Поиск через индекс с проверкой кандидатов"""
+        books = {book.id: book for book in self.books}
+        return [
+            book_id
+            for book_id in self.index.candidates(query)
+            if any(query in field for field in SearchIndex.book_fields(books[book_id]))
+        ]
+
+    def test_candidates_match_scan(self):
+        """Тест совпадения результатов индекса с полным перебором"""
+        for query in ["мир", "толстой", "лев т", "1949", "186", "ина", "нет такой"]:
+            self.assertEqual(self.verified(query), self.scan(query), query)
+
+    def test_short_query(self):
+        """Тест запроса короче триграммы"""
+        self.assertIsNone(self.index.candidates("ми"))
+
+    def test_remove(self):
+        """Тест удаления книги из индекса"""
+        self.index.remove(self.books[0])
+        self.books.pop(0)
+        self.assertEqual(self.verified("мир"), [4])
+        self.assertEqual(self.index.candidates("войн"), [])
@@ -0,0 +1,557 @@
+from services import (
+    BinaryStorageService,
+    LibraryService,
+    SegmentedStorageService,
+    StorageService,
+    SQLiteStorageService,
+    create_storage,
+)
+from models import BookStatus
+
+from services.binary_storage_service import binary_to_json, json_to_binary
+from services.json_stream import open_books_stream, write_books
+from services.storage_factory import STORAGE_BACKENDS
+from services.storage_service import StorageCorruptedError
+
+from contextlib import contextmanager
+from pathlib import Path
+from unittest import mock
+import json
+import os
+import tempfile
+import unittest
+
+
+@contextmanager
+def record_disk_writes():
+    """Записывает последовательность вызовов os.fsync и os.replace"""
+    events = []
+    fsync, replace = os.fsync, os.replace
+
+    def record_fsync(fd):
+        events.append("fsync")
+        fsync(fd)
+
+    def record_replace(source, destination):
+        events.append(f"replace {Path(destination).name}")
+        replace(source, destination)
+
+    with mock.patch("os.fsync", record_fsync), mock.patch("os.replace", record_replace):
+        yield events
+
+
+class TestJournalStorage(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "books.json"
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.temp_dir.cleanup()
+
+    def make_storage(self, compact_threshold: int = 1000) -> StorageService:
+        return StorageService(
+            self.file_path, journal=True, compact_threshold=compact_threshold
+        )
+
+    def test_changes_replayed_on_load(self):
+        """Тест восстановления изменений из журнала"""
+        library = LibraryService(self.make_storage())
+        first = library.add_book("1984", "Оруэлл", 1949)
+        second = library.add_book("Война и мир", "Лев Толстой", 1869)
+        library.change_status(first.id, BookStatus.BORROWED.value)
+        library.delete_book(second.id)
+
+        self.assertTrue(self.make_storage().journal_path.exists())
+
+        reloaded = LibraryService(self.make_storage())
+        books = reloaded.get_all_books()
+        self.assertEqual([book.id for book in books], [first.id])
+        self.assertEqual(books[0].status, BookStatus.BORROWED)
+        self.assertEqual(reloaded.add_book("Мы", "Замятин", 1924).id, 3)
+
+    def test_journal_without_snapshot(self):
+        """Тест загрузки журнала, если снимок удален"""
+        library = LibraryService(self.make_storage())
+        library.add_books([("1984", "Оруэлл", 1949), ("Мы", "Замятин", 1924)])
+        library.delete_book(1)
+        self.file_path.unlink()
+
+        storage = self.make_storage()
+        self.assertTrue(storage.journal_path.exists())
+        reloaded = LibraryService(storage)
+        self.assertEqual([book.title for book in reloaded.get_all_books()], ["Мы"])
+        self.assertEqual(reloaded.add_book("Нос", "Гоголь", 1836).id, 3)
+
+    def test_compaction(self):
+        """Тест сворачивания журнала в снимок"""
+        storage = self.make_storage(compact_threshold=5)
+        library = LibraryService(storage)
+        for year in range(1900, 1905):
+            library.add_book("Книга", "Автор", year)
+
+        # Журнал свернут хотя бы один раз
+        _, snapshot_last_id = storage._load_snapshot()
+        self.assertGreater(snapshot_last_id, 0)
+
+        books, last_id = self.make_storage().load_data()
+        self.assertEqual(len(list(books)), 5)
+        self.assertEqual(last_id, 5)
+
+    def test_compaction_ratio(self):
+        """Тест отказа от сворачивания, пока журнал мал относительно снимка"""
+        storage = StorageService(
+            self.file_path, journal=True, compact_threshold=5, compact_ratio=0.5
+        )
+        library = LibraryService(storage)
+        library.add_books(("Книга", "Автор", year) for year in range(1000, 1200))
+        storage.compact()
+        snapshot_size = self.file_path.stat().st_size
+
+        for year in range(1200, 1210):
+            library.add_book("Книга", "Автор", year)
+
+        # Журнал из 10 записей меньше половины снимка из 200 книг
+        self.assertEqual(self.file_path.stat().st_size, snapshot_size)
+        books, last_id = self.make_storage().load_data()
+        self.assertEqual(len(list(books)), 210)
+        self.assertEqual(last_id, 210)
+
+    def test_truncated_journal_line(self):
+        """Тест пропуска недописанной записи журнала"""
+        storage = self.make_storage()
+        library = LibraryService(storage)
+        library.add_book("1984", "Оруэлл", 1949)
+        with open(storage.journal_path, "a", encoding="utf-8") as file:
+            file.write('{"op": "upsert", "book": {"id"')
+
+        books, last_id = self.make_storage().load_data()
+        self.assertEqual(len(list(books)), 1)
+        self.assertEqual(last_id, 1)
+
+    def test_append_after_truncated_line(self):
+        """Тест дописывания журнала после недописанной записи"""
+        library = LibraryService(self.make_storage())
+        library.add_book("1984", "Оруэлл", 1949)
+        with open(self.make_storage().journal_path, "a", encoding="utf-8") as file:
+            file.write('{"op": "upsert"')
+
+        library = LibraryService(self.make_storage())
+        library.add_book("Мы", "Замятин", 1924)
+
+        books, _ = self.make_storage().load_data()
+        self.assertEqual([book["title"] for book in books], ["1984", "Мы"])
+
+
+class TestJSONStorage(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.file_path = Path(self.temp_dir.name) / "books.json"
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.temp_dir.cleanup()
+
+    def test_streaming_roundtrip(self):
+        """Тест потокового чтения сохраненного файла"""
+        books = [
+            {
+                "id": i,
+                "title": f"Книга {i}",
+                "author": "Автор",
+                "year": 1900 + i,
+                "status": "в наличии",
+            }
+            for i in range(1, 201)
+        ]
+        storage = StorageService(self.file_path)
+        storage.save_data(iter(books), 250)
+
+        # Формат совпадает с json.dump(indent=2)
+        with open(self.file_path, encoding="utf-8") as file:
+            self.assertEqual(json.load(file), {"last_id": 250, "books": books})
+
+        loaded, last_id = StorageService(self.file_path).load_data()
+        self.assertNotIsInstance(loaded, list)
+        self.assertEqual(list(loaded), books)
+        self.assertEqual(last_id, 250)
+
+    @unittest.skipUnless(os.name == "posix", "fsync каталога только в POSIX")
+    def test_snapshot_synced_before_replace(self):
+        """Тест сброса снимка на диск до замены основного файла"""
+        storage = StorageService(self.file_path)
+        with record_disk_writes() as events:
+            storage.save_data([{"id": 1, "title": "Мы"}], 1)
+        # Временный файл, замена, каталог с новой записью
+        self.assertEqual(events, ["fsync", "replace books.json", "fsync"])
+
+    def test_small_chunks(self):
+        """Тест разбора записей, разрезанных границами частей файла"""
+        books = [{"id": 12345, "title": "Война и мир", "year": 1869}] * 3
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            write_books(file, books, 12345)
+
+        stream, last_id = open_books_stream(self.file_path, chunk_size=3)
+        self.assertEqual(list(stream), books)
+        self.assertEqual(last_id, 12345)
+
+    def test_legacy_layout(self):
+        """Тест чтения файла, в котором last_id записан после книг"""
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            json.dump({"books": [{"id": 1, "title": "1984"}], "last_id": 7}, file)
+
+        books, last_id = StorageService(self.file_path).load_data()
+        self.assertEqual(list(books), [{"id": 1, "title": "1984"}])
+        self.assertEqual(last_id, 7)
+
+    def test_corrupted_file(self):
+        """Тест загрузки библиотеки из поврежденного файла"""
+        with open(self.file_path, "w", encoding="utf-8") as file:
+            file.write('{"last_id": 2, "books": [{"id": 1, "title": "1984", "autho')
+
+        library = LibraryService(StorageService(self.file_path))
+        self.assertEqual(library.get_all_books(), [])
+        self.assertEqual(library.add_book("1984", "Оруэлл", 1949).id, 1)
+
+
+class NoFullLoadStorage(SQLiteStorageService):
+    """Хранилище, запрещающее загрузку книг целиком"""
+
+    def load_data(self):
+        raise AssertionError("книги загружены целиком")
+
+
+class TestSQLiteStorage(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = Path(self.temp_dir.name) / "books.db"
+        self.storage = SQLiteStorageService(self.db_path)
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.storage.close()
+        self.temp_dir.cleanup()
+
+    def test_library_roundtrip(self):
+        """Тест сохранения и загрузки библиотеки через SQLite"""
+        library = LibraryService(self.storage)
+        first = library.add_book("1984", "Оруэлл", 1949)
+        second = library.add_book("Война и мир", "Лев Толстой", 1869)
+        library.change_status(second.id, BookStatus.BORROWED.value)
+        library.delete_book(first.id)
+
+        self.assertEqual(self.storage.count_books(), 1)
+        self.assertEqual(self.storage.get_book(second.id)["status"], "выдана")
+        self.assertIsNone(self.storage.get_book(first.id))
+
+        reloaded = LibraryService(SQLiteStorageService(self.db_path))
+        self.assertEqual([book.id for book in reloaded.get_all_books()], [second.id])
+        self.assertEqual(reloaded.add_book("Мы", "Замятин", 1924).id, 3)
+
+    def test_find_books(self):
+        """Тест выборки книг по полям"""
+        library = LibraryService(self.storage)
+        library.add_books(
+            [
+                ("Война и мир", "Лев Толстой", 1869),
+                ("Анна Каренина", "Лев Толстой", 1877),
+                ("1984", "Оруэлл", 1949),
+            ]
+        )
+        books = self.storage.find_books(author="Лев Толстой")
+        self.assertEqual([book["year"] for book in books], [1869, 1877])
+        self.assertEqual(
+            len(self.storage.find_books(author="Лев Толстой", year=1877)), 1
+        )
+
+    def test_lazy_load(self):
+        """Тест загрузки из SQLite только ID и ключей книг"""
+        library = LibraryService(self.storage)
+        library.add_books(
+            [
+                ("Война и мир", "Лев Толстой", 1869),
+                ("Анна Каренина", "Лев Толстой", 1877),
+                ("1984", "Оруэлл", 1949),
+            ]
+        )
+        library.change_status(2, BookStatus.BORROWED.value)
+
+        storage = NoFullLoadStorage(self.db_path)
+        lazy = LibraryService(storage)
+        self.assertFalse(lazy._indexes_ready)
+        self.assertEqual(lazy.count_books(), 3)
+        with self.assertRaises(ValueError):
+            lazy.add_book("война и мир", "лев толстой", 1869)
+        lazy.delete_book(3)
+        lazy.add_book("Мы", "Замятин", 1924)
+        self.assertFalse(lazy._indexes_ready)
+
+        eager = LibraryService(SQLiteStorageService(self.db_path), lazy_load=False)
+        self.assertTrue(eager._indexes_ready)
+        for method, args in (
+            ("get_all_books", ()),
+            ("search_books", ("толст",)),
+            ("find_books", (None, "выдана")),
+            ("get_books_after", (1, 2)),
+        ):
+            self.assertEqual(
+                getattr(lazy, method)(*args), getattr(eager, method)(*args), method
+            )
+        self.assertEqual(lazy.get_book_by_id(2).status, BookStatus.BORROWED)
+        eager.storage.close()
+        storage.close()
+
+    def test_create_storage(self):
+        """Тест выбора хранилища по названию"""
+        with self.assertRaises(ValueError):
+            create_storage("xml")
+
+
+class TestBinaryStorage(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.temp_dir.name) / "books.bin"
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.temp_dir.cleanup()
+
+    def test_library_roundtrip(self):
+        """Тест сохранения и загрузки библиотеки в двоичном снимке"""
+        library = LibraryService(BinaryStorageService(self.path))
+        library.add_books(
+            [
+                ("Война и мир", "Лев Толстой", 1869),
+                ("Анна Каренина", "Лев Толстой", 1877),
+                ("Ёж\nв тумане", "Козлов", -5),
+            ]
+        )
+        library.change_status(2, BookStatus.BORROWED.value)
+        library.delete_book(1)
+
+        reloaded = LibraryService(BinaryStorageService(self.path))
+        self.assertEqual(
+            [book.to_dict() for book in reloaded.get_all_books()],
+            [book.to_dict() for book in library.get_all_books()],
+        )
+        self.assertEqual(reloaded.add_book("Мы", "Замятин", 1924).id, 4)
+
+    def test_journal(self):
+        """Тест журнального режима поверх двоичного снимка"""
+        library = LibraryService(BinaryStorageService(self.path, journal=True))
+        library.add_book("1984", "Оруэлл", 1949)
+        self.assertTrue(self.path.with_name("books.bin.journal").exists())
+
+        reloaded = LibraryService(BinaryStorageService(self.path, journal=True))
+        self.assertEqual([book.title for book in reloaded.get_all_books()], ["1984"])
+
+    def test_conversion(self):
+        """Тест преобразования JSON в двоичный снимок и обратно"""
+        json_path = Path(self.temp_dir.name) / "books.json"
+        library = LibraryService(StorageService(json_path, journal=True))
+        library.add_book("1984", "Оруэлл", 1949)
+        library.add_book("Мы", "Замятин", 1920)
+
+        json_to_binary(json_path, self.path)
+        books, last_id = BinaryStorageService(self.path).load_data()
+        self.assertEqual(
+            list(books), [book.to_dict() for book in library.get_all_books()]
+        )
+        self.assertEqual(last_id, 2)
+
+        back_path = Path(self.temp_dir.name) / "back.json"
+        binary_to_json(self.path, back_path)
+        books, last_id = StorageService(back_path).load_data()
+        self.assertEqual(
+            list(books), [book.to_dict() for book in library.get_all_books()]
+        )
+        self.assertEqual(last_id, 2)
+
+    def test_corrupted_file(self):
+        """Тест загрузки поврежденного и обрезанного снимка"""
+        BinaryStorageService(self.path).save_data(
+            [
+                {
+                    "id": 1,
+                    "title": "1984",
+                    "author": "Оруэлл",
+                    "year": 1949,
+                    "status": "в наличии",
+                }
+            ],
+            1,
+        )
+        data = self.path.read_bytes()
+        for corrupted in (data[:-3], b"XXXX" + data[4:]):
+            self.path.write_bytes(corrupted)
+            library = LibraryService(BinaryStorageService(self.path))
+            self.assertEqual(library.get_all_books(), [])
+
+
+class TestSegmentedStorage(unittest.TestCase):
+    def setUp(self):
+        """Подготовка перед каждым тестом"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.temp_dir.name) / "segments"
+
+    def tearDown(self):
+        """Очистка после каждого теста"""
+        self.temp_dir.cleanup()
+
+    def make_storage(self) -> SegmentedStorageService:
+        return SegmentedStorageService(self.directory, segment_size=10)
+
+    def segment_files(self) -> set[str]:
+        return {path.name for path in self.directory.glob("segment-*.bin")}
+
+    def test_library_roundtrip(self):
+        """Тест сохранения и загрузки библиотеки по сегментам"""
+        library = LibraryService(self.make_storage())
+        library.add_books(("Книга", "Автор", year) for year in range(1900, 1925))
+        library.change_status(12, BookStatus.BORROWED.value)
+        library.delete_book(1)
+        self.assertEqual(len(self.segment_files()), 3)
+
+        storage = self.make_storage()
+        reloaded = LibraryService(storage)
+        self.assertEqual(
+            [book.to_dict() for book in reloaded.get_all_books()],
+            [book.to_dict() for book in library.get_all_books()],
+        )
+        self.assertEqual(storage.count_books(), 24)
+        self.assertEqual(storage.get_book(12)["status"], BookStatus.BORROWED.value)
+        self.assertIsNone(storage.get_book(1))
+        self.assertEqual(reloaded.add_book("Мы", "Замятин", 1924).id, 26)
+
+    def test_only_dirty_segments_rewritten(self):
+        """Тест перезаписи только сегментов с измененными книгами"""
+        library = LibraryService(self.make_storage())
+        library.add_books(("Книга", "Автор", year) for year in range(1900, 1930))
+        before = self.segment_files()
+
+        library.change_status(15, BookStatus.BORROWED.value)
+        after = self.segment_files()
+        self.assertEqual(len(before - after), 1)
+        self.assertEqual(len(after - before), 1)
+        self.assertTrue(next(iter(before - after)).startswith("segment-000001-"))
+
+        # Удаление всех книг сегмента удаляет его файл
+        with library.batch():
+            for book_id in range(21, 31):
+                library.delete_book(book_id)
+        self.assertEqual(len(self.segment_files()), 2)
+        self.assertEqual(self.make_storage().count_books(), 20)
+
+    @unittest.skipUnless(os.name == "posix", "fsync каталога только в POSIX")
+    def test_segments_synced_before_manifest(self):
+        """Тест сброса сегментов и манифеста на диск до замены манифеста"""
+        library = LibraryService(self.make_storage())
+        with record_disk_writes() as events:
+            library.add_books(("Книга", "Автор", year) for year in range(1900, 1915))
+        # Два сегмента, каталог, временный манифест, замена, каталог
+        self.assertEqual(
+            events,
+            ["fsync", "fsync", "fsync", "fsync", "replace manifest.json", "fsync"],
+        )
+
+    def test_corrupted_segment(self):
+        """Тест обнаружения поврежденного сегмента по контрольной сумме"""
+        library = LibraryService(self.make_storage())
+        library.add_books(("Книга", "Автор", year) for year in range(1900, 1915))
+        path = self.directory / sorted(self.segment_files())[0]
+        data = bytearray(path.read_bytes())
+        data[-1] ^= 0xFF
+        path.write_bytes(bytes(data))
+
+        books, last_id = self.make_storage().load_data()
+        self.assertEqual(last_id, 15)
+        with self.assertRaises(StorageCorruptedError):
+            list(books)
+
+    def test_library_with_corrupted_segment(self):
+        """Тест отказа от изменений, если сегмент библиотеки поврежден"""
+        library = LibraryService(self.make_storage(), reload_check_interval=0)
+        library.add_books(("Книга", "Автор", year) for year in range(1900, 1925))
+        path = self.directory / sorted(self.segment_files())[-1]
+        data = path.read_bytes()
+        path.write_bytes(data[:-1] + bytes([data[-1] ^ 0xFF]))
+
+        # Другой процесс изменяет первый сегмент, библиотека перезагружается
+        other = self.make_storage()
+        book = other.get_book(1)
+        book["status"] = BookStatus.BORROWED.value
+        other.apply_changes([book], [], 25)
+        files = {path.name: path.read_bytes() for path in self.directory.iterdir()}
+
+        with self.assertRaises(StorageCorruptedError):
+            LibraryService(self.make_storage())
+        for _ in range(2):
+            with self.assertRaises(StorageCorruptedError):
+                library.add_book("Мы", "Замятин", 1924)
+        with self.assertRaises(StorageCorruptedError):
+            library.get_all_books()
+        self.assertEqual(
+            {path.name: path.read_bytes() for path in self.directory.iterdir()}, files
+        )
+
+        path.write_bytes(data)
+        self.assertEqual(library.add_book("Мы", "Замятин", 1924).id, 26)
+        self.assertEqual(library.get_book_by_id(1).status, BookStatus.BORROWED)
+        self.assertEqual(self.make_storage().count_books(), 26)
+
+    def test_corrupted_manifest(self):
+        """Тест сохранения сегментов при поврежденном или отсутствующем манифесте"""
+        library = LibraryService(self.make_storage())
+        library.add_books(("Книга", "Автор", year) for year in range(1900, 1915))
+        library.storage.close()
+        files = self.segment_files()
+        manifest_path = self.directory / "manifest.json"
+        manifest = manifest_path.read_bytes()
+
+        for corrupted in (
+            manifest[:-5],
+            manifest.replace(b'"version": 1', b'"version": 9'),
+        ):
+            manifest_path.write_bytes(corrupted)
+            for _ in range(2):
+                with self.assertRaises(StorageCorruptedError):
+                    self.make_storage()
+            self.assertEqual(self.segment_files(), files)
+
+        manifest_path.unlink()
+        with self.assertRaises(StorageCorruptedError):
+            self.make_storage()
+        self.assertEqual(self.segment_files(), files)
+
+        manifest_path.write_bytes(manifest)
+        books, last_id = self.make_storage().load_data()
+        self.assertEqual((len(list(books)), last_id), (15, 15))
+
+    def test_orphan_segments_removed(self):
+        """Тест удаления файлов сегментов, не попавших в манифест"""
+        self.make_storage().save_data(
+            [
+                {
+                    "id": 1,
+                    "title": "1984",
+                    "author": "Оруэлл",
+                    "year": 1949,
+                    "status": "в наличии",
+                }
+            ],
+            1,
+        )
+        orphan = self.directory / "segment-000000-99.bin"
+        orphan.write_bytes(b"")
+
+        books, _ = self.make_storage().load_data()
+        self.assertFalse(orphan.exists())
+        self.assertEqual([book["title"] for book in books], ["1984"])
+
+    def test_create_storage(self):
+        """Тест выбора сегментированного хранилища по названию"""
+        self.assertIs(STORAGE_BACKENDS["segmented"], SegmentedStorageService)
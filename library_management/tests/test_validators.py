@@ -42,3 +42,49 @@ class TestBookValidator(unittest.TestCase):
         )
         self.assertTrue(is_valid)
         self.assertIsNone(error)
+
+    def test_check_duplicate_key(self):
+        """Тест проверки на дубликаты по индексу ключей"""
+        existing_keys = {BookValidator.make_duplicate_key("1984", "Оруэлл", 1949)}
+
+        # Регистр и пробелы по краям не учитываются
+        key = BookValidator.make_duplicate_key("  1984 ", "ОРУЭЛЛ", 1949)
+        is_valid, error = BookValidator.check_duplicate_key(key, existing_keys)
+        self.assertFalse(is_valid)
+        self.assertIsNotNone(error)
+
+        # «ё» и повторные пробелы тоже
+        existing_keys = {
+            BookValidator.book_duplicate_key(
+                Book(id=1, title="Ёжик в  тумане", author="Сергей Козлов", year=1969)
+            )
+        }
+        key = BookValidator.make_duplicate_key("ежик в тумане", "Сергей  Козлов", 1969)
+        is_valid, _ = BookValidator.check_duplicate_key(key, existing_keys)
+        self.assertFalse(is_valid)
+
+        key = BookValidator.make_duplicate_key("1984", "Оруэлл", 1950)
+        is_valid, error = BookValidator.check_duplicate_key(key, existing_keys)
+        self.assertTrue(is_valid)
+        self.assertIsNone(error)
+
+    def test_validate_many(self):
+        """Тест пакетной проверки с ошибками по номерам строк"""
+        existing_keys = {BookValidator.make_duplicate_key("1984", "Оруэлл", 1949)}
+        errors = BookValidator.validate_many(
+            [
+                ("Мы", "Замятин", 1920),
+                ("", "", 3000),
+                ("1984", "ОРУЭЛЛ", 1949),
+                ("мы", " Замятин", 1920),
+                ("Мы", "Замятин", 1921),
+            ],
+            existing_keys,
+        )
+        self.assertEqual(sorted(errors), [1, 2, 3])
+        # Все ошибки строки, а не только первая
+        self.assertEqual(len(errors[1]), 3)
+        self.assertIn("уже существует", errors[2][0])
+        self.assertIn("повторяет строку 0", errors[3][0])
+
+        self.assertEqual(BookValidator.validate_many([]), {})